@@ -30,7 +30,7 @@ class PO(QMainWindow, Ui_MainWindow):
         self.d = display_facet_model
 
         # Default model load and settings
-        self.model, self.vertices, self.faces = self.d.read_facet_model('plate.facet')
+        self.mesh = self.d.read_facet_mesh('plate.facet')
 
         # Connect to the input boxes, when the user presses enter the form updates
         self.select_target.currentIndexChanged.connect(self._select_target)
@@ -53,13 +53,13 @@ class PO(QMainWindow, Ui_MainWindow):
         target = self.select_target.currentText()
 
         if target == 'Rectangular Plate':
-            self.model, self.vertices, self.faces = self.d.read_facet_model('plate.facet')
+            self.mesh = self.d.read_facet_mesh('plate.facet')
         elif target == 'Circular Cone':
-            self.model, self.vertices, self.faces = self.d.read_facet_model('cone.facet')
+            self.mesh = self.d.read_facet_mesh('cone.facet')
         elif target == 'Frustum':
-            self.model, self.vertices, self.faces = self.d.read_facet_model('frustum.facet')
+            self.mesh = self.d.read_facet_mesh('frustum.facet')
         elif target == 'Double Ogive':
-            self.model, self.vertices, self.faces = self.d.read_facet_model('double_ogive.facet')
+            self.mesh = self.d.read_facet_mesh('double_ogive.facet')
 
     def _view_target(self):
         # Display the target geometry
@@ -69,7 +69,7 @@ class PO(QMainWindow, Ui_MainWindow):
         if self.normals.currentText() == 'On':
             n = True
 
-        self.d.display_facet(self.model, self.vertices, self.faces, self.facet_type.currentText(), n)
+        self.d.display_facet_mesh(self.mesh, self.facet_type.currentText(), n)
 
     def _update_canvas(self):
         """
@@ -88,41 +88,21 @@ class PO(QMainWindow, Ui_MainWindow):
         # Monostatic or bistatic
         mb = self.type.currentText()
 
-        rcs_theta = []
-        rcs_phi = []
-
         kwargs = {'frequency': array([frequency]),
-                  'vertices':  self.vertices,
-                  'faces':     self.faces,
+                  'mesh':      self.mesh,
                   'phi_inc':   radians(phi_inc),
                   'phi_obs':   radians(phi_obs)}
 
         b = scattering_matrix.ScatteringMatrix(**kwargs)
 
+        # Calculate all the observation angles together
         if mb == 'Monostatic':
-
-            for to in theta_obs:
-
-                b.theta_inc = to
-                b.theta_obs = to
-
-                sm = b.get_scattering_matrix()
-
-                rcs_theta.append(20.0 * log10(abs(sm[0]) + 1e-10))
-                rcs_phi.append(20.0 * log10(abs(sm[3]) + 1e-10))
-
+            sm = b.get_scattering_matrices(theta_inc=theta_obs, theta_obs=theta_obs)
         else:
+            sm = b.get_scattering_matrices(theta_inc=radians(theta_inc), theta_obs=theta_obs)
 
-            b.theta_inc = radians(theta_inc)
-
-            for to in theta_obs:
-
-                b.theta_obs = to
-
-                sm = b.get_scattering_matrix()
-
-                rcs_theta.append(20.0 * log10(abs(sm[0]) + 1e-10))
-                rcs_phi.append(20.0 * log10(abs(sm[3]) + 1e-10))
+        rcs_theta = 20.0 * log10(abs(sm[0, :, 0]) + 1e-10)
+        rcs_phi = 20.0 * log10(abs(sm[3, :, 0]) + 1e-10)
 
         # Clear the axes for the updated plot
         self.axes1.clear()
@@ -11,12 +11,12 @@ and can not be copied and/or distributed without the express permission of Artec
 """
 import sys
 from Chapter10.ui.BackProjection3pt_ui import Ui_MainWindow
-from numpy import linspace, meshgrid, array, sqrt, radians, sin, cos, zeros, dot, exp, amax, ones
+from numpy import linspace, meshgrid, array, sqrt, radians, amax, ones
 from scipy.fftpack import next_fast_len
-from scipy.constants import c, pi
+from scipy.constants import c
 from scipy.signal.windows import hann, hamming
 from numpy import max, min
-from Libs.sar import backprojection
+from Libs.sar import backprojection, simulation
 from mpl_toolkits.mplot3d import Axes3D
 from PyQt5.QtWidgets import QApplication, QMainWindow
 from matplotlib.backends.qt_compat import QtCore
@@ -130,19 +130,8 @@ class BackProjection(QMainWindow, Ui_MainWindow):
         zi = linspace(-0.5 * z_span, 0.5 * z_span, self.nz)
         self.x_image, self.y_image, self.z_image = meshgrid(xi, yi, zi, indexing='ij')
 
-        signal = zeros([nf, ne, na], dtype=complex)
-
         # Calculate the signal (k space)
-        i1 = 0
-        for a in az:
-            i2 = 0
-            for e in el:
-                r_los = [cos(radians(e)) * cos(radians(a)), cos(radians(e)) * sin(radians(a)), sin(radians(e))]
-                for x, y, z, r in zip(xt, yt, zt, rt):
-                    r_target = dot(r_los, [x, y, z])
-                    signal[:, i2, i1] += r * exp(-1j * 4.0 * pi * frequency / c * r_target)
-                i2 += 1
-            i1 += 1
+        signal = simulation.far_field(xt, yt, zt, rt, radians(az_grid), radians(el_grid), frequency)
 
         # Get the selected window from the form
         window_type = self.window_type.currentText()
@@ -173,8 +162,8 @@ class BackProjection(QMainWindow, Ui_MainWindow):
         signal *= coefficients
 
         # Reconstruct the image
-        self.bp = backprojection.reconstruct3(signal, radians(az_grid), radians(el_grid),
-                                              self.x_image, self.y_image, self.z_image, frequency, fft_length)
+        self.bp = backprojection.reconstruct3_fast(signal, radians(az_grid), radians(el_grid),
+                                                   self.x_image, self.y_image, self.z_image, frequency, fft_length)
 
         # Update the image
         self._update_image_only()
@@ -11,10 +11,10 @@ and can not be copied and/or distributed without the express permission of Artec
 """
 import sys
 from Chapter10.ui.BackProjectionBH_ui import Ui_MainWindow
-from numpy import linspace, meshgrid, array, radians, amax, ones, squeeze, max, min
+from numpy import linspace, meshgrid, array, radians, amax, ones, max, min
 from scipy.signal.windows import hann, hamming
-from Libs.sar import backprojection
-from scipy.io import loadmat
+from Libs.sar import backprojection, kspace_store
+from pathlib import Path
 from mpl_toolkits.mplot3d import Axes3D
 from PyQt5.QtWidgets import QApplication, QMainWindow
 from matplotlib.backends.qt_compat import QtCore
@@ -29,6 +29,9 @@ class BackProjection(QMainWindow, Ui_MainWindow):
 
         self.setupUi(self)
 
+        # Memory mapped K-space store of the whole data set, opened on first use
+        self.store = None
+
         # Connect to the input boxes, when the user presses enter the form updates
         self.x_span.returnPressed.connect(self._update_canvas)
         self.y_span.returnPressed.connect(self._update_canvas)
@@ -93,6 +96,11 @@ class BackProjection(QMainWindow, Ui_MainWindow):
         # el 18 - 43 (-1)
         # az 66 - 115 (-1)
 
+        # Convert all the files to one store the first time, and again when the files change
+        if self.store is None:
+            data_path = Path('../../Backhoe_CP/3D_Challenge_Problem/3D_K_Space_Data')
+            self.store = kspace_store.open_store(sorted(data_path.glob('backhoe_el*_az*.mat')), data_path / 'kspace')
+
         # Initialize the image
         self.bp = 0
 
@@ -100,29 +108,19 @@ class BackProjection(QMainWindow, Ui_MainWindow):
         for el in range(el_start, el_end + 1):
             for az in range(az_start, az_end + 1):
                 print('El {0:d} Az {1:d}'.format(el, az))
-                filename = '../../Backhoe_CP/3D_Challenge_Problem/3D_K_Space_Data/backhoe_el{0:03d}_az{1:03d}.mat'.format(el, az)
-                b = loadmat(filename)
-
-                # build a list of keys and values for each entry in the structure
-                vals = b['data'][0, 0]  # <-- set the array you want to access.
-                keys = b['data'][0, 0].dtype.descr
-
-                # Assemble the keys and values into variables with the same name as that used in MATLAB
-                for i in range(len(keys)):
-                    key = keys[i][0]
-                    val = squeeze(vals[key])
-                    exec(key + '=val', locals(), globals())
+                name = 'backhoe_el{0:03d}_az{1:03d}'.format(el, az)
 
                 # Select the polarization
                 if polarization == 'VV':
-                    signal = vv
+                    field = 'vv'
                 elif polarization == 'HH':
-                    signal = hh
+                    field = 'hh'
                 else:
-                    signal = vhhv
+                    field = 'vhhv'
+                # Read the pulses of the file through the index of the store
+                signal, azim, elev, frequency = self.store.block(name, field)
                 sensor_az = radians(azim)
                 sensor_el = radians(elev)
-                frequency = FGHz * 1e9
 
                 nf = len(frequency)
                 na = len(sensor_az)
@@ -155,8 +153,8 @@ class BackProjection(QMainWindow, Ui_MainWindow):
                 signal *= coefficients
 
                 # Reconstruct the image
-                self.bp += backprojection.reconstruct3(signal, sensor_az, sensor_el, self.x_image, self.y_image,
-                                                       self.z_image, frequency, fft_length)
+                self.bp += backprojection.reconstruct3_fast(signal, sensor_az, sensor_el, self.x_image, self.y_image,
+                                                            self.z_image, frequency, fft_length)
 
         # Update the image
         self._update_image_only()
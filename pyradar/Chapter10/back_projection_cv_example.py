@@ -11,18 +11,35 @@ and can not be copied and/or distributed without the express permission of Artec
 """
 import sys
 from Chapter10.ui.BackProjectionCV_ui import Ui_MainWindow
-from numpy import linspace, meshgrid, log10, sqrt, radians, zeros_like, amax, ones, squeeze, outer
-from scipy.io import loadmat
+from numpy import linspace, meshgrid, log10, sqrt, radians, zeros_like, amax, ones, column_stack
 from scipy.fftpack import next_fast_len
 from scipy.signal.windows import hann, hamming
 from pathlib import Path
-from Libs.sar import backprojection
+from Libs.sar import backprojection, kspace_store
 from PyQt5.QtWidgets import QApplication, QMainWindow
 from matplotlib.backends.qt_compat import QtCore
 from matplotlib.backends.backend_qt5agg import (FigureCanvas, NavigationToolbar2QT as NavigationToolbar)
 from matplotlib.figure import Figure
 
 
+# The data set and K-space file of each target
+TARGETS = {
+    'Backhoe Elevation 0': ('backhoe', 'backhoe_0.mat'),
+    'Backhoe Elevation 30': ('backhoe', 'backhoe_30.mat'),
+    'Camry Elevation 30': ('civilian_vehicles', 'Camry_el30.0000.mat'),
+    'Camry Elevation 40': ('civilian_vehicles', 'Camry_el40.0000.mat'),
+    'Camry Elevation 50': ('civilian_vehicles', 'Camry_el50.0000.mat'),
+    'Camry Elevation 60': ('civilian_vehicles', 'Camry_el60.0000.mat'),
+    'Tacoma Elevation 30': ('civilian_vehicles', 'ToyotaTacoma_el30.0000.mat'),
+    'Tacoma Elevation 40': ('civilian_vehicles', 'ToyotaTacoma_el40.0000.mat'),
+    'Tacoma Elevation 50': ('civilian_vehicles', 'ToyotaTacoma_el50.0000.mat'),
+    'Tacoma Elevation 60': ('civilian_vehicles', 'ToyotaTacoma_el60.0000.mat'),
+    'Jeep Elevation 30': ('civilian_vehicles', 'Jeep99_el30.0000.mat'),
+    'Jeep Elevation 40': ('civilian_vehicles', 'Jeep99_el40.0000.mat'),
+    'Jeep Elevation 50': ('civilian_vehicles', 'Jeep99_el50.0000.mat'),
+    'Jeep Elevation 60': ('civilian_vehicles', 'eep99_el60.0000.mat')}
+
+
 class BackProjection(QMainWindow, Ui_MainWindow):
     def __init__(self, parent=None):
 
@@ -30,6 +47,12 @@ class BackProjection(QMainWindow, Ui_MainWindow):
 
         self.setupUi(self)
 
+        # Memory mapped K-space stores, opened once for each data set
+        self.stores = {}
+
+        # Range profiles reused when only the image or the azimuth range changes
+        self.profile_cache = backprojection.RangeProfileCache()
+
         # Connect to the input boxes, when the user presses enter the form updates
         self.x_span.returnPressed.connect(self._update_canvas)
         self.y_span.returnPressed.connect(self._update_canvas)
@@ -75,44 +98,13 @@ class BackProjection(QMainWindow, Ui_MainWindow):
 
         base_path = Path(__file__).parent
 
-        if target == 'Backhoe Elevation 0':
-            b = loadmat(base_path / "backhoe_0.mat")
-        elif target == 'Backhoe Elevation 30':
-            b = loadmat(base_path / "backhoe_30.mat")
-        elif target == 'Camry Elevation 30':
-            b = loadmat(base_path / "Camry_el30.0000.mat")
-        elif target == 'Camry Elevation 40':
-            b = loadmat(base_path / "Camry_el40.0000.mat")
-        elif target == 'Camry Elevation 50':
-            b = loadmat(base_path / "Camry_el50.0000.mat")
-        elif target == 'Camry Elevation 60':
-            b = loadmat(base_path / "Camry_el60.0000.mat")
-        elif target == 'Tacoma Elevation 30':
-            b = loadmat(base_path / "ToyotaTacoma_el30.0000.mat")
-        elif target == 'Tacoma Elevation 40':
-            b = loadmat(base_path / "ToyotaTacoma_el40.0000.mat")
-        elif target == 'Tacoma Elevation 50':
-            b = loadmat(base_path / "ToyotaTacoma_el50.0000.mat")
-        elif target == 'Tacoma Elevation 60':
-            b = loadmat(base_path / "ToyotaTacoma_el60.0000.mat")
-        elif target == 'Jeep Elevation 30':
-            b = loadmat(base_path / "Jeep99_el30.0000.mat")
-        elif target == 'Jeep Elevation 40':
-            b = loadmat(base_path / "Jeep99_el40.0000.mat")
-        elif target == 'Jeep Elevation 50':
-            b = loadmat(base_path / "Jeep99_el50.0000.mat")
-        elif target == 'Jeep Elevation 60':
-            b = loadmat(base_path / "eep99_el60.0000.mat")
-
-        # Build a list of keys and values for each entry in the structure
-        vals = b['data'][0, 0]
-        keys = b['data'][0, 0].dtype.descr
-
-        # Assemble the keys / values into variables with the same name as used in MATLAB
-        for i in range(len(keys)):
-            key = keys[i][0]
-            val = squeeze(vals[key])
-            exec(key + '=val', locals(), globals())
+        dataset, filename = TARGETS[target]
+        stem = Path(filename).stem
+
+        # Convert each data set to one store the first time, and again when its files change
+        if dataset not in self.stores:
+            filenames = [base_path / f for d, f in TARGETS.values() if d == dataset and (base_path / f).exists()]
+            self.stores[dataset] = kspace_store.open_store(filenames, base_path / 'kspace' / dataset)
 
         # Set up the image space
         self.xi = linspace(-0.5 * x_span, 0.5 * x_span, nx)
@@ -120,55 +112,42 @@ class BackProjection(QMainWindow, Ui_MainWindow):
         x_image, y_image = meshgrid(self.xi, self.yi)
         z_image = zeros_like(x_image)
 
-        # Set the data from the file
-        polarization = self.polarization.currentText()
-        if polarization == 'VV':
-            signal = vv
-        elif polarization == 'HH':
-            signal = hh
-        else:
-            signal = hv
-
-        # Choose the pulses in the azimuth range
-        sensor_az = []
-        index = []
-
-        i = 0
-        for az in azim:
-            if az_start <= az <= az_end:
-                sensor_az.append(radians(az))
-                index.append(i)
-            i += 1
+        # Choose the pulses of the target in the azimuth range through the index of the store
+        store = self.stores[dataset]
+        block = store.block_pulses(stem)
+        index = store.pulses(az_start, az_end, name=stem)
 
-        signal1 = signal[:, index]
-
-        sensor_el = radians(elev) * ones(len(sensor_az))
-        frequency = FGHz * 1e9
+        sensor_az = radians(store.azimuth[index])
+        sensor_el = radians(store.elevation[index])
+        frequency = store.frequency
 
         nf = len(frequency)
         na = len(sensor_az)
 
         fft_length = next_fast_len(4 * len(frequency))
 
-        # Get the selected window from the form
+        # Get the selected window from the form, as separate frequency and pulse windows
         window_type = self.window_type.currentText()
 
         if window_type == 'Hanning':
-            h1 = hann(nf, True)
-            h2 = hann(na, True)
-            coefficients = sqrt(outer(h1, h2))
+            h1 = sqrt(hann(nf, True))
+            h2 = sqrt(hann(na, True))
         elif window_type == 'Hamming':
-            h1 = hamming(nf, True)
-            h2 = hamming(na, True)
-            coefficients = sqrt(outer(h1, h2))
+            h1 = sqrt(hamming(nf, True))
+            h2 = sqrt(hamming(na, True))
         elif window_type == 'Rectangular':
-            coefficients = ones([nf, na])
+            h1 = ones(nf)
+            h2 = ones(na)
 
-        # Apply the selected window
-        signal1 *= coefficients
+        # Range profiles of the selected polarization, compressed once for each target and frequency window
+        polarization = self.polarization.currentText()
+        range_profiles = self.profile_cache.profiles(store.signal(polarization)[block].T, fft_length, h1,
+                                                     index - block.start, (stem, polarization)) * h2
 
         # Reconstruct the image
-        self.bp_image = backprojection.reconstruct2(signal1, sensor_az, sensor_el, x_image, y_image, z_image, frequency, fft_length)
+        backprojector = backprojection.Backprojector(x_image, y_image, z_image, frequency, fft_length, 'Plane Wave')
+        backprojector.add_profiles(range_profiles, column_stack([sensor_az, sensor_el]))
+        self.bp_image = backprojector.snapshot()
 
         # Update the image
         self._update_image_only()
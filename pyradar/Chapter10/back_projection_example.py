@@ -143,8 +143,8 @@ class BackProjection(QMainWindow, Ui_MainWindow):
         signal *= coefficients
 
         # Reconstruct the image
-        self.bp_image = backprojection.reconstruct(signal, sensor_x, sensor_y, sensor_z, range_center, x_image, y_image,
-                                                   z_image, frequency, fft_length)
+        self.bp_image = backprojection.reconstruct_fast(signal, sensor_x, sensor_y, sensor_z, range_center, x_image, y_image,
+                                                        z_image, frequency, fft_length)
 
         # Update the image
         self._update_image_only()
@@ -223,8 +223,8 @@ class Stripmap(QMainWindow, Ui_MainWindow):
         signal1 *= coefficients
 
         # Reconstruct the image
-        self.bp_image = backprojection.reconstruct(signal1, sensor_x, sensor_y, sensor_z, range_center,
-                                                   x_image, y_image, z_image, frequency, fft_length)
+        self.bp_image = backprojection.reconstruct_fast(signal1, sensor_x, sensor_y, sensor_z, range_center,
+                                                        x_image, y_image, z_image, frequency, fft_length)
 
         # Update the image
         self._update_image_only()
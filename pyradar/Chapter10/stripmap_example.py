@@ -11,12 +11,12 @@ and can not be copied and/or distributed without the express permission of Artec
 """
 import sys
 from Chapter10.ui.Stripmap_ui import Ui_MainWindow
-from numpy import linspace, meshgrid, log10, sqrt, ceil, arctan, cos, tan, zeros_like, zeros, exp, amax, ones, radians, \
+from numpy import linspace, meshgrid, log10, sqrt, ceil, cos, tan, zeros_like, zeros, array, amax, ones, radians, \
     outer, finfo
 from scipy.fftpack import next_fast_len
 from scipy.constants import c, pi
 from scipy.signal.windows import hann, hamming
-from Libs.sar import backprojection
+from Libs.sar import backprojection, simulation
 from Libs.antenna.array.linear_array_un import array_factor
 from PyQt5.QtWidgets import QApplication, QMainWindow
 from matplotlib.backends.qt_compat import QtCore
@@ -136,30 +136,17 @@ class Stripmap(QMainWindow, Ui_MainWindow):
         sensor_y = synthetic_aperture
         sensor_z = zeros_like(synthetic_aperture)
 
-        # Calculate the signal (k space)
-        # Initialize the signal
-        signal = zeros([number_of_frequencies, number_of_samples], dtype=complex)
-
-        # Initialize the range center (m)
-        range_center = zeros_like(synthetic_aperture)
-
-        # Phase term for the range phase (rad)
-        phase_term = -1j * 4.0 * pi * frequency / c
+        # Calculate the range center (m)
+        range_center = sqrt(x_center ** 2 + (y_center - synthetic_aperture) ** 2)
 
-        index = 0
-        for sa in synthetic_aperture:
-            range_center[index] = sqrt(x_center ** 2 + (y_center - sa) ** 2)
+        # Antenna pattern toward each target
+        def antenna_pattern(target_azimuth):
+            return array_factor(number_of_elements, 0.5 * pi - squint_angle, element_spacing, start_frequency,
+                                0.5 * pi - target_azimuth, 'Uniform', 0) * cos(squint_angle)
 
-            for x, y, r in zip(xt, yt, rt):
-                # Antenna pattern at each target
-                target_range = sqrt((x_center + x) ** 2 + (y_center + y - sa) ** 2) - range_center[index]
-                target_azimuth = arctan((y_center + y - sa) / (x_center + x))
-                antenna_pattern = array_factor(number_of_elements, 0.5 * pi - squint_angle, element_spacing,
-                                               start_frequency, 0.5 * pi - target_azimuth, 'Uniform', 0) * cos(squint_angle)
-
-                signal[:, index] += r * antenna_pattern ** 2 * exp(phase_term * target_range)
-
-            index += 1
+        # Calculate the signal (k space)
+        signal = simulation.stripmap(x_center + array(xt), y_center + array(yt), zeros(len(xt)), rt, sensor_x,
+                                     sensor_y, sensor_z, range_center, frequency, antenna_pattern)
 
         # Get the selected window
         window_type = self.window_type.currentText()
@@ -179,8 +166,8 @@ class Stripmap(QMainWindow, Ui_MainWindow):
         signal *= coefficients
 
         # Reconstruct the image
-        self.bp_image = backprojection.reconstruct(signal, sensor_x, sensor_y, sensor_z, range_center, x_image, y_image,
-                                                   z_image, frequency, fft_length)
+        self.bp_image = backprojection.reconstruct_fast(signal, sensor_x, sensor_y, sensor_z, range_center, x_image, y_image,
+                                                        z_image, frequency, fft_length)
 
         # Update the image
         self._update_image_only()
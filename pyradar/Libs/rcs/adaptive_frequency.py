@@ -0,0 +1,210 @@
+"""
+Project: RadarBook
+File: adaptive_frequency.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import asarray, atleast_1d, atleast_2d, zeros, ones, arange, linspace, unique, rint, argmax, append, \
+    concatenate, setdiff1d, searchsorted, minimum, maximum, conj, abs, intp, inf, isfinite, where
+from numpy.linalg import svd
+
+
+class RationalModel:
+    """
+    Rational model of a set of responses sharing the same poles, in the barycentric form
+        r(z) = sum(w_j f_j / (z - z_j)) / sum(w_j / (z - z_j)),
+    with the support points z_j added one at a time where the error is largest and the weights w_j found by least
+    squares over the other samples (the AAA algorithm).
+    """
+    def __init__(self, z, f, tolerance=1e-6, max_order=None):
+        """
+        Fit the model to samples of the responses.
+        :param z: The sample points.
+        :param f: The responses at the sample points (responses x samples).
+        :param tolerance: The largest error at the samples, relative to the largest response.
+        :param max_order: The largest number of support points, the number of samples if None.
+        """
+        z = atleast_1d(asarray(z, dtype=float))
+        f = atleast_2d(asarray(f, dtype=complex))
+
+        # Sample points scaled to [-1, 1] for conditioning
+        self.center = 0.5 * (z.max() + z.min())
+        self.scale = max(0.5 * (z.max() - z.min()), 1e-300)
+        x = (z - self.center) / self.scale
+
+        self.mean = f.mean(axis=1)
+        self.support = zeros(0)
+        self.values = zeros((len(f), 0), dtype=complex)
+        self.weights = zeros(0, dtype=complex)
+
+        if max_order is None:
+            max_order = len(x)
+
+        peak = abs(f).max()
+        support = zeros(0, dtype=intp)
+        model = self._evaluate(x)
+
+        while len(support) < min(max_order, len(x)):
+            # Add the sample with the largest error to the support points
+            error = abs(f - model).max(axis=0)
+            error[support] = 0.0
+            if error.max() <= tolerance * peak:
+                break
+            support = append(support, argmax(error))
+            others = setdiff1d(arange(len(x)), support)
+
+            # Weights from the smallest right singular vector of the Loewner matrices of all the responses
+            if len(others):
+                cauchy = 1.0 / (x[others, None] - x[None, support])
+                loewner = concatenate([(fk[others, None] - fk[None, support]) * cauchy for fk in f])
+                self.weights = conj(svd(loewner, full_matrices=len(loewner) < len(support))[2][-1])
+            else:
+                self.weights = ones(len(support), dtype=complex)
+
+            self.support = x[support]
+            self.values = f[:, support]
+            model = self._evaluate(x)
+
+        # Error at the samples, relative to the largest response
+        self.error = abs(f - model).max() / peak if peak > 0.0 else 0.0
+
+    def __call__(self, z):
+        """
+        Evaluate the model.
+        :param z: The points to evaluate at.
+        :return: The responses at the points (responses x points).
+        """
+        x = (atleast_1d(asarray(z, dtype=float)) - self.center) / self.scale
+        return self._evaluate(x)
+
+    def _evaluate(self, x):
+        """
+        Evaluate the barycentric form at scaled points, taking the support values at the support points.
+        :param x: The scaled points.
+        :return: The responses at the points (responses x points).
+        """
+        if not len(self.support):
+            return self.mean[:, None] * ones(len(x))
+
+        difference = x[:, None] - self.support[None, :]
+        exact = difference == 0.0
+        cauchy = self.weights[None, :] / where(exact, 1.0, difference)
+
+        r = (cauchy @ self.values.T) / cauchy.sum(axis=1)[:, None]
+
+        # Values at the support points
+        point, j = exact.nonzero()
+        r[point] = self.values[:, j].T
+
+        return r.T
+
+
+def adaptive_sweep(evaluate, frequency, tolerance=1e-3, initial_samples=9, samples_per_step=4, max_samples=None):
+    """
+    Sample a set of responses over a frequency grid with as few evaluations as possible.
+    The responses are evaluated at a few frequencies of the grid and a rational model is fit to the samples. More
+    frequencies are evaluated where the models of successive steps differ the most, until the change in the model
+    and the error of the previous model at the new samples are both within the tolerance of the largest response.
+    Each step adds a quarter of the samples, at least samples_per_step. Without a limit on the samples, a target
+    too large for the grid to be undersampled has the whole grid evaluated once half of it is needed.
+    :param evaluate: Function giving the responses for an array of frequencies (responses x frequencies).
+    :param frequency: The frequency grid (Hz).
+    :param tolerance: The error allowed, relative to the largest response.
+    :param initial_samples: The number of frequencies evaluated first, evenly spaced over the grid.
+    :param samples_per_step: The smallest number of frequencies added at each step.
+    :param max_samples: The largest number of frequencies evaluated, no limit if None.
+    :return: The responses over the grid (responses x frequency), the error estimate and the sampled frequencies.
+    """
+    frequency = atleast_1d(asarray(frequency, dtype=float))
+    n = len(frequency)
+
+    if max_samples is None:
+        max_samples = n
+
+    # Initial samples spread evenly over the grid
+    sampled = unique(rint(linspace(0, n - 1, min(max(initial_samples, 2), n))).astype(intp))
+    values = atleast_2d(evaluate(frequency[sampled]))
+
+    previous = None
+    prediction_error = inf
+
+    while True:
+        peak = max(abs(values).max(), 1e-300)
+
+        # Once half the grid is needed the model saves little, so the rest of the grid is evaluated
+        if 2 * len(sampled) >= n and max_samples >= n:
+            rest = setdiff1d(arange(n), sampled)
+            response = zeros((len(values), n), dtype=complex)
+            response[:, sampled] = values
+            if len(rest):
+                response[:, rest] = atleast_2d(evaluate(frequency[rest]))
+            return response, 0.0, frequency
+
+        model = RationalModel(frequency[sampled], values, 1e-2 * tolerance)
+        response = model(frequency)
+        response[:, sampled] = values
+
+        # Change from the previous model, or the distance to the nearest sample on the first step
+        if previous is None:
+            score = _gap(sampled, n)
+            error = inf
+        else:
+            score = abs(response - previous).max(axis=0) / peak
+            score = where(isfinite(score), score, inf)
+            error = max(score.max(), prediction_error)
+
+        if error <= tolerance or len(sampled) >= max_samples:
+            return response, error, frequency[sampled]
+
+        # Evaluate the frequencies with the largest change, and keep the error of the model there
+        count = max(samples_per_step, len(sampled) // 4)
+        new = _next_samples(score, sampled, min(count, max_samples - len(sampled)))
+        new_values = atleast_2d(evaluate(frequency[new]))
+        prediction_error = abs(new_values - response[:, new]).max() / max(peak, abs(new_values).max())
+
+        sampled = concatenate([sampled, new])
+        values = concatenate([values, new_values], axis=1)
+        order = sampled.argsort()
+        sampled = sampled[order]
+        values = values[:, order]
+        previous = response
+
+
+def _gap(sampled, n):
+    """
+    The distance of each point of the grid to the nearest sample.
+    :param sampled: The sampled points of the grid, in order.
+    :param n: The number of points in the grid.
+    :return: The distances.
+    """
+    point = arange(n)
+    right = minimum(searchsorted(sampled, point), len(sampled) - 1)
+    left = maximum(right - 1, 0)
+    return minimum(abs(sampled[right] - point), abs(point - sampled[left])).astype(float)
+
+
+def _next_samples(score, sampled, count):
+    """
+    Choose the points of the grid with the largest score, keeping them apart from each other.
+    :param score: The score of each point of the grid.
+    :param sampled: The points already sampled.
+    :param count: The number of points to choose.
+    :return: The points.
+    """
+    score = score.copy()
+    score[sampled] = -1.0
+    separation = max(len(score) // (2 * (len(sampled) + count)), 1)
+
+    new = []
+    while len(new) < count and score.max() >= 0.0:
+        j = argmax(score)
+        new.append(j)
+        score[max(j - separation + 1, 0):j + separation] = -1.0
+        score[j] = -1.0
+
+    return asarray(new, dtype=intp)
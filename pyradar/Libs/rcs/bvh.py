@@ -0,0 +1,228 @@
+"""
+Project: RadarBook
+File: bvh.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import arange, array, zeros, full, concatenate, repeat, cumsum, lexsort, minimum, maximum, argmax, \
+    where, inf, intp, unique, sqrt, asarray
+
+
+class BoundingVolumeHierarchy:
+    """
+    Bounding volume hierarchy over the facets of a mesh for casting batches of rays.
+    The tree is built one level at a time, splitting every node at the median of its facet centroids along its
+    longest side, and rays are traversed together as arrays of (ray, node) pairs.
+    """
+    def __init__(self, mesh, leaf_size=4):
+        """
+        Build the hierarchy.
+        :param mesh: The facet mesh.
+        :param leaf_size: The largest number of facets in a leaf.
+        """
+        # Triangles as a vertex and two edges for the intersection test, one array per coordinate
+        self.vertex = mesh.vertices[mesh.faces[:, 0]].T.copy()
+        self.edge1 = mesh.edges[:, 0].T.copy()
+        self.edge2 = -mesh.edges[:, 2].T.copy()
+
+        number_of_facets = len(mesh.faces)
+
+        # Facet bounds, padded with one row for the segment reductions
+        corners = mesh.vertices[mesh.faces]
+        facet_lower = concatenate([corners.min(axis=1), zeros([1, 3])])
+        facet_upper = concatenate([corners.max(axis=1), zeros([1, 3])])
+
+        self.order = arange(number_of_facets)
+
+        lower = []
+        upper = []
+        start = []
+        count = []
+        left = []
+
+        # Segments of the facet order for the nodes of the current level
+        level_start = array([0], dtype=intp)
+        level_end = array([number_of_facets], dtype=intp)
+        number_of_nodes = 0
+
+        while len(level_start) and number_of_facets:
+            # Bounds of each node
+            index = concatenate([level_start[:, None], level_end[:, None]], axis=1).ravel()
+            order = concatenate([self.order, [number_of_facets]])
+            node_lower = minimum.reduceat(facet_lower[order], index)[::2]
+            node_upper = maximum.reduceat(facet_upper[order], index)[::2]
+
+            node_count = level_end - level_start
+            split = node_count > leaf_size
+            number_of_splits = int(split.sum())
+
+            lower.append(node_lower)
+            upper.append(node_upper)
+            start.append(level_start)
+            count.append(node_count)
+
+            # Children of the split nodes are numbered in pairs after this level
+            child = full(len(level_start), -1, dtype=intp)
+            child[split] = number_of_nodes + len(level_start) + 2 * arange(number_of_splits)
+            left.append(child)
+            number_of_nodes += len(level_start)
+
+            if not number_of_splits:
+                break
+
+            # Sort the facets of each split node along its longest side
+            axis = argmax(node_upper[split] - node_lower[split], axis=1)
+            s_start = level_start[split]
+            s_count = node_count[split]
+            segment = repeat(arange(number_of_splits), s_count)
+            position = arange(s_count.sum()) - repeat(cumsum(s_count) - s_count, s_count) + repeat(s_start, s_count)
+            facets = self.order[position]
+            self.order[position] = facets[lexsort((mesh.centroids[facets, axis[segment]], segment))]
+
+            # Split at the median
+            middle = s_start + s_count // 2
+            level_start = concatenate([s_start[:, None], middle[:, None]], axis=1).ravel()
+            level_end = concatenate([middle[:, None], (s_start + s_count)[:, None]], axis=1).ravel()
+
+        # Node bounds, one array per coordinate
+        self.lower = concatenate(lower).T.copy() if lower else zeros([3, 0])
+        self.upper = concatenate(upper).T.copy() if upper else zeros([3, 0])
+        self.start = concatenate(start) if start else zeros(0, dtype=intp)
+        self.count = concatenate(count) if count else zeros(0, dtype=intp)
+        self.left = concatenate(left) if left else zeros(0, dtype=intp)
+
+    def intersect(self, origins, directions, ignore=None, t_min=0.0, t_max=inf, any_hit=False, ray_block=16384):
+        """
+        Find the facets hit by a batch of rays.
+        :param origins: The ray origins (rays x 3) (m).
+        :param directions: The ray directions (rays x 3).
+        :param ignore: The facet each ray starts on, which it can not hit, or None.
+        :param t_min: The smallest distance along the ray for a hit.
+        :param t_max: The largest distance along the ray for a hit.
+        :param any_hit: True to stop each ray at its first hit found, False to find the closest hit.
+        :param ray_block: The number of rays traversed together.
+        :return: The facet hit by each ray (-1 for no hit) and the distance along the ray.
+        """
+        number_of_rays = len(origins)
+        hit_facet = full(number_of_rays, -1, dtype=intp)
+        hit_distance = full(number_of_rays, float(t_max))
+
+        if not len(self.start):
+            return hit_facet, hit_distance
+
+        # Ray origins, directions and reciprocal directions for the slab test, large where a direction is zero
+        origins = [asarray(origins[:, i], dtype=float) for i in range(3)]
+        directions = [asarray(directions[:, i], dtype=float) for i in range(3)]
+        inverse = [1.0 / where(abs(d) > 1e-300, d, 1e-300) for d in directions]
+
+        for block_start in range(0, number_of_rays, ray_block):
+            ray = arange(block_start, min(block_start + ray_block, number_of_rays))
+            node = zeros(len(ray), dtype=intp)
+
+            while len(ray):
+                # Keep the pairs whose ray enters the node box between t_min and its current hit
+                t_near = full(len(ray), float(t_min))
+                t_far = hit_distance[ray]
+                for i in range(3):
+                    origin = origins[i][ray]
+                    t1 = (self.lower[i][node] - origin) * inverse[i][ray]
+                    t2 = (self.upper[i][node] - origin) * inverse[i][ray]
+                    t_near = maximum(t_near, minimum(t1, t2))
+                    t_far = minimum(t_far, maximum(t1, t2))
+                keep = t_near <= t_far
+                if any_hit:
+                    keep &= hit_facet[ray] < 0
+                ray = ray[keep]
+                node = node[keep]
+
+                # Test the facets of the leaves
+                leaf = self.left[node] < 0
+                if leaf.any():
+                    leaf_ray = ray[leaf]
+                    leaf_node = node[leaf]
+                    n = self.count[leaf_node]
+                    pair_ray = repeat(leaf_ray, n)
+                    facet = self.order[repeat(self.start[leaf_node], n) + arange(n.sum()) -
+                                       repeat(cumsum(n) - n, n)]
+
+                    t = self._triangle([o[pair_ray] for o in origins], [d[pair_ray] for d in directions], facet)
+                    valid = (t > t_min) & (t < hit_distance[pair_ray])
+                    if ignore is not None:
+                        valid &= facet != ignore[pair_ray]
+
+                    # Closest hit of each ray among its pairs
+                    pair_ray, facet, t = pair_ray[valid], facet[valid], t[valid]
+                    if len(t):
+                        first = lexsort((t, pair_ray))
+                        rays, index = unique(pair_ray[first], return_index=True)
+                        hit_distance[rays] = t[first[index]]
+                        hit_facet[rays] = facet[first[index]]
+
+                # Descend into both children of the internal nodes
+                ray = repeat(ray[~leaf], 2)
+                node = repeat(self.left[node[~leaf]], 2) + (arange(len(ray)) % 2)
+
+        return hit_facet, hit_distance
+
+    def occluded(self, origins, directions, ignore=None, t_min=0.0):
+        """
+        Test whether the rays hit any facet.
+        :param origins: The ray origins (rays x 3) (m).
+        :param directions: The ray directions (rays x 3).
+        :param ignore: The facet each ray starts on, which it can not hit, or None.
+        :param t_min: The smallest distance along the ray for a hit.
+        :return: True for each ray that hits a facet.
+        """
+        return self.intersect(origins, directions, ignore, t_min, any_hit=True)[0] >= 0
+
+    def _triangle(self, origins, directions, facet):
+        """
+        Moller-Trumbore ray and triangle intersection.
+        :param origins: The ray origin coordinates (3 arrays of pairs) (m).
+        :param directions: The ray direction coordinates (3 arrays of pairs).
+        :param facet: The facet of each pair.
+        :return: The distance along the ray to the hit, infinite for a miss.
+        """
+        e1 = [e[facet] for e in self.edge1]
+        e2 = [e[facet] for e in self.edge2]
+        s = [o - v[facet] for o, v in zip(origins, self.vertex)]
+
+        p = _cross(directions, e2)
+        q = _cross(s, e1)
+
+        determinant = _dot(e1, p)
+        scale = sqrt(_dot(e1, e1) * _dot(e2, e2))
+        parallel = abs(determinant) <= 1e-12 * scale
+        inverse = 1.0 / where(parallel, 1.0, determinant)
+
+        u = _dot(s, p) * inverse
+        v = _dot(directions, q) * inverse
+        t = _dot(e2, q) * inverse
+
+        inside = ~parallel & (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0)
+        return where(inside, t, inf)
+
+
+def _cross(a, b):
+    """
+    Cross product of vectors stored one array per coordinate.
+    :param a: The first vectors.
+    :param b: The second vectors.
+    :return: The cross products.
+    """
+    return [a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]]
+
+
+def _dot(a, b):
+    """
+    Dot product of vectors stored one array per coordinate.
+    :param a: The first vectors.
+    :param b: The second vectors.
+    :return: The dot products.
+    """
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
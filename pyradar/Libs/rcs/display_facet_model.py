@@ -9,55 +9,36 @@ Copyright (C) 2019 Artech House (artech@artechhouse.com)
 This file is part of Introduction to Radar Using Python and MATLAB
 and can not be copied and/or distributed without the express permission of Artech House.
 """
-from numpy import zeros, array, cross
+from numpy import array, isfinite
 from numpy import min, max
 from pathlib import Path
 
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D, proj3d
 from matplotlib.patches import FancyArrowPatch
+from Libs.rcs.facet_mesh import FacetMesh
+from Libs.rcs.facet_io import read_facet
 
 
 def read_facet_model(file_name):
     """
-    Read the facet model from the given file.
+    Read the facet model from the given file, text or binary (.fbin).
     :param file_name: The name of the facet file.
     :return: The model name, vertices and faces.
     """
-    # Open the file
+    # Relative names are found next to this module
     base_path = Path(__file__).parent
-    with open((base_path / file_name), 'r') as file:
+    return read_facet(base_path / file_name)
 
-        # Read the name of the model
-        model_name = file.readline()
 
-        # Read the number of vertices
-        number_of_vertices = int(file.readline())
-
-        # Read the vertices
-        vertices = zeros([number_of_vertices, 3])
-
-        for i in range(number_of_vertices):
-            line = file.readline()
-            line_list = line.split( )
-
-            # Parse the values
-            vertices[i] = [float(line_list[0]), float(line_list[1]), float(line_list[2])]
-
-        # Read the number of faces
-        number_of_faces = int(file.readline())
-
-        # Read the faces
-        faces = zeros([number_of_faces, 3], dtype=int)
-
-        for i in range(number_of_faces):
-            line = file.readline()
-            line_list = line.split( )
-
-            # Parse the values
-            faces[i] = [float(line_list[0]), float(line_list[1]), float(line_list[2])]
-
-        return model_name, vertices, faces
+def read_facet_mesh(file_name):
+    """
+    Read the facet model from the given file and calculate its facet geometry.
+    :param file_name: The name of the facet file.
+    :return: The facet mesh.
+    """
+    model_name, vertices, faces = read_facet_model(file_name)
+    return FacetMesh(vertices, faces, model_name)
 
 
 def display_facet(model_name, vertices, faces, plot_type, display_normals=False, scale=0.2):
@@ -71,21 +52,33 @@ def display_facet(model_name, vertices, faces, plot_type, display_normals=False,
     :param scale: Scale factor for the model.
     :return:
     """
+    display_facet_mesh(FacetMesh(vertices, faces, model_name), plot_type, display_normals, scale)
+
+
+def display_facet_mesh(mesh, plot_type, display_normals=False, scale=0.2):
+    """
+    Display a facet mesh.
+    :param mesh: The facet mesh.
+    :param plot_type: The type of plot to create (facet/wireframe).
+    :param display_normals: Normals on or off.
+    :param scale: Scale factor for the model.
+    :return:
+    """
     # Separate the coordinates of the vertices
-    x = vertices[:, 0]
-    y = vertices[:, 1]
-    z = vertices[:, 2]
+    x = mesh.vertices[:, 0]
+    y = mesh.vertices[:, 1]
+    z = mesh.vertices[:, 2]
 
     # Display the model
     ax = Axes3D(plt.figure())
     if plot_type == 'Facet':
-        ax.plot_trisurf(x, y, z, triangles=faces, color=(1, 1, 1, 1), edgecolor='gray')
+        ax.plot_trisurf(x, y, z, triangles=mesh.faces, color=(1, 1, 1, 1), edgecolor='gray')
     elif plot_type == 'Wireframe':
-        ax.plot_trisurf(x, y, z, triangles=faces, color='none', edgecolor='black')
+        ax.plot_trisurf(x, y, z, triangles=mesh.faces, color='none', edgecolor='black')
     ax.grid(True)
     set_equal(ax)
 
-    ax.set_title(model_name, size='14')
+    ax.set_title(mesh.model_name, size='14')
     ax.set_xlabel('X', size='12')
     ax.set_ylabel('Y', size='12')
     ax.set_zlabel('Z', size='12')
@@ -95,28 +88,16 @@ def display_facet(model_name, vertices, faces, plot_type, display_normals=False,
 
     if display_normals:
 
-        # Vector from origin to vertices
-        r = zeros([vertices.shape[0], 3])
-
-        for i in range(vertices.shape[0]):
-            r[i] = [vertices[i][0], vertices[i][1], vertices[i][2]]
-
-        for i in range(faces.shape[0]):
-            a = r[faces[i][1]] - r[faces[i][0]]
-            b = r[faces[i][2]] - r[faces[i][1]]
-
-            # Outward normal
-            normal = cross(a, b) + 0.
-
-            # Scale the size of the arrow to be displayed
-            normal *= scale
+        # Outward normals with length twice the area, scaled for display, at the center of each facet
+        normal = mesh.normals * (2.0 * mesh.areas * scale)[:, None]
+        start = mesh.centroids
+        end = start + normal
 
-            # Put the arrow at the center of the facet
-            mean_r = (r[faces[i][0]] + r[faces[i][1]] + r[faces[i][2]]) / 3.0
+        for i in isfinite(normal).all(axis=1).nonzero()[0]:
 
             # Get the arrow for the normal
-            arrow = Arrow3D([mean_r[0], mean_r[0] + normal[0]], [mean_r[1], mean_r[1] + normal[1]],
-                         [mean_r[2], mean_r[2] + normal[2]], mutation_scale=10, lw=1, arrowstyle="-|>", color="r")
+            arrow = Arrow3D([start[i, 0], end[i, 0]], [start[i, 1], end[i, 1]], [start[i, 2], end[i, 2]],
+                            mutation_scale=10, lw=1, arrowstyle="-|>", color="r")
             ax.add_artist(arrow)
 
     plt.show()
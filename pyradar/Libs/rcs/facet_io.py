@@ -0,0 +1,187 @@
+"""
+Project: RadarBook
+File: facet_io.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import fromstring, concatenate, memmap, fromfile, ascontiguousarray, array, int64, float64, uint64, \
+    zeros
+from pathlib import Path
+
+
+# Binary facet file: magic, number of vertices, number of faces and name length (uint64), the name padded to
+# 8 bytes, then the vertices (float64, vertices x 3) and faces (int64, faces x 3)
+BINARY_MAGIC = b'RBFACET1'
+BINARY_EXTENSION = '.fbin'
+
+
+def read_facet(file_name, memory_map=True):
+    """
+    Read a facet model, binary or text by the file extension.
+    :param file_name: The name of the facet file.
+    :param memory_map: True to memory map the arrays of a binary file.
+    :return: The model name, vertices and faces.
+    """
+    if Path(file_name).suffix == BINARY_EXTENSION:
+        return read_facet_binary(file_name, memory_map)
+    return read_facet_text(file_name)
+
+
+def read_facet_text(file_name):
+    """
+    Read a text facet model, parsing the vertices and faces one block at a time.
+    Two layouts are read: the model name, number of vertices, vertices, number of faces and faces (zero based), and
+    the part by part exports from MODELMAN (one based faces within each part).
+    :param file_name: The name of the facet file.
+    :return: The model name, vertices and faces.
+    """
+    with open(file_name, 'r') as file:
+        lines = file.read().splitlines()
+
+    if lines[0].strip().upper().startswith('FACET FILE'):
+        return _read_parts(lines)
+
+    # Vertices and faces
+    number_of_vertices = int(lines[1])
+    vertices = _block(lines, 2, number_of_vertices, float64)
+
+    number_of_faces = int(lines[2 + number_of_vertices])
+    faces = _block(lines, 3 + number_of_vertices, number_of_faces, float64).astype(int64)
+
+    return lines[0].strip(), vertices, faces
+
+
+def write_facet_binary(file_name, model_name, vertices, faces):
+    """
+    Write a facet model to a binary file.
+    :param file_name: The name of the binary file.
+    :param model_name: The name of the model.
+    :param vertices: The vertices of the model (vertices x 3).
+    :param faces: The faces of the model (faces x 3).
+    :return:
+    """
+    name = model_name.encode('utf-8')
+    vertices = ascontiguousarray(vertices, dtype=float64)
+    faces = ascontiguousarray(faces, dtype=int64)
+
+    with open(file_name, 'wb') as file:
+        file.write(BINARY_MAGIC)
+        array([len(vertices), len(faces), len(name)], dtype=uint64).tofile(file)
+        file.write(name + bytes(-len(name) % 8))
+        vertices.tofile(file)
+        faces.tofile(file)
+
+
+def read_facet_binary(file_name, memory_map=True):
+    """
+    Read a facet model from a binary file.
+    :param file_name: The name of the binary file.
+    :param memory_map: True to memory map the arrays, False to read them into memory.
+    :return: The model name, vertices and faces.
+    """
+    with open(file_name, 'rb') as file:
+        if file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError('{} is not a binary facet file'.format(file_name))
+
+        number_of_vertices, number_of_faces, name_length = [int(n) for n in fromfile(file, uint64, 3)]
+        model_name = file.read(name_length).decode('utf-8')
+
+        offset = len(BINARY_MAGIC) + 24 + name_length + (-name_length % 8)
+
+        if not memory_map:
+            file.seek(offset)
+            vertices = fromfile(file, float64, 3 * number_of_vertices).reshape(number_of_vertices, 3)
+            faces = fromfile(file, int64, 3 * number_of_faces).reshape(number_of_faces, 3)
+            return model_name, vertices, faces
+
+    vertices = _map(file_name, float64, offset, number_of_vertices)
+    faces = _map(file_name, int64, offset + 24 * number_of_vertices, number_of_faces)
+
+    return model_name, vertices, faces
+
+
+def convert(file_name, binary_file_name=None):
+    """
+    Convert a text facet model to the binary format.
+    :param file_name: The name of the text facet file.
+    :param binary_file_name: The name of the binary file, the text file name with the binary extension if None.
+    :return: The name of the binary file.
+    """
+    if binary_file_name is None:
+        binary_file_name = Path(file_name).with_suffix(BINARY_EXTENSION)
+
+    write_facet_binary(binary_file_name, *read_facet_text(file_name))
+
+    return binary_file_name
+
+
+def _block(lines, start, count, data_type):
+    """
+    Parse a block of lines with the same number of values on each line.
+    :param lines: The lines of the file.
+    :param start: The first line of the block.
+    :param count: The number of lines in the block.
+    :param data_type: The data type of the values.
+    :return: The first three values of each line (count x 3).
+    """
+    values = fromstring(' '.join(lines[start:start + count]), dtype=data_type, sep=' ')
+    return values.reshape(count, -1)[:, :3].copy()
+
+
+def _read_parts(lines):
+    """
+    Read a MODELMAN facet export. After the title and number of parts, each part has the number of vertices, the
+    vertices, the number of groups and, for each group, its name, number of faces and faces. The part name and a
+    flag line come before every part but the first.
+    :param lines: The lines of the file.
+    :return: The model name, vertices and faces.
+    """
+    number_of_parts = int(lines[1])
+
+    vertices = []
+    faces = []
+    number_of_vertices = 0
+    i = 2
+
+    for part in range(number_of_parts):
+        if part > 0:
+            i += 2
+
+        # Vertices of the part
+        n = int(lines[i].split()[0])
+        vertices.append(_block(lines, i + 1, n, float64))
+        i += n + 1
+
+        # Faces of each group, numbered from one within the part
+        number_of_groups = int(lines[i])
+        i += 1
+        for group in range(number_of_groups):
+            m = int(lines[i + 1].split()[0])
+            faces.append(_block(lines, i + 2, m, float64).astype(int64) - 1 + number_of_vertices)
+            i += m + 2
+
+        number_of_vertices += n
+
+    if not faces:
+        return lines[0].strip(), zeros([0, 3]), zeros([0, 3], dtype=int64)
+
+    return lines[0].strip(), concatenate(vertices), concatenate(faces)
+
+
+def _map(file_name, data_type, offset, rows):
+    """
+    Memory map an array of three columns from a binary file.
+    :param file_name: The name of the binary file.
+    :param data_type: The data type of the array.
+    :param offset: The offset of the array in the file (bytes).
+    :param rows: The number of rows.
+    :return: The array (rows x 3).
+    """
+    if not rows:
+        return zeros([0, 3], dtype=data_type)
+    return memmap(file_name, dtype=data_type, mode='r', offset=offset, shape=(rows, 3))
@@ -0,0 +1,92 @@
+"""
+Project: RadarBook
+File: facet_mesh.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import ascontiguousarray, cross, sqrt, where, nan, arccos, arctan2, cos, sin, zeros, intp, stack
+from Libs.rcs.bvh import BoundingVolumeHierarchy
+
+
+class FacetMesh:
+    """
+    Facet model with the geometry of each facet calculated once, stored as contiguous arrays.
+    """
+    def __init__(self, vertices, faces, model_name=''):
+        """
+        Calculate the facet geometry.
+        :param vertices: The vertices of the model (vertices x 3) (m).
+        :param faces: The vertex indices of each facet (faces x 3).
+        :param model_name: The name of the model.
+        """
+        self.model_name = model_name
+        self.vertices = ascontiguousarray(vertices, dtype=float)
+        self.faces = ascontiguousarray(faces, dtype=intp)
+
+        r1 = self.vertices[self.faces[:, 0]]
+        r2 = self.vertices[self.faces[:, 1]]
+        r3 = self.vertices[self.faces[:, 2]]
+
+        # Edge vectors (faces x edge x 3), from vertex 1 to 2, 2 to 3 and 3 to 1
+        self.edges = stack([r2 - r1, r3 - r2, r1 - r3], axis=1)
+
+        # Outward directed normals
+        normal = cross(self.edges[:, 0], self.edges[:, 1]) + 0.
+
+        # Edge lengths
+        dist = sqrt((self.edges * self.edges).sum(axis=2))
+
+        ss = 0.5 * (dist[:, 0] + dist[:, 1] + dist[:, 2])
+        self.areas = sqrt(abs(ss * (ss - dist[:, 0]) * (ss - dist[:, 1]) * (ss - dist[:, 2])))
+
+        # Unit normals, not a number for degenerate facets so they are never illuminated
+        length = sqrt((normal * normal).sum(axis=1))
+        self.normals = normal / where(length > 0.0, length, nan)[:, None]
+
+        self.centroids = (r1 + r2 + r3) / 3.0
+
+        # Rotation from global to local facet coordinates, with the local z axis along the normal
+        beta = arccos(self.normals[:, 2])
+        alpha = arctan2(self.normals[:, 1] + 0., self.normals[:, 0] + 0.)
+
+        ca = cos(alpha)
+        sa = sin(alpha)
+        cb = cos(beta)
+        sb = sin(beta)
+
+        self.rotations = zeros([len(self.faces), 3, 3])
+        self.rotations[:, 0, 0] = cb * ca
+        self.rotations[:, 0, 1] = cb * sa
+        self.rotations[:, 0, 2] = -sb
+        self.rotations[:, 1, 0] = -sa
+        self.rotations[:, 1, 1] = ca
+        self.rotations[:, 2, 0] = sb * ca
+        self.rotations[:, 2, 1] = sb * sa
+        self.rotations[:, 2, 2] = cb
+
+        # Bounding volume hierarchy, built on first use
+        self.hierarchy = None
+
+        # Illuminated facets of the latest single angle physical optics calls, keyed by the angles and shadowing
+        self.illumination = {}
+
+    def __len__(self):
+        """
+        The number of facets.
+        :return: The number of facets.
+        """
+        return len(self.faces)
+
+    def bounding_volume_hierarchy(self):
+        """
+        The bounding volume hierarchy over the facets, built once.
+        :return: The hierarchy.
+        """
+        if self.hierarchy is None:
+            self.hierarchy = BoundingVolumeHierarchy(self)
+        return self.hierarchy
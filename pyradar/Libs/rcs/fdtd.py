@@ -0,0 +1,645 @@
+"""
+Project: RadarBook
+File: fdtd.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import sqrt, sin, cos, radians, zeros, ones, full, log, exp, arange, array, fromstring, multiply, \
+    subtract, concatenate, atleast_1d, asarray
+from scipy.constants import c, epsilon_0, mu_0, pi
+from time import perf_counter
+
+
+def read_geometry_file(file_name, number_of_pml):
+    """
+    Read the FDTD geometry file and surround the geometry with the PML.
+    :param file_name: The name of the geometry file.
+    :param number_of_pml: The number of PML layers.
+    :return: The cell sizes dx and dy (m), the relative permeability, relative permittivity and conductivity (S/m)
+    of each cell.
+    """
+    with open(file_name, 'r') as file:
+        lines = file.read().splitlines()
+
+    # Header lines: comment, nx ny, comment, dx dy
+    nx, ny = [int(value) for value in lines[1].split()[:2]]
+    dx, dy = [float(value) for value in lines[3].split()[:2]]
+
+    # Cells of the geometry, one per line with the x index outermost
+    cells = fromstring(' '.join(lines[4:4 + nx * ny]), sep=' ').reshape(nx, ny, -1)
+
+    # Set up the PML areas first
+    nx += 2 * number_of_pml
+    ny += 2 * number_of_pml
+
+    mu_r = zeros([nx, ny])
+    eps_r = zeros([nx, ny])
+    sigma = zeros([nx, ny])
+
+    # Set up the maximum conductivities
+    sigma_max_x = -3.0 * epsilon_0 * c * log(1e-5) / (2.0 * dx * number_of_pml)
+    sigma_max_y = -3.0 * epsilon_0 * c * log(1e-5) / (2.0 * dy * number_of_pml)
+
+    # Create the conductivity profile
+    sigma_v = array([((m + 0.5) / (number_of_pml + 0.5)) ** 2 for m in range(number_of_pml)])
+
+    # Back and front regions
+    for region, profile in ((slice(0, number_of_pml), sigma_v[::-1]), (slice(ny - number_of_pml, ny), sigma_v)):
+        mu_r[:, region] = 1.0
+        eps_r[:, region] = 1.0
+        sigma[:, region] = sigma_max_y * profile
+
+    # Left and right regions, adding to the corners
+    for region, profile in ((slice(0, number_of_pml), sigma_v[::-1]), (slice(nx - number_of_pml, nx), sigma_v)):
+        mu_r[region] = 1.0
+        eps_r[region] = 1.0
+        sigma[region] += (sigma_max_x * profile)[:, None]
+
+    # Relative permeability, relative permittivity and conductivity of the geometry
+    interior = (slice(number_of_pml, nx - number_of_pml), slice(number_of_pml, ny - number_of_pml))
+    mu_r[interior] = cells[:, :, 0]
+    eps_r[interior] = cells[:, :, 1]
+    sigma[interior] = cells[:, :, 2]
+
+    return dx, dy, mu_r, eps_r, sigma
+
+
+class FDTDSolver:
+    """
+    Two-dimensional scattered field FDTD solver for a Gaussian pulse plane wave, in TE or TM mode.
+    Each update works on whole slices of the grid in place, with the same operations in the same order as a cell by
+    cell update, so the fields are the same to the bit. The solver does no display of its own, views subscribe to
+    field snapshots when they run it.
+    """
+    def __init__(self, mode, incident_angle, gaussian_pulse_width, gaussian_pulse_amplitude, number_of_pml, dx, dy,
+                 mu_r, eps_r, sigma):
+        """
+        Calculate the update coefficients and set the fields to zero.
+        :param mode: The mode (TE/TM).
+        :param incident_angle: The angle of the incident field (deg).
+        :param gaussian_pulse_width: The width of the Gaussian pulse (time steps).
+        :param gaussian_pulse_amplitude: The amplitude of the Gaussian pulse (V/m).
+        :param number_of_pml: The number of PML layers.
+        :param dx: The cell size in x (m).
+        :param dy: The cell size in y (m).
+        :param mu_r: The relative permeability of each cell, including the PML.
+        :param eps_r: The relative permittivity of each cell, including the PML.
+        :param sigma: The conductivity of each cell, including the PML (S/m).
+        """
+        self.mode = mode
+        self.incident_angle = incident_angle
+        self.gaussian_pulse_width = gaussian_pulse_width
+        self.gaussian_pulse_amplitude = gaussian_pulse_amplitude
+        self.number_of_pml = number_of_pml
+        self.dx = dx
+        self.dy = dy
+        self.nx, self.ny = mu_r.shape
+
+        nx = self.nx
+        ny = self.ny
+
+        # Calculate the maximum time step allowed by the Courant stability condition
+        self.dt = 1.0 / (c * (sqrt(1.0 / (self.dx ** 2) + 1.0 / (self.dy ** 2))))
+
+        # Update coefficients
+        eps = epsilon_0 * eps_r
+        mu = mu_0 * mu_r
+        self.esctc = eps / (eps + sigma * self.dt)
+        self.eincc = sigma * self.dt / (eps + sigma * self.dt)
+        self.edevcn = self.dt * (eps - epsilon_0) / (eps + sigma * self.dt)
+        self.ecrlx = self.dt / ((eps + sigma * self.dt) * self.dx)
+        self.ecrly = self.dt / ((eps + sigma * self.dt) * self.dy)
+        self.dtmdx = self.dt / (mu * self.dx)
+        self.dtmdy = self.dt / (mu * self.dy)
+        self.hdhvcn = self.dt * (mu - mu_0) / mu
+
+        # Fields
+        if self.mode == 'TE':
+            self.exi = zeros([nx, ny])
+            self.eyi = zeros([nx, ny])
+            self.dexi = zeros([nx, ny])
+            self.deyi = zeros([nx, ny])
+            self.exs = zeros([nx, ny])
+            self.eys = zeros([nx, ny])
+            self.hzs = zeros([nx, ny])
+            self.dhzi = zeros([nx, ny])
+        else:
+            self.hxs = zeros([nx, ny])
+            self.hys = zeros([nx, ny])
+            self.dhxi = zeros([nx, ny])
+            self.dhyi = zeros([nx, ny])
+            self.ezs = zeros([nx, ny])
+            self.ezi = zeros([nx, ny])
+            self.dezi = zeros([nx, ny])
+
+        # Amplitude of incident field components
+        self.amplitude_x = -self.gaussian_pulse_amplitude * sin(radians(self.incident_angle))
+        self.amplitude_y = self.gaussian_pulse_amplitude * cos(radians(self.incident_angle))
+
+        # Incident field cells, inside the PML
+        self.interior = (slice(number_of_pml, nx - number_of_pml), slice(number_of_pml, ny - number_of_pml))
+
+        # Spatial delay of each cell
+        delay = 0.0
+        x_disp = -cos(radians(self.incident_angle))
+        y_disp = -sin(radians(self.incident_angle))
+
+        if x_disp < 0:
+            delay -= x_disp * (nx - 2.0) * self.dx
+
+        if y_disp < 0:
+            delay -= y_disp * (ny - 2.0) * self.dy
+
+        i = arange(number_of_pml, nx - number_of_pml)[:, None] * ones(max(ny - 2 * number_of_pml, 0))
+        j = ones(max(nx - 2 * number_of_pml, 0))[:, None] * arange(number_of_pml, ny - number_of_pml)
+        self.transit_time = (i * self.dx * x_disp + j * self.dy * y_disp + delay) / c
+
+        # Gaussian pulse and its derivative for the incident field cells
+        self.a = zeros(self.transit_time.shape)
+        self.a_prime = zeros(self.transit_time.shape)
+
+        # Work arrays for the updates
+        self.work = zeros([nx, ny])
+        self.incident_work = zeros([nx, ny])
+
+        # Start at time = 0
+        self.t = 0.0
+        self.step = 0
+
+    def time_step(self):
+        """
+        Advance the fields by one time step.
+        :return:
+        """
+        if self.mode == 'TE':
+            self.escattered_te(self.t)
+        else:
+            self.escattered_tm(self.t)
+
+        # Advance the time by 1/2 time step
+        self.t += 0.5 * self.dt
+
+        if self.mode == 'TE':
+            self.hscattered_te(self.t)
+        else:
+            self.hscattered_tm(self.t)
+
+        # Advance the time by 1/2 time step
+        self.t += 0.5 * self.dt
+        self.step += 1
+
+    def run(self, number_of_time_steps, callback=None, every_steps=None, every_milliseconds=None,
+            near_to_far_field=None, tolerance=None):
+        """
+        Run a number of time steps, passing snapshots of the total field to a callback.
+        Snapshots are taken every_steps time steps or every_milliseconds of run time, whichever comes first, after
+        every time step if neither is given, and always after the last time step. Without a callback no snapshots are
+        taken, for batch runs. With a near to far field transform and a tolerance, the run stops early once the residual
+        of the transform is within the tolerance.
+        :param number_of_time_steps: The largest number of time steps to run.
+        :param callback: Function of the time step, the time (s) and the total electric field (V/m), or None.
+        :param every_steps: The number of time steps between snapshots.
+        :param every_milliseconds: The run time between snapshots (ms).
+        :param near_to_far_field: The near to far field transform to accumulate after each time step, or None.
+        :param tolerance: The residual of the transform to stop at, or None to run all the time steps.
+        :return:
+        """
+        last = perf_counter()
+
+        for n in range(number_of_time_steps):
+            self.time_step()
+
+            converged = False
+            if near_to_far_field is not None:
+                near_to_far_field.accumulate()
+                converged = tolerance is not None and near_to_far_field.residual() <= tolerance
+
+            if callback is None:
+                if converged:
+                    break
+                continue
+
+            # Snapshot when one of the cadences is due, or after the last time step
+            due = n == number_of_time_steps - 1 or converged or (every_steps is None and every_milliseconds is None)
+            if every_steps is not None and self.step % every_steps == 0:
+                due = True
+            if every_milliseconds is not None and 1000.0 * (perf_counter() - last) >= every_milliseconds:
+                due = True
+
+            if due:
+                callback(self.step, self.t, self.total_field())
+                last = perf_counter()
+
+            if converged:
+                break
+
+    def total_field(self):
+        """
+        The total electric field, the magnitude of the in-plane field for TE mode.
+        :return: The total electric field (V/m).
+        """
+        if self.mode == 'TM':
+            return self.ezi + self.ezs
+        return sqrt((self.exi + self.exs) ** 2 + (self.eyi + self.eys) ** 2)
+
+    def gaussian_pulse(self, t):
+        """
+        Calculate the Gaussian pulse and its time derivative at the incident field cells.
+        :param t: Time (s).
+        :return:
+        """
+        # Calculate the decay rate determined by Gaussian pulse width
+        alpha = (1.0 / (self.dt * self.gaussian_pulse_width / 4.0)) ** 2
+
+        # Calculate the period
+        period = 2.0 * self.dt * self.gaussian_pulse_width
+
+        tau = t - self.transit_time
+        on = (0 <= tau) & (tau <= period)
+        shift = tau[on] - self.gaussian_pulse_width * self.dt
+
+        self.a[...] = 0.0
+        self.a_prime[...] = 0.0
+        self.a[on] = exp(-alpha * _square(shift))
+        self.a_prime[on] = self.a[on] * (-2.0 * alpha * shift)
+
+    def eincident_te(self, t):
+        """
+        Calculate the incident electric field for TE mode.
+        :param t: Time (s).
+        :return:
+        """
+        self.gaussian_pulse(t)
+
+        multiply(self.amplitude_x, self.a, out=self.exi[self.interior])
+        multiply(self.amplitude_x, self.a_prime, out=self.dexi[self.interior])
+        multiply(self.amplitude_y, self.a, out=self.eyi[self.interior])
+        multiply(self.amplitude_y, self.a_prime, out=self.deyi[self.interior])
+
+    def escattered_te(self, t):
+        """
+        Calculate the scattered electric field for TE mode.
+        :param t: Time (s).
+        :return:
+        """
+        # Calculate the incident electric field
+        self.eincident_te(t)
+
+        nx = self.nx
+        ny = self.ny
+
+        # Update the x-component electric scattered field, the cell before the first column is the last column
+        cells = (slice(0, nx - 1), slice(0, ny - 1))
+        curl = self.work[cells]
+        subtract(self.hzs[:nx - 1, 1:ny - 1], self.hzs[:nx - 1, :ny - 2], out=curl[:, 1:])
+        subtract(self.hzs[:nx - 1, 0], self.hzs[:nx - 1, -1], out=curl[:, 0])
+        curl *= self.ecrly[cells]
+        self._update(self.exs[cells], self.esctc[cells], self.eincc[cells], self.exi[cells], self.edevcn[cells],
+                     self.dexi[cells], curl)
+
+        # Update the y-component electric scattered field
+        cells = (slice(1, nx - 1), slice(0, ny - 1))
+        curl = self.work[cells]
+        subtract(self.hzs[1:nx - 1, :ny - 1], self.hzs[:nx - 2, :ny - 1], out=curl)
+        curl *= self.ecrlx[cells]
+        curl *= -1.0
+        self._update(self.eys[cells], self.esctc[cells], self.eincc[cells], self.eyi[cells], self.edevcn[cells],
+                     self.deyi[cells], curl)
+
+    def hincident_te(self, t):
+        """
+        Calculate the incident magnetic field for TE mode.
+        :param t: Time (s).
+        :return:
+        """
+        eta = sqrt(mu_0 / epsilon_0)
+
+        self.gaussian_pulse(t)
+
+        multiply(self.gaussian_pulse_amplitude, self.a_prime, out=self.dhzi[self.interior])
+        self.dhzi[self.interior] /= eta
+
+    def hscattered_te(self, t):
+        """
+        Calculate the scattered magnetic field for TE mode.
+        :param t: Time (s).
+        :return:
+        """
+        # Calculate the incident magnetic field
+        self.hincident_te(t)
+
+        nx = self.nx
+        ny = self.ny
+
+        # Update the scattered magnetic field
+        cells = (slice(0, nx - 1), slice(0, ny - 1))
+        hzs = self.hzs[cells]
+        work = self.work[cells]
+
+        subtract(self.eys[1:nx, :ny - 1], self.eys[:nx - 1, :ny - 1], out=work)
+        work *= self.dtmdx[cells]
+        hzs -= work
+
+        subtract(self.exs[:nx - 1, 1:ny], self.exs[:nx - 1, :ny - 1], out=work)
+        work *= self.dtmdy[cells]
+        hzs += work
+
+        multiply(self.hdhvcn[cells], self.dhzi[cells], out=work)
+        hzs -= work
+
+    def eincident_tm(self, t):
+        """
+        Calculate the incident electric field for TM mode.
+        :param t: Time (s).
+        :return:
+        """
+        self.gaussian_pulse(t)
+
+        multiply(self.gaussian_pulse_amplitude, self.a, out=self.ezi[self.interior])
+        multiply(self.gaussian_pulse_amplitude, self.a_prime, out=self.dezi[self.interior])
+
+    def escattered_tm(self, t):
+        """
+        Calculate the scattered electric field for TM mode.
+        :param t: Time (s).
+        :return:
+        """
+        # Calculate the incident electric field
+        self.eincident_tm(t)
+
+        nx = self.nx
+        ny = self.ny
+
+        # Update the z-component electric scattered field
+        cells = (slice(1, nx - 1), slice(1, ny - 1))
+        ezs = self.ezs[cells]
+        work = self.work[cells]
+
+        ezs *= self.esctc[cells]
+        multiply(self.eincc[cells], self.ezi[cells], out=work)
+        ezs -= work
+        multiply(self.edevcn[cells], self.dezi[cells], out=work)
+        ezs -= work
+
+        subtract(self.hys[1:nx - 1, 1:ny - 1], self.hys[:nx - 2, 1:ny - 1], out=work)
+        work *= self.ecrlx[cells]
+        ezs += work
+
+        subtract(self.hxs[1:nx - 1, 1:ny - 1], self.hxs[1:nx - 1, :ny - 2], out=work)
+        work *= self.ecrly[cells]
+        ezs -= work
+
+    def hincident_tm(self, t):
+        """
+        Calculate the incident magnetic field for TM mode.
+        :param t: Time (s).
+        :return:
+        """
+        eta = sqrt(mu_0 / epsilon_0)
+
+        self.gaussian_pulse(t)
+
+        multiply(self.gaussian_pulse_amplitude, self.a_prime, out=self.dhxi[self.interior])
+        self.dhxi[self.interior] /= eta
+        self.dhyi[self.interior] = self.dhxi[self.interior]
+
+    def hscattered_tm(self, t):
+        """
+        Calculate the scattered magnetic field for TM mode.
+        :param t: Time (s).
+        :return:
+        """
+        # Calculate the incident magnetic field
+        self.hincident_tm(t)
+
+        nx = self.nx
+        ny = self.ny
+
+        # Update the x-component of the magnetic scattered field
+        cells = (slice(1, nx - 1), slice(0, ny - 1))
+        work = self.work[cells]
+        subtract(self.ezs[1:nx - 1, 1:ny], self.ezs[1:nx - 1, :ny - 1], out=work)
+        work *= self.dtmdx[cells]
+        self.hxs[cells] -= work
+
+        # Update the y-component of the magnetic scattered field
+        cells = (slice(0, nx - 1), slice(1, ny - 1))
+        work = self.work[cells]
+        subtract(self.ezs[1:nx, 1:ny - 1], self.ezs[:nx - 1, 1:ny - 1], out=work)
+        work *= self.dtmdx[cells]
+        self.hys[cells] += work
+
+    def _update(self, field, esctc, eincc, incident, edevcn, derivative, curl):
+        """
+        Update a scattered electric field component in place, field = field * esctc - eincc * incident -
+        edevcn * derivative + curl.
+        :param field: The scattered field cells.
+        :param esctc: The scattered field coefficients.
+        :param eincc: The incident field coefficients.
+        :param incident: The incident field cells.
+        :param edevcn: The incident field derivative coefficients.
+        :param derivative: The incident field derivative cells.
+        :param curl: The curl term of the magnetic field, overwritten.
+        :return:
+        """
+        term = self.incident_work[:field.shape[0], :field.shape[1]]
+
+        field *= esctc
+        multiply(eincc, incident, out=term)
+        field -= term
+        multiply(edevcn, derivative, out=term)
+        field -= term
+        field += curl
+
+
+class NearToFarField:
+    """
+    Near to far field transform of the scattered field on a rectangular contour inside the PML.
+    The tangential scattered fields on the contour are transformed to the frequency domain with running DFTs as the
+    solver steps, so one Gaussian pulse run gives the scattering at every frequency of the list, while only the
+    contour is kept in memory. The equivalent currents on the contour then radiate the two-dimensional far field.
+    For TM mode the contour passes through the Ez nodes, and for TE mode through the Hz nodes, with the other
+    fields averaged onto the nodes. A scatterer can hold a static field after the pulse has passed, flux trapped
+    by a conductor for example, so the last fields on the contour are carried on to infinite time in closed form
+    rather than the DFTs being cut off. The run has converged once the fields on the contour no longer change.
+    """
+    def __init__(self, solver, frequency, offset=2):
+        """
+        Set up the contour and the running DFTs.
+        :param solver: The FDTD solver.
+        :param frequency: The frequencies of the transform (Hz).
+        :param offset: The number of cells between the PML and the contour, which must enclose the scatterer.
+        """
+        self.solver = solver
+        self.frequency = atleast_1d(asarray(frequency, dtype=float))
+
+        # Corners of the contour
+        i0 = solver.number_of_pml + offset
+        j0 = solver.number_of_pml + offset
+        i1 = solver.nx - solver.number_of_pml - offset - 2
+        j1 = solver.ny - solver.number_of_pml - offset - 2
+
+        # Nodes, outward normals and trapezoidal weights of the bottom, right, top and left sides
+        i = []
+        j = []
+        normal_x = []
+        normal_y = []
+        weight = []
+        for first, last, fixed, along_x, nx, ny, d in ((i0, i1, j0, True, 0.0, -1.0, solver.dx),
+                                                       (j0, j1, i1, False, 1.0, 0.0, solver.dy),
+                                                       (i0, i1, j1, True, 0.0, 1.0, solver.dx),
+                                                       (j0, j1, i0, False, -1.0, 0.0, solver.dy)):
+            m = arange(first, last + 1)
+            i.append(m if along_x else full(len(m), fixed))
+            j.append(full(len(m), fixed) if along_x else m)
+            normal_x.append(full(len(m), nx))
+            normal_y.append(full(len(m), ny))
+            w = full(len(m), d)
+            w[[0, -1]] *= 0.5
+            weight.append(w)
+
+        self.i = concatenate(i)
+        self.j = concatenate(j)
+        self.normal_x = concatenate(normal_x)
+        self.normal_y = concatenate(normal_y)
+        self.weight = concatenate(weight)
+
+        # Position of the nodes, the Hz nodes are at the cell centers
+        shift = 0.5 if solver.mode == 'TE' else 0.0
+        self.x = (self.i + shift) * solver.dx
+        self.y = (self.j + shift) * solver.dy
+
+        # Running DFTs of the tangential electric and magnetic fields on the contour
+        self.electric = zeros([len(self.frequency), len(self.i)], dtype=complex)
+        self.magnetic = zeros([len(self.frequency), len(self.i)], dtype=complex)
+
+        # Last fields on the contour, their change over the last time step and the largest change of the run
+        self.e = zeros(len(self.i))
+        self.h = zeros(len(self.i))
+        self.change = 0.0
+        self.peak_change = 0.0
+
+    def accumulate(self):
+        """
+        Add the fields on the contour to the running DFTs, after a time step of the solver.
+        :return:
+        """
+        solver = self.solver
+        i = self.i
+        j = self.j
+
+        # Times of the electric and magnetic fields of the last time step
+        omega = 2.0 * pi * self.frequency
+        te = solver.t - solver.dt
+        th = solver.t - 0.5 * solver.dt
+
+        if solver.mode == 'TE':
+            # Hz and the z-component of n x E, with Ex and Ey averaged onto the Hz nodes
+            ex = 0.5 * (solver.exs[i, j] + solver.exs[i, j + 1])
+            ey = 0.5 * (solver.eys[i, j] + solver.eys[i + 1, j])
+            e = self.normal_x * ey - self.normal_y * ex
+            h = solver.hzs[i, j]
+        else:
+            # Ez and the z-component of n x H, with Hx and Hy averaged onto the Ez nodes
+            hx = 0.5 * (solver.hxs[i, j - 1] + solver.hxs[i, j])
+            hy = 0.5 * (solver.hys[i - 1, j] + solver.hys[i, j])
+            e = solver.ezs[i, j]
+            h = self.normal_x * hy - self.normal_y * hx
+
+        self.electric += multiply.outer(exp(-1j * omega * te), e)
+        self.magnetic += multiply.outer(exp(-1j * omega * th), h)
+
+        # Change of the fields over the time step, with the magnetic field scaled to the electric field
+        eta = sqrt(mu_0 / epsilon_0)
+        self.change = max(abs(e - self.e).max(), eta * abs(h - self.h).max())
+        self.peak_change = max(self.peak_change, self.change)
+        self.e = e
+        self.h = h
+
+    def residual(self):
+        """
+        The change of the fields on the contour over the last time step, relative to the largest change of the run.
+        The transform has converged when this is small, with the fields on the contour steady or died away.
+        :return: The residual.
+        """
+        if self.peak_change == 0.0:
+            return 1.0
+        return self.change / self.peak_change
+
+    def incident_spectrum(self):
+        """
+        The spectrum of the incident Gaussian pulse, sampled at the time steps as in the solver.
+        :return: The spectrum of the incident electric field at each frequency (V/m/Hz).
+        """
+        solver = self.solver
+        alpha = (1.0 / (solver.dt * solver.gaussian_pulse_width / 4.0)) ** 2
+
+        # The pulse is zero after its period
+        t = arange(int(2.0 * solver.gaussian_pulse_width) + 1) * solver.dt
+        pulse = solver.gaussian_pulse_amplitude * exp(-alpha * (t - solver.gaussian_pulse_width * solver.dt) ** 2)
+
+        return exp(-2j * pi * multiply.outer(self.frequency, t)) @ pulse * solver.dt
+
+    def far_field(self, observation_angle):
+        """
+        Calculate the far field pattern of the equivalent currents on the contour.
+        :param observation_angle: The observation angles (deg).
+        :return: The far field integral at each frequency and angle (frequency x angle), with the scattered field
+        sqrt(jk / (8 pi r)) exp(-jkr) times the integral for TM mode and the same over -eta for TE mode.
+        """
+        solver = self.solver
+        eta = sqrt(mu_0 / epsilon_0)
+        phi = radians(atleast_1d(asarray(observation_angle, dtype=float)))
+
+        # Direction of observation along the normal of each node
+        normal = multiply.outer(cos(phi), self.normal_x) + multiply.outer(sin(phi), self.normal_y)
+        projection = multiply.outer(cos(phi), self.x) + multiply.outer(sin(phi), self.y)
+
+        # Sum over the time steps to come of the last fields, exp(-jwt) over t = t_n + dt, t_n + 2 dt, ...
+        omega = 2.0 * pi * self.frequency
+        ratio = exp(-1j * omega * solver.dt)
+        tail = ratio / (1.0 - ratio)
+        te = solver.t - solver.dt
+        th = solver.t - 0.5 * solver.dt
+
+        field = zeros([len(self.frequency), len(phi)], dtype=complex)
+
+        for n, f in enumerate(self.frequency):
+            k = 2.0 * pi * f / c
+            e = (self.electric[n] + self.e * exp(-1j * omega[n] * te) * tail[n]) * solver.dt
+            h = (self.magnetic[n] + self.h * exp(-1j * omega[n] * th) * tail[n]) * solver.dt
+
+            # Radiation of the electric and magnetic currents
+            if solver.mode == 'TE':
+                current = -(eta * normal * h + e)
+            else:
+                current = normal * e - eta * h
+
+            field[n] = (current * exp(1j * k * projection)) @ self.weight
+
+        return field
+
+    def radar_cross_section(self, observation_angle):
+        """
+        Calculate the bistatic radar cross section per unit length.
+        :param observation_angle: The observation angles (deg).
+        :return: The radar cross section at each frequency and angle (frequency x angle) (m).
+        """
+        k = 2.0 * pi * self.frequency / c
+        incident = abs(self.incident_spectrum()) ** 2
+        return 0.25 * k[:, None] * abs(self.far_field(observation_angle)) ** 2 / incident[:, None]
+
+
+def _square(x):
+    """
+    Square each value with the scalar power function, which can differ from x * x in the last bit, as in the cell by
+    cell update.
+    :param x: The values.
+    :return: The squares.
+    """
+    return (x.astype(object) ** 2).astype(float)
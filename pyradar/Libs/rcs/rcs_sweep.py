@@ -0,0 +1,251 @@
+"""
+Project: RadarBook
+File: rcs_sweep.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import asarray, atleast_1d, broadcast_arrays, column_stack, zeros, fromfile, concatenate, int64, float64, \
+    repeat, tile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from Libs.utils.shared_arrays import digest, share, shared_array
+from Libs.rcs.facet_mesh import FacetMesh
+from Libs.rcs.scattering_matrix import physical_optics_sweep
+
+
+# Values in each record of the store: theta_inc, phi_inc, theta_obs, phi_obs, frequency, then the real and
+# imaginary parts of VV, HV, VH and HH
+RECORD_LENGTH = 13
+
+
+def rcs_sweep(mesh, frequency, theta_inc, phi_inc, theta_obs, phi_obs, store_path=None, angle_block=64,
+              frequency_block=64, number_of_workers=1, block_size=262144, shadowing=False):
+    """
+    Calculate the physical optics scattering matrix over a grid of angles and frequencies.
+    The grid is split into cells of angle_block angles by frequency_block frequencies, which are shared between
+    worker processes holding the mesh in shared memory. With a store, each cell is written to disk as it finishes,
+    and cells already in the store are read back instead of being calculated, so an interrupted sweep resumes where
+    it stopped.
+    :param mesh: The facet mesh of the target.
+    :param frequency: The frequency array (Hz).
+    :param theta_inc: The incident theta angles (rad).
+    :param phi_inc: The incident phi angles (rad).
+    :param theta_obs: The observation theta angles (rad).
+    :param phi_obs: The observation phi angles (rad).
+    :param store_path: The directory of the result store, None to keep the results in memory only.
+    :param angle_block: The number of angles in a cell.
+    :param frequency_block: The number of frequencies in a cell.
+    :param number_of_workers: The number of worker processes.
+    :param block_size: The number of facet x frequency samples integrated together.
+    :param shadowing: True to remove the facets hidden by other facets.
+    :return: The scattering matrix [VV, HV, VH, HH] (4 x angles x frequency).
+    """
+    frequency = atleast_1d(asarray(frequency, dtype=float))
+
+    # Flatten the angles, broadcast against each other
+    angles = broadcast_arrays(*[asarray(angle, dtype=float) for angle in (theta_inc, phi_inc, theta_obs, phi_obs)])
+    angles = column_stack([angle.ravel() for angle in angles])
+
+    scattering_matrix = zeros((4, len(angles), len(frequency)), dtype=complex)
+    done = zeros((len(angles), len(frequency)), dtype=bool)
+
+    # Results already in the store
+    store = None
+    if store_path is not None:
+        store = SweepStore(store_path, mesh, shadowing)
+        done = store.read(angles, frequency, scattering_matrix)
+
+    # Cells with any result missing
+    cells = [(slice(a, a + angle_block), slice(f, f + frequency_block))
+             for a in range(0, len(angles), angle_block) for f in range(0, len(frequency), frequency_block)]
+    cells = [(a, f) for a, f in cells if not done[a, f].all()]
+    tasks = [(angles[a], frequency[f]) for a, f in cells]
+    settings = (block_size, shadowing)
+
+    if not tasks:
+        return scattering_matrix
+
+    if number_of_workers <= 1:
+        results = map(_sweep_task, tasks, [settings] * len(tasks), [mesh] * len(tasks))
+        _write(cells, tasks, results, store, scattering_matrix)
+    else:
+        # Place the vertices and faces in shared memory for the worker processes
+        shared = {'vertices': share(mesh.vertices), 'faces': share(mesh.faces.astype(int64))}
+        with ProcessPoolExecutor(number_of_workers, initializer=_attach, initargs=(shared, mesh.model_name)) as pool:
+            results = pool.map(_sweep_task, tasks, [settings] * len(tasks))
+            _write(cells, tasks, results, store, scattering_matrix)
+
+    return scattering_matrix
+
+
+class SweepStore:
+    """
+    Scattering matrices on disk for one mesh, as records of (angles, frequency, scattering matrix) appended as the
+    cells of a sweep finish. The store for a mesh is a directory named by the digest of its vertices and faces, and
+    an index from the angles and frequency of each record to its row is built when the store is opened.
+    """
+    def __init__(self, store_path, mesh, shadowing=False):
+        """
+        Open the store for a mesh, creating it the first time.
+        :param store_path: The directory of the store.
+        :param mesh: The facet mesh of the target.
+        :param shadowing: True for results with the facets hidden by other facets removed.
+        """
+        key = digest(mesh.vertices, mesh.faces.astype(int64)) + ('_shadowing' if shadowing else '')
+        self.path = Path(store_path) / key
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.record_file = self.path / 'records.dat'
+
+        # Whole records only, a sweep may have stopped part way through writing one
+        records = zeros((0, RECORD_LENGTH))
+        if self.record_file.exists():
+            records = fromfile(self.record_file, dtype=float64)
+            records = records[:len(records) - len(records) % RECORD_LENGTH].reshape(-1, RECORD_LENGTH)
+            with open(self.record_file, 'r+b') as file:
+                file.truncate(records.nbytes)
+
+        self.records = [records]
+        self.index = {row.tobytes(): i for i, row in enumerate(records[:, :5])}
+
+    def __len__(self):
+        """
+        The number of records.
+        :return: The number of records.
+        """
+        return len(self.index)
+
+    def read(self, angles, frequency, scattering_matrix):
+        """
+        Read the stored results for a grid of angles and frequencies.
+        :param angles: The angles (angles x 4) (rad).
+        :param frequency: The frequency array (Hz).
+        :param scattering_matrix: The scattering matrix to fill in (4 x angles x frequency).
+        :return: True for each angle and frequency found in the store (angles x frequency).
+        """
+        records = self._records()
+        rows = [self.index.get(key, -1) for key in _keys(angles, frequency)]
+        rows = asarray(rows, dtype=int64).reshape(len(angles), len(frequency))
+        found = rows >= 0
+
+        values = records[rows[found], 5:]
+        scattering_matrix[:, found] = (values[:, 0::2] + 1j * values[:, 1::2]).T
+
+        return found
+
+    def write(self, angles, frequency, scattering_matrix):
+        """
+        Append the results for a grid of angles and frequencies, skipping those already stored.
+        :param angles: The angles (angles x 4) (rad).
+        :param frequency: The frequency array (Hz).
+        :param scattering_matrix: The scattering matrix (4 x angles x frequency).
+        :return:
+        """
+        records = _grid(angles, frequency, RECORD_LENGTH)
+        values = scattering_matrix.reshape(4, -1).T
+        records[:, 5::2] = values.real
+        records[:, 6::2] = values.imag
+
+        # Records not yet in the store
+        keys = [row.tobytes() for row in records[:, :5]]
+        new = {}
+        rows = []
+        for i, key in enumerate(keys):
+            if key not in self.index and key not in new:
+                new[key] = len(self) + len(new)
+                rows.append(i)
+        records = records[rows]
+
+        with open(self.record_file, 'ab') as file:
+            records.tofile(file)
+
+        self.index.update(new)
+        self.records.append(records)
+
+    def _records(self):
+        """
+        All records as one array.
+        :return: The records (records x RECORD_LENGTH).
+        """
+        if len(self.records) > 1:
+            self.records = [concatenate(self.records)]
+        return self.records[0]
+
+
+def _write(cells, tasks, results, store, scattering_matrix):
+    """
+    Place the results of each cell in the scattering matrix, and in the store as they arrive.
+    :param cells: The angle and frequency slices of each cell.
+    :param tasks: The angles and frequencies of each cell.
+    :param results: The scattering matrix of each cell, in cell order.
+    :param store: The result store, or None.
+    :param scattering_matrix: The scattering matrix to fill in (4 x angles x frequency).
+    :return:
+    """
+    for (a, f), (angles, frequency), values in zip(cells, tasks, results):
+        scattering_matrix[:, a, f] = values
+
+        if store is not None:
+            store.write(angles, frequency, values)
+
+
+def _keys(angles, frequency):
+    """
+    Store keys for a grid of angles and frequencies, angle by angle.
+    :param angles: The angles (angles x 4) (rad).
+    :param frequency: The frequency array (Hz).
+    :return: The keys.
+    """
+    return [row.tobytes() for row in _grid(angles, frequency, 5)]
+
+
+def _grid(angles, frequency, length):
+    """
+    Records for a grid of angles and frequencies, angle by angle, with the angles and frequency filled in.
+    :param angles: The angles (angles x 4) (rad).
+    :param frequency: The frequency array (Hz).
+    :param length: The number of values in each record.
+    :return: The records.
+    """
+    records = zeros((len(angles) * len(frequency), length))
+
+    # Negative zero is stored as zero so that both give the same key
+    records[:, :4] = repeat(angles, len(frequency), axis=0) + 0.0
+    records[:, 4] = tile(frequency, len(angles)) + 0.0
+    return records
+
+
+# Mesh of a worker process
+_worker_state = {}
+
+
+def _attach(shared, model_name):
+    """
+    Build the mesh of a worker process from the shared vertices and faces.
+    :param shared: The shared buffers, shapes and data types of the vertices and faces.
+    :param model_name: The name of the model.
+    :return:
+    """
+    _worker_state['mesh'] = FacetMesh(shared_array(*shared['vertices']), shared_array(*shared['faces']),
+                                      model_name)
+
+
+def _sweep_task(task, settings, mesh=None):
+    """
+    Calculate the scattering matrix of one cell.
+    :param task: The angles (angles x 4) (rad) and frequencies (Hz) of the cell.
+    :param settings: The block size and shadowing.
+    :param mesh: The facet mesh of the target, the mesh of the worker process if None.
+    :return: The scattering matrix of the cell (4 x angles x frequency).
+    """
+    if mesh is None:
+        mesh = _worker_state['mesh']
+
+    angles, frequency = task
+    block_size, shadowing = settings
+    return physical_optics_sweep(mesh, frequency, angles[:, 0], angles[:, 1], angles[:, 2],
+                                 angles[:, 3], block_size, shadowing)
@@ -9,9 +9,16 @@ Copyright (C) 2019 Artech House (artech@artechhouse.com)
 This file is part of Introduction to Radar Using Python and MATLAB
 and can not be copied and/or distributed without the express permission of Artech House.
 """
-from numpy import array, zeros, sin, cos, exp, cross, sum, sqrt, dot, arctan2, arccos, sign
+from numpy import array, zeros, sin, cos, exp, sqrt, arctan2, sign, asarray, atleast_1d, where, broadcast_to, \
+    broadcast_arrays, concatenate, diff, add, stack, matmul, ascontiguousarray, intp
 from scipy.constants import c, pi
-from scipy.linalg import norm
+from Libs.rcs.facet_mesh import FacetMesh
+from Libs.rcs.adaptive_frequency import adaptive_sweep
+from Libs.utils.shared_arrays import digest
+
+
+# Number of single angle illuminations kept on each mesh
+ILLUMINATION_CACHE_SIZE = 64
 
 
 class ScatteringMatrix(object):
@@ -20,7 +27,7 @@ class ScatteringMatrix(object):
     """
     def __init__(self, theta_inc=0.0, phi_inc=0.0, theta_obs=0.0, phi_obs=0.0, frequency=array([10.0e9]),
                  vertices=array([[10.0, 10.0, 0.0], [0.0, 10.0, 0.0], [0.0, 0.0, 0.0], [10.0, 0.0, 0.0]]),
-                 faces=array([[0, 1, 2], [2, 3, 0]])):
+                 faces=array([[0, 1, 2], [2, 3, 0]]), mesh=None, shadowing=False):
 
         # Incident and observation angles
         self.theta_inc = theta_inc
@@ -31,9 +38,17 @@ class ScatteringMatrix(object):
         # List of frequencies
         self.frequency = frequency
 
-        # Target geometry
+        # Target geometry, the facet geometry is calculated on first use unless a mesh is given
+        self.mesh = mesh
+        if mesh is not None:
+            vertices = mesh.vertices
+            faces = mesh.faces
         self.vertices = vertices
         self.faces = faces
+        self.mesh_digest = None if mesh is None else _geometry_digest(vertices, faces)
+
+        # Remove the facets hidden from the radar or the observer by other facets
+        self.shadowing = shadowing
 
     def get_scattering_matrix(self):
         """
@@ -41,174 +56,374 @@ class ScatteringMatrix(object):
         Scattering matrix is calculated in linear polarization [VV, HV, VH, HH]
         If needed, convert to circular [RR, LR, RL, LL] with linear_to_circular.
         """
-        # Size the scattering matrix
-        scattering_matrix = zeros((4, len(self.frequency)), dtype=complex)
+        return physical_optics(self.facet_mesh(), self.frequency, self.theta_inc, self.phi_inc, self.theta_obs,
+                               self.phi_obs, shadowing=self.shadowing)
+
+    def get_scattering_matrices(self, theta_inc=None, phi_inc=None, theta_obs=None, phi_obs=None, frequency=None,
+                                block_size=262144):
+        """
+        Calculates the normalized scattering matrix for a set of incident and observation angles in one call.
+        The angles are broadcast together, so a monostatic sweep passes the same array for the incident and
+        observation angles and a bistatic sweep passes a single incident angle. Angles or frequencies not given are
+        taken from the object.
+        :param theta_inc: The incident theta angles (rad).
+        :param phi_inc: The incident phi angles (rad).
+        :param theta_obs: The observation theta angles (rad).
+        :param phi_obs: The observation phi angles (rad).
+        :param frequency: The frequency array (Hz).
+        :param block_size: The number of facet x frequency samples integrated together.
+        :return: The scattering matrix [VV, HV, VH, HH] (4 x angles x frequency).
+        """
+        def given(value, default):
+            return default if value is None else value
+
+        return physical_optics_sweep(self.facet_mesh(), given(frequency, self.frequency),
+                                     given(theta_inc, self.theta_inc), given(phi_inc, self.phi_inc),
+                                     given(theta_obs, self.theta_obs), given(phi_obs, self.phi_obs), block_size,
+                                     self.shadowing)
+
+    def get_scattering_matrix_adaptive(self, tolerance=1e-3, initial_samples=9, samples_per_step=4,
+                                       max_samples=None):
+        """
+        Calculates the normalized scattering matrix over the frequencies of the object from a rational model fit to
+        a subset of them, adding frequencies until the model is within the tolerance.
+        :param tolerance: The error allowed, relative to the largest scattering matrix element.
+        :param initial_samples: The number of frequencies calculated first.
+        :param samples_per_step: The number of frequencies added at each step.
+        :param max_samples: The largest number of frequencies calculated, no limit if None.
+        :return: The scattering matrix [VV, HV, VH, HH] (4 x frequency), the error estimate and the frequencies
+        calculated.
+        """
+        return adaptive_physical_optics(self.facet_mesh(), self.frequency, self.theta_inc, self.phi_inc,
+                                        self.theta_obs, self.phi_obs, tolerance, initial_samples, samples_per_step,
+                                        max_samples, shadowing=self.shadowing)
+
+    def facet_mesh(self):
+        """
+        The facet geometry of the target, calculated again only when the vertices or faces change, whether they are
+        replaced or edited in place.
+        :return: The facet mesh.
+        """
+        geometry_digest = _geometry_digest(self.vertices, self.faces)
+        if self.mesh is None or geometry_digest != self.mesh_digest:
+            self.mesh = FacetMesh(self.vertices, self.faces)
+            self.mesh_digest = geometry_digest
+
+        return self.mesh
+
+
+def physical_optics(mesh, frequency, theta_inc, phi_inc, theta_obs, phi_obs, block_size=262144, shadowing=False):
+    """
+    Calculate the normalized scattering matrix with the physical optics currents on the illuminated facets.
+    The illuminated facets, their currents for a unit surface integral and their phase paths depend only on the
+    angles, and are kept on the mesh for the latest angles, so calls at the same angles over other frequencies
+    only calculate the surface integrals.
+    :param mesh: The facet mesh of the target.
+    :param frequency: The frequency array (Hz).
+    :param theta_inc: The incident theta angle (rad).
+    :param phi_inc: The incident phi angle (rad).
+    :param theta_obs: The observation theta angle (rad).
+    :param phi_obs: The observation phi angle (rad).
+    :param block_size: The number of facet x frequency samples integrated together.
+    :param shadowing: True to remove the facets hidden by other facets.
+    :return: The scattering matrix in linear polarization [VV, HV, VH, HH] (4 x frequency).
+    """
+    frequency = atleast_1d(asarray(frequency, dtype=float))
+
+    key = (float(theta_inc), float(phi_inc), float(theta_obs), float(phi_obs), shadowing)
+    illumination = mesh.illumination.get(key)
+    if illumination is None:
+        _, facet, coefficients, vertex_paths = _illumination(mesh, _angle_vectors(*key[:4]), shadowing)
+        illumination = coefficients, vertex_paths, mesh.areas[facet]
+
+        # Keep the latest angles only
+        if len(mesh.illumination) >= ILLUMINATION_CACHE_SIZE:
+            del mesh.illumination[next(iter(mesh.illumination))]
+        mesh.illumination[key] = illumination
+
+    coefficients, vertex_paths, area = illumination
+
+    # Wavelength
+    wavelength = c / frequency
 
-        # Wavelength
-        wavelength = c / self.frequency
+    # Wavenumber
+    k = 2.0 * pi / wavelength
 
-        # Wavenumber
-        k = 2.0 * pi / wavelength
-
-        # Number of vertices and faces
-        nv = self.vertices.shape[0]
-        nf = self.faces.shape[0]
-
-        # Incident angles and direction cosines
-        cpi = cos(self.phi_inc)
-        spi = sin(self.phi_inc)
-        cti = cos(self.theta_inc)
-        sti = sin(self.theta_inc)
+    scattering_matrix = zeros((4, len(frequency)), dtype=complex)
 
-        ui = sti * cpi
-        vi = sti * spi
-        wi = cti
+    pair_block = max(1, block_size // len(frequency))
 
-        incident_direction = [ui, vi, wi]
+    for pair_start in range(0, len(area), pair_block):
+        block = slice(pair_start, pair_start + pair_block)
 
-        # Observation angles and direction cosines
-        cpo = cos(self.phi_obs)
-        spo = sin(self.phi_obs)
-        cto = cos(self.theta_obs)
-        sto = sin(self.theta_obs)
-
-        uo = sto * cpo
-        vo = sto * spo
-        wo = cto
-
-        uuo = cto * cpo
-        vvo = cto * spo
-        wwo = -sto
-
-        # Incident field in global Cartesian
-        Ei = 1.0
-        Ei_V = [cti * cpi * Ei, cti * spi * Ei, -sti * Ei]
-        Ei_H = [-spi * Ei, cpi * Ei, 0.0]
-
-        # Position vectors to vertices
-        r = zeros((nv, 3))
-        for i_vert in range(nv):
-            r[i_vert] = [self.vertices[i_vert][0], self.vertices[i_vert][1], self.vertices[i_vert][2]]
-
-        # Edge vectors and normals
-        # Loop over faces
-        for i_face in range(nf):
-            A = r[self.faces[i_face][1]] - r[self.faces[i_face][0]]
-            B = r[self.faces[i_face][2]] - r[self.faces[i_face][1]]
-            C = r[self.faces[i_face][0]] - r[self.faces[i_face][2]]
-
-            # Outward directed normals
-            normal = cross(A, B) + 0.
+        # Phase at the three vertices
+        alpha = vertex_paths[:, block, None] * k
+        exponential = exp(1j * alpha)
 
-            # Edge lengths
-            dist = [norm(A), norm(B), norm(C)]
+        # Area integral, summed over the facets
+        Ic = surface_integrals(*alpha, *exponential, area[block, None])
+        scattering_matrix += matmul(coefficients[:, block], Ic)
 
-            ss = 0.5 * sum(dist)
-            area = sqrt(ss * (ss - dist[0]) * (ss - dist[1]) * (ss - dist[2]))
-
-            # Unit normals
-            normal = normal / norm(normal)
-
-            # Just a normal check for illumination
-            if dot(normal, incident_direction) >= 0.0:
+    return scattering_matrix * sqrt(4.0 * pi) / wavelength
 
-                # Local angles
-                beta = arccos(normal[2])
-                alpha = arctan2(normal[1] + 0., normal[0] + 0.)
 
-                # Local direction cosines
-                ca = cos(alpha)
-                sa = sin(alpha)
-                cb = cos(beta)
-                sb = sin(beta)
+def adaptive_physical_optics(mesh, frequency, theta_inc, phi_inc, theta_obs, phi_obs, tolerance=1e-3,
+                             initial_samples=9, samples_per_step=4, max_samples=None, block_size=262144,
+                             shadowing=False):
+    """
+    Calculate the normalized scattering matrix over a dense frequency grid by adaptive sampling.
+    Physical optics is evaluated at a few frequencies, a rational model with the same poles for the four
+    polarizations is fit, and frequencies are added where successive models differ the most until the model is
+    within the tolerance. The remaining frequencies are taken from the model.
+    The scattered field varies over frequency no faster than the largest delay across the target allows, so at least
+    the time bandwidth product of the band and the target are evaluated at the start.
+    An electrically large target needs as many samples as the grid, and the whole grid is evaluated.
+    :param mesh: The facet mesh of the target.
+    :param frequency: The frequency array (Hz).
+    :param theta_inc: The incident theta angle (rad).
+    :param phi_inc: The incident phi angle (rad).
+    :param theta_obs: The observation theta angle (rad).
+    :param phi_obs: The observation phi angle (rad).
+    :param tolerance: The error allowed, relative to the largest scattering matrix element.
+    :param initial_samples: The number of frequencies evaluated first.
+    :param samples_per_step: The number of frequencies added at each step.
+    :param max_samples: The largest number of frequencies evaluated, no limit if None.
+    :param block_size: The number of facet x frequency samples integrated together.
+    :param shadowing: True to remove the facets hidden by other facets.
+    :return: The scattering matrix [VV, HV, VH, HH] (4 x frequency), the error estimate and the frequencies
+    evaluated.
+    """
+    frequency = atleast_1d(asarray(frequency, dtype=float))
+
+    def evaluate(f):
+        return physical_optics(mesh, f, theta_inc, phi_inc, theta_obs, phi_obs, block_size, shadowing)
+
+    # Time bandwidth product, with the delays measured from the phase reference at the origin
+    radius = sqrt((mesh.vertices ** 2).sum(axis=1)).max() if len(mesh.vertices) else 0.0
+    time_bandwidth = 4.0 * radius * (frequency.max() - frequency.min()) / c
+    initial_samples = max(initial_samples, int(time_bandwidth) + 2)
+
+    return adaptive_sweep(evaluate, frequency, tolerance, initial_samples, samples_per_step, max_samples)
+
+
+def physical_optics_sweep(mesh, frequency, theta_inc, phi_inc, theta_obs, phi_obs, block_size=262144,
+                          shadowing=False):
+    """
+    Calculate the normalized scattering matrix for a set of angles with the physical optics currents on the
+    illuminated facets. The facet geometry comes from the mesh. The angles are taken in chunks, and each chunk forms
+    the currents of all its illuminated facet and angle pairs as arrays, then integrates them in blocks of
+    block_size samples with one multiply and sum per block.
+    With shadowing, a ray is cast from the centroid of each facet facing the radar toward the radar and toward the
+    observer through the bounding volume hierarchy of the mesh, and facets with either ray blocked are removed.
+    :param mesh: The facet mesh of the target.
+    :param frequency: The frequency array (Hz).
+    :param theta_inc: The incident theta angles (rad).
+    :param phi_inc: The incident phi angles (rad).
+    :param theta_obs: The observation theta angles (rad).
+    :param phi_obs: The observation phi angles (rad).
+    :param block_size: The number of facet x frequency samples integrated together.
+    :param shadowing: True to remove the facets hidden by other facets.
+    :return: The scattering matrix in linear polarization [VV, HV, VH, HH] (4 x angles x frequency).
+    """
+    frequency = atleast_1d(asarray(frequency, dtype=float))
+
+    # Flatten the angles, broadcast against each other
+    angles = broadcast_arrays(*[asarray(angle, dtype=float) for angle in (theta_inc, phi_inc, theta_obs, phi_obs)])
+    theta_inc, phi_inc, theta_obs, phi_obs = [angle.ravel() for angle in angles]
+    number_of_angles = len(theta_inc)
+
+    # Wavelength
+    wavelength = c / frequency
 
-                # Rotation matrices
-                rotation1 = array([[ca, sa, 0.0], [-sa, ca, 0.0], [0.0, 0.0, 1.0]])
-                rotation2 = array([[cb, 0.0, -sb], [0.0, 1.0, 0.0], [sb, 0.0, cb]])
+    # Wavenumber
+    k = 2.0 * pi / wavelength
 
-                # Transform incident direction
-                [ui_t, vi_t, wi_t] = rotation2.dot(rotation1.dot(incident_direction))
+    # Incident direction, incident field, observation polarization and observation direction in global Cartesian
+    vectors = _angle_vectors(theta_inc, phi_inc, theta_obs, phi_obs)
 
-                sti_t = sqrt(ui_t * ui_t + vi_t * vi_t) * sign(wi_t)
-                cti_t = sqrt(1.0 - sti_t * sti_t)
-                
-                phi_t = arctan2(vi_t + 0., ui_t + 0.)
-                cpi_t = cos(phi_t)
-                spi_t = sin(phi_t)
+    scattering_matrix = zeros((4, number_of_angles, len(frequency)), dtype=complex)
 
-                # Phase at the three vertices
-                v1, v2, v3 = self.faces[i_face][0], self.faces[i_face][1], self.faces[i_face][2]
+    # Angles in a chunk, and facet and angle pairs integrated together
+    angle_block = max(1, block_size // max(len(mesh), 1))
+    pair_block = max(1, block_size // len(frequency))
 
-                alpha1 = k * ((self.vertices[v1][0]) * (uo + ui) +
-                              (self.vertices[v1][1]) * (vo + vi) +
-                              (self.vertices[v1][2]) * (wo + wi))
+    for start in range(0, number_of_angles, angle_block):
+        chunk = slice(start, start + angle_block)
 
-                alpha2 = k * ((self.vertices[v2][0] - self.vertices[v1][0]) * (uo + ui) +
-                              (self.vertices[v2][1] - self.vertices[v1][1]) * (vo + vi) +
-                              (self.vertices[v2][2] - self.vertices[v1][2]) * (wo + wi)) + alpha1
+        # Illuminated facet and angle pairs, ordered by angle, their currents and phase paths
+        angle, facet, coefficients, vertex_paths = _illumination(mesh, vectors[chunk], shadowing)
+        angle += start
 
-                alpha3 = k * ((self.vertices[v3][0] - self.vertices[v1][0]) * (uo + ui) +
-                              (self.vertices[v3][1] - self.vertices[v1][1]) * (vo + vi) +
-                              (self.vertices[v3][2] - self.vertices[v1][2]) * (wo + wi)) + alpha1
+        for pair_start in range(0, len(facet), pair_block):
+            block = slice(pair_start, pair_start + pair_block)
 
-                exp1 = exp(1j * alpha1)
-                exp2 = exp(1j * alpha2)
-                exp3 = exp(1j * alpha3)
+            # Phase at the three vertices
+            alpha = vertex_paths[:, block, None] * k
+            exponential = exp(1j * alpha)
 
-                # Incident field in local Cartesian
-                Ei_V2 = rotation2.dot(rotation1.dot(Ei_V))
-                Ei_H2 = rotation2.dot(rotation1.dot(Ei_H))
+            # Area integral
+            Ic = surface_integrals(*alpha, *exponential, mesh.areas[facet[block], None])
 
-                # Incident field in local Spherical
-                Et_v = Ei_V2[0] * cti_t * cpi_t + Ei_V2[1] * cti_t * spi_t - Ei_V2[2] * sti_t
-                Ep_v = -Ei_V2[0] * spi_t + Ei_V2[1] * cpi_t
+            # Sum the facets of each angle in the block
+            angle_block_index = angle[block]
+            first = concatenate([[0], (diff(angle_block_index) != 0).nonzero()[0] + 1])
+            scattering_matrix[:, angle_block_index[first]] += add.reduceat(coefficients[:, block, None] * Ic[None],
+                                                                           first, axis=1)
 
-                Et_h = Ei_H2[0] * cti_t * cpi_t + Ei_H2[1] * cti_t * spi_t - Ei_H2[2] * sti_t
-                Ep_h = -Ei_H2[0] * spi_t + Ei_H2[1] * cpi_t
+    return scattering_matrix * sqrt(4.0 * pi) / wavelength
 
-                # Reflection coefficients
-                #Rs = 0.001
-                Rs = 0.0
-                gamma_perpendicular = -1.0 / (2.0 * Rs * cti_t + 1.0)
-                gamma_parallel = 0.0
-                if (2.0 * Rs + cti_t) != 0.0:
-                    gamma_parallel = -cti_t / (2.0 * Rs + cti_t)
 
-                # Surface currents in local Cartesian
-                Jx_v = -Et_v * cpi_t * gamma_parallel + Ep_v * spi_t * cti_t * gamma_perpendicular
-                Jy_v = -Et_v * spi_t * gamma_parallel - Ep_v * cpi_t * cti_t * gamma_perpendicular
+def _geometry_digest(vertices, faces):
+    """
+    Digest of the contents of the target geometry.
+    :param vertices: The vertices of the model (vertices x 3) (m).
+    :param faces: The vertex indices of each facet (faces x 3).
+    :return: The digest.
+    """
+    return digest(ascontiguousarray(vertices, dtype=float), ascontiguousarray(faces, dtype=intp))
 
-                Jx_h = -Et_h * cpi_t * gamma_parallel + Ep_h * spi_t * cti_t * gamma_perpendicular
-                Jy_h = -Et_h * spi_t * gamma_parallel - Ep_h * cpi_t * cti_t * gamma_perpendicular
 
-                # Now loop over all the frequencies
-                for i_freq in range(len(self.frequency)):
+def _angle_vectors(theta_inc, phi_inc, theta_obs, phi_obs):
+    """
+    Calculate the incident direction, incident field, observation polarization and observation direction of each
+    angle.
+    :param theta_inc: The incident theta angles (rad).
+    :param phi_inc: The incident phi angles (rad).
+    :param theta_obs: The observation theta angles (rad).
+    :param phi_obs: The observation phi angles (rad).
+    :return: The vectors in global Cartesian (angles x 6 x 3).
+    """
+    theta_inc, phi_inc, theta_obs, phi_obs = [atleast_1d(angle) for angle in (theta_inc, phi_inc, theta_obs, phi_obs)]
+
+    # Incident angles and direction cosines
+    cpi = cos(phi_inc)
+    spi = sin(phi_inc)
+    cti = cos(theta_inc)
+    sti = sin(theta_inc)
+
+    # Observation angles and direction cosines
+    cpo = cos(phi_obs)
+    spo = sin(phi_obs)
+    cto = cos(theta_obs)
+    sto = sin(theta_obs)
+
+    zero = zeros(len(theta_inc))
+    return array([[sti * cpi, sti * spi, cti],
+                  [cti * cpi, cti * spi, -sti],
+                  [-spi, cpi, zero],
+                  [cto * cpo, cto * spo, -sto],
+                  [-spo, cpo, zero],
+                  [sto * cpo, sto * spo, cto]]).transpose(2, 0, 1)
+
+
+def _illumination(mesh, vectors, shadowing):
+    """
+    Find the illuminated facet and angle pairs, with their currents for a unit surface integral and the phase paths
+    to their vertices.
+    :param mesh: The facet mesh.
+    :param vectors: The vectors of each angle in global Cartesian (angles x 6 x 3).
+    :param shadowing: True to remove the facets hidden by other facets.
+    :return: The angle and facet of each pair, the observed components [Ev_v, Ev_h, Eh_v, Eh_h] (4 x pairs), the
+    phase paths to the three vertices (3 x pairs) (m).
+    """
+    incident_direction = vectors[:, 0]
+    observation_direction = vectors[:, 5]
+    normal = mesh.normals
 
-                    # Area integral
-                    Ic = surface_integral(alpha1[i_freq], alpha2[i_freq], alpha3[i_freq], exp1[i_freq],
-                                          exp2[i_freq], exp3[i_freq], area)
+    # Illuminated pairs, ordered by angle
+    cosine = (normal[None, :, 0] * incident_direction[:, 0, None] +
+              normal[None, :, 1] * incident_direction[:, 1, None] +
+              normal[None, :, 2] * incident_direction[:, 2, None])
+    angle, facet = (cosine >= 0.0).nonzero()
 
-                    # Scattered field components in local coordinates
-                    Es2_v = [Jx_v * Ic, Jy_v * Ic, 0.0]
-                    Es2_h = [Jx_h * Ic, Jy_h * Ic, 0.0]
+    # Remove the pairs hidden from the radar or the observer
+    if shadowing:
+        visible = _visible(mesh, facet, incident_direction[angle], observation_direction[angle])
+        angle = angle[visible]
+        facet = facet[visible]
 
-                    # Transform back to global coordinates
-                    Es_v = rotation1.T.dot(rotation2.T.dot(Es2_v))
-                    Es_h = rotation1.T.dot(rotation2.T.dot(Es2_h))
+    # Observed field components for a unit surface integral
+    pair_vectors = vectors[angle]
+    coefficients = _facet_coefficients(pair_vectors[:, :5], mesh.rotations[facet])
 
-                    Ev_v = uuo * Es_v[0] + vvo * Es_v[1] + wwo * Es_v[2]
-                    Eh_v = -spo * Es_v[0] + cpo * Es_v[1]
+    # Phase path to the first vertex and along the edges from it
+    direction = pair_vectors[:, 0] + pair_vectors[:, 5]
+    vertex_edges = stack([mesh.vertices[mesh.faces[facet, 0]], mesh.edges[facet, 0], -mesh.edges[facet, 2]], axis=1)
+    path1, path2, path3 = matmul(vertex_edges, direction[:, :, None])[:, :, 0].T
+
+    return angle, facet, coefficients, array([path1, path1 + path2, path1 + path3])
+
+
+def _facet_coefficients(vectors, rotation):
+    """
+    Calculate the physical optics currents of facet and angle pairs, and the observed field for a unit surface
+    integral.
+    :param vectors: The incident direction, vertical and horizontal incident field, and vertical and horizontal
+    observed polarization in global Cartesian of each pair (pairs x 5 x 3).
+    :param rotation: The rotation from global to local facet coordinates of each pair (pairs x 3 x 3).
+    :return: The observed components [Ev_v, Ev_h, Eh_v, Eh_h] (4 x pairs).
+    """
+    # Transform the incident direction and field
+    (ui_t, Ei_V2_x, Ei_H2_x), (vi_t, Ei_V2_y, Ei_H2_y), (wi_t, Ei_V2_z, Ei_H2_z) = \
+        matmul(rotation, vectors[:, :3].transpose(0, 2, 1)).transpose(1, 2, 0)
 
-                    Ev_h = uuo * Es_h[0] + vvo * Es_h[1] + wwo * Es_h[2]
-                    Eh_h = -spo * Es_h[0] + cpo * Es_h[1]
+    sti_t = sqrt(ui_t * ui_t + vi_t * vi_t) * sign(wi_t)
+    cti_t = sqrt(1.0 - sti_t * sti_t)
 
-                    # Set the scattering matrix
-                    scattering_matrix[0][i_freq] += Ev_v
-                    scattering_matrix[1][i_freq] += Ev_h
-                    scattering_matrix[2][i_freq] += Eh_v
-                    scattering_matrix[3][i_freq] += Eh_h
+    phi_t = arctan2(vi_t + 0., ui_t + 0.)
+    cpi_t = cos(phi_t)
+    spi_t = sin(phi_t)
 
-        return scattering_matrix * sqrt(4.0 * pi) / wavelength
+    # Incident field in local Spherical
+    Et_v = Ei_V2_x * cti_t * cpi_t + Ei_V2_y * cti_t * spi_t - Ei_V2_z * sti_t
+    Ep_v = -Ei_V2_x * spi_t + Ei_V2_y * cpi_t
+
+    Et_h = Ei_H2_x * cti_t * cpi_t + Ei_H2_y * cti_t * spi_t - Ei_H2_z * sti_t
+    Ep_h = -Ei_H2_x * spi_t + Ei_H2_y * cpi_t
+
+    # Reflection coefficients
+    Rs = 0.0
+    gamma_perpendicular = -1.0 / (2.0 * Rs * cti_t + 1.0)
+    denominator = 2.0 * Rs + cti_t
+    gamma_parallel = where(denominator != 0.0, -cti_t / where(denominator != 0.0, denominator, 1.0), 0.0)
+
+    # Surface currents in local Cartesian
+    Jx_v = -Et_v * cpi_t * gamma_parallel + Ep_v * spi_t * cti_t * gamma_perpendicular
+    Jy_v = -Et_v * spi_t * gamma_parallel - Ep_v * cpi_t * cti_t * gamma_perpendicular
+
+    Jx_h = -Et_h * cpi_t * gamma_parallel + Ep_h * spi_t * cti_t * gamma_perpendicular
+    Jy_h = -Et_h * spi_t * gamma_parallel - Ep_h * cpi_t * cti_t * gamma_perpendicular
+
+    # Observed polarization in local Cartesian, in the plane of the facet
+    observed = matmul(vectors[:, 3:], rotation[:, :2].transpose(0, 2, 1))
+
+    # Observed components [theta_hat . Es_v, theta_hat . Es_h, phi_hat . Es_v, phi_hat . Es_h]
+    return matmul(observed, stack([Jx_v, Jx_h, Jy_v, Jy_h], axis=1).reshape(-1, 2, 2)).reshape(-1, 4).T
+
+
+def _visible(mesh, facet, incident_direction, observation_direction):
+    """
+    Cast rays from the facet centroids toward the radar and the observer.
+    :param mesh: The facet mesh.
+    :param facet: The facet of each pair.
+    :param incident_direction: The incident direction cosines of each pair (pairs x 3).
+    :param observation_direction: The observation direction cosines of each pair (pairs x 3).
+    :return: True for the pairs with neither ray blocked.
+    """
+    hierarchy = mesh.bounding_volume_hierarchy()
+
+    # Ignore hits closer than a small fraction of the size of the target
+    t_min = 1e-9 * abs(mesh.vertices).max()
+
+    origins = mesh.centroids[facet]
+    visible = ~hierarchy.occluded(origins, incident_direction, facet, t_min)
+
+    # The observer ray is needed only where it differs from the incident ray
+    bistatic = (visible & (observation_direction != incident_direction).any(axis=1)).nonzero()[0]
+    visible[bistatic] = ~hierarchy.occluded(origins[bistatic], observation_direction[bistatic], facet[bistatic],
+                                            t_min)
+
+    return visible
 
 
 def surface_integral(alpha1, alpha2, alpha3, exp1, exp2, exp3, area):
@@ -235,3 +450,65 @@ def surface_integral(alpha1, alpha2, alpha3, exp1, exp2, exp3, area):
     else:
         Ic = 2.0 * area / (alpha3 - alpha2) * ((exp1 - exp2) / (alpha1 - alpha2) - (exp1 - exp3) / (alpha1 - alpha3))
     return Ic
+
+
+def surface_integrals(alpha1, alpha2, alpha3, exp1, exp2, exp3, area):
+    """
+    Calculate the surface integral for arrays of facets and frequencies, with the same special cases as
+    surface_integral selected by masks.
+    :param alpha1: The phase at vertex 1 (rad).
+    :param alpha2: The phase at vertex 2 (rad).
+    :param alpha3: The phase at vertex 3 (rad).
+    :param exp1: The exponential term (exp(j k alpha1).
+    :param exp2: The exponential term (exp(j k alpha2).
+    :param exp3: The exponential term (exp(j k alpha3).
+    :param area: The area of the facets (m^2), broadcast against the phases.
+    :return: The surface integral calculation.
+    """
+    eps = 1e-10
+    area = broadcast_to(area, alpha1.shape)
+
+    equal12 = abs(alpha1 - alpha2) < eps
+    equal13 = abs(alpha1 - alpha3) < eps
+    equal23 = abs(alpha2 - alpha3) < eps
+    general = ~(equal12 | equal13 | equal23)
+
+    # General case, the special cases are set below
+    Ic = area * exp1
+    if general.all():
+        Ic = _general_integral(alpha1, alpha2, alpha3, exp1, exp2, exp3, area)
+    else:
+        Ic[general] = _general_integral(alpha1[general], alpha2[general], alpha3[general], exp1[general],
+                                        exp2[general], exp3[general], area[general])
+
+        # Vertices 1 and 2 with the same phase
+        i = (equal12 & ~equal13).nonzero()
+        Ic[i] = 2.0 * area[i] / (alpha3[i] - alpha2[i]) * (1j * exp1[i] - (exp1[i] - exp3[i]) /
+                                                           (alpha1[i] - alpha3[i]))
+
+        # Vertices 1 and 3 with the same phase
+        i = (equal13 & ~equal12).nonzero()
+        Ic[i] = 2.0 * area[i] / (alpha3[i] - alpha2[i]) * (-1j * exp1[i] + (exp1[i] - exp2[i]) /
+                                                           (alpha1[i] - alpha2[i]))
+
+        # Vertices 2 and 3 with the same phase
+        i = (equal23 & ~equal12 & ~equal13).nonzero()
+        Ic[i] = 2.0 * area[i] / (alpha1[i] - alpha2[i]) * (1j * exp3[i] - (exp1[i] - exp3[i]) /
+                                                           (alpha1[i] - alpha3[i]))
+
+    return Ic
+
+
+def _general_integral(alpha1, alpha2, alpha3, exp1, exp2, exp3, area):
+    """
+    The surface integral when the phases at the three vertices are all different.
+    :param alpha1: The phase at vertex 1 (rad).
+    :param alpha2: The phase at vertex 2 (rad).
+    :param alpha3: The phase at vertex 3 (rad).
+    :param exp1: The exponential term (exp(j k alpha1).
+    :param exp2: The exponential term (exp(j k alpha2).
+    :param exp3: The exponential term (exp(j k alpha3).
+    :param area: The area of the facets (m^2).
+    :return: The surface integral calculation.
+    """
+    return 2.0 * area / (alpha3 - alpha2) * ((exp1 - exp2) / (alpha1 - alpha2) - (exp1 - exp3) / (alpha1 - alpha3))
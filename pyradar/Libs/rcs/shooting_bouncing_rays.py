@@ -0,0 +1,233 @@
+"""
+Project: RadarBook
+File: shooting_bouncing_rays.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import array, zeros, sin, cos, exp, sqrt, asarray, atleast_1d, broadcast_arrays, arange, meshgrid, \
+    ceil, cross, column_stack, full, intp, sign, ones
+from scipy.constants import c, pi
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+
+def shooting_bouncing_rays(mesh, frequency, theta_inc, phi_inc, theta_obs, phi_obs, ray_spacing=None, max_bounces=5,
+                           ray_tile=16384, number_of_workers=1, block_size=262144):
+    """
+    Calculate the normalized scattering matrix of a perfectly conducting facet model with shooting and bouncing rays.
+    A grid of rays covering the target is launched from the radar and traced through the bounding volume hierarchy
+    of the mesh for up to max_bounces reflections. At each reflection the physical optics current of the ray tube
+    is integrated over its footprint on the facet, so the first bounce gives physical optics over the illuminated
+    surface and the later bounces add the multiple reflections. Footprints hidden from the observer are skipped.
+    The rays are traced in tiles, which are shared between worker processes.
+    :param mesh: The facet mesh of the target.
+    :param frequency: The frequency array (Hz).
+    :param theta_inc: The incident theta angles (rad).
+    :param phi_inc: The incident phi angles (rad).
+    :param theta_obs: The observation theta angles (rad).
+    :param phi_obs: The observation phi angles (rad).
+    :param ray_spacing: The spacing of the ray grid (m), one tenth of the shortest wavelength if None.
+    :param max_bounces: The largest number of reflections traced.
+    :param ray_tile: The number of rays traced together.
+    :param number_of_workers: The number of worker processes.
+    :param block_size: The number of footprint x frequency samples summed together.
+    :return: The scattering matrix [VV, HV, VH, HH] (4 x angles x frequency) and the rays traced per second.
+    """
+    frequency = atleast_1d(asarray(frequency, dtype=float))
+
+    # Flatten the angles, broadcast against each other
+    angles = broadcast_arrays(*[asarray(angle, dtype=float) for angle in (theta_inc, phi_inc, theta_obs, phi_obs)])
+    angles = column_stack([angle.ravel() for angle in angles])
+
+    # Wavelength
+    wavelength = c / frequency
+
+    if ray_spacing is None:
+        ray_spacing = wavelength.min() / 10.0
+
+    # Bounding sphere of the target
+    lower = mesh.vertices.min(axis=0)
+    upper = mesh.vertices.max(axis=0)
+    center = 0.5 * (lower + upper)
+    radius = 0.5 * sqrt(((upper - lower) ** 2).sum())
+
+    # Ray grid on the launch plane covering the bounding sphere
+    n = int(ceil(radius / ray_spacing))
+    a, b = meshgrid(arange(-n, n + 1) * ray_spacing, arange(-n, n + 1) * ray_spacing)
+    inside = a ** 2 + b ** 2 <= (radius + ray_spacing) ** 2
+    grid = (a[inside], b[inside])
+    number_of_rays = len(grid[0])
+
+    # Build the hierarchy before the mesh is sent to the workers
+    mesh.bounding_volume_hierarchy()
+
+    # Work items as (angles, rays)
+    tasks = [(angle, slice(ray, min(ray + ray_tile, number_of_rays)))
+             for angle in angles for ray in range(0, number_of_rays, ray_tile)]
+    settings = (frequency, center, radius, ray_spacing, max_bounces, block_size)
+
+    start = perf_counter()
+
+    if number_of_workers <= 1:
+        partial = [_trace(mesh, (grid[0][rays], grid[1][rays]), frequency, angle, center, radius, ray_spacing,
+                          max_bounces, block_size) for angle, rays in tasks]
+    else:
+        with ProcessPoolExecutor(number_of_workers, initializer=_attach, initargs=(mesh, grid)) as pool:
+            partial = list(pool.map(_trace_task, tasks, [settings] * len(tasks)))
+
+    rays_per_second = len(angles) * number_of_rays / (perf_counter() - start)
+
+    # Sum the tiles in a fixed order
+    scattering_matrix = zeros((4, len(angles), len(frequency)), dtype=complex)
+    tiles = -(-number_of_rays // ray_tile)
+    for i, tile in enumerate(partial):
+        scattering_matrix[:, i // tiles] += tile
+
+    return scattering_matrix * sqrt(4.0 * pi) / wavelength, rays_per_second
+
+
+def _trace(mesh, grid, frequency, angle, center, radius, ray_spacing, max_bounces=5, block_size=262144):
+    """
+    Trace a set of rays from the launch grid and sum their reflections.
+    :param mesh: The facet mesh of the target.
+    :param grid: The coordinates of the rays on the launch plane, along the vertical and horizontal
+    polarization directions (m).
+    :param frequency: The frequency array (Hz).
+    :param angle: The incident and observation angles (theta_inc, phi_inc, theta_obs, phi_obs) (rad).
+    :param center: The center of the bounding sphere of the target (m).
+    :param radius: The radius of the bounding sphere of the target (m).
+    :param ray_spacing: The spacing of the ray grid (m).
+    :param max_bounces: The largest number of reflections traced.
+    :param block_size: The number of footprint x frequency samples summed together.
+    :return: The unnormalized scattering matrix [VV, HV, VH, HH] (4 x frequency).
+    """
+    hierarchy = mesh.bounding_volume_hierarchy()
+    theta_inc, phi_inc, theta_obs, phi_obs = angle
+
+    # Wavenumber
+    k = 2.0 * pi * frequency / c
+
+    # Direction to the radar, and the incident polarizations
+    cpi = cos(phi_inc)
+    spi = sin(phi_inc)
+    cti = cos(theta_inc)
+    sti = sin(theta_inc)
+
+    incident_direction = array([sti * cpi, sti * spi, cti])
+    Ei_V = array([cti * cpi, cti * spi, -sti])
+    Ei_H = array([-spi, cpi, 0.0])
+
+    # Direction to the observer, and the observed polarizations
+    cpo = cos(phi_obs)
+    spo = sin(phi_obs)
+    cto = cos(theta_obs)
+    sto = sin(theta_obs)
+
+    observation_direction = array([sto * cpo, sto * spo, cto])
+    theta_hat = array([cto * cpo, cto * spo, -sto])
+    phi_hat = array([-spo, cpo, 0.0])
+
+    bistatic = (observation_direction != incident_direction).any()
+
+    # Launch the rays toward the target from outside the bounding sphere
+    number_of_rays = len(grid[0])
+    origin = center + (radius + ray_spacing) * incident_direction + grid[0][:, None] * Ei_V + \
+        grid[1][:, None] * Ei_H
+    direction = -incident_direction * ones([number_of_rays, 1])
+    E_V = Ei_V * ones([number_of_rays, 1])
+    E_H = Ei_H * ones([number_of_rays, 1])
+
+    # Path length, referenced to the incident phase at the launch point
+    path = -(origin * incident_direction).sum(axis=1)
+
+    last_facet = full(number_of_rays, -1, dtype=intp)
+    t_min = 1e-9 * abs(mesh.vertices).max()
+    ray_area = ray_spacing ** 2
+
+    coefficients = []
+    footprint_path = []
+
+    for bounce in range(max_bounces):
+        # Next hit of each ray, the rays that miss or graze a facet leave the target
+        facet, distance = hierarchy.intersect(origin, direction, last_facet, t_min)
+        cosine = (mesh.normals[facet] * direction).sum(axis=1)
+        hit = ((facet >= 0) & (abs(cosine) > 1e-9)).nonzero()[0]
+        if not len(hit):
+            break
+
+        facet = facet[hit]
+        cosine = cosine[hit]
+        origin = origin[hit] + distance[hit, None] * direction[hit]
+        direction = direction[hit]
+        path = path[hit] + distance[hit]
+        E_V = E_V[hit]
+        E_H = E_H[hit]
+
+        # Facet normal on the side the ray arrives from
+        normal = -sign(cosine)[:, None] * mesh.normals[facet]
+
+        # Physical optics currents and the footprint of the ray tube on the facet
+        J_V = cross(normal, cross(direction, E_V))
+        J_H = cross(normal, cross(direction, E_H))
+        footprint = ray_area / abs(cosine)
+
+        # Keep the footprints the observer can see
+        visible = arange(len(hit))
+        if bounce > 0 or bistatic:
+            visible = (~hierarchy.occluded(origin, observation_direction * ones([len(hit), 1]), facet,
+                                           t_min)).nonzero()[0]
+
+        coefficients.append(array([J_V[visible].dot(theta_hat), J_H[visible].dot(theta_hat),
+                                   J_V[visible].dot(phi_hat), J_H[visible].dot(phi_hat)]) * footprint[visible])
+        footprint_path.append(path[visible] - origin[visible].dot(observation_direction))
+
+        # Reflect the rays and their fields from the conducting facet
+        direction = direction - 2.0 * (direction * normal).sum(axis=1)[:, None] * normal
+        E_V = -E_V + 2.0 * (E_V * normal).sum(axis=1)[:, None] * normal
+        E_H = -E_H + 2.0 * (E_H * normal).sum(axis=1)[:, None] * normal
+        last_facet = facet
+
+    scattering_matrix = zeros((4, len(frequency)), dtype=complex)
+
+    # Sum the footprints for each frequency
+    for coefficient, length in zip(coefficients, footprint_path):
+        footprint_block = max(1, block_size // len(frequency))
+        for start in range(0, len(length), footprint_block):
+            block = slice(start, start + footprint_block)
+            scattering_matrix += coefficient[:, block].dot(exp(-1j * length[block, None] * k[None, :]))
+
+    return scattering_matrix
+
+
+# Mesh and ray grid of a worker process
+_worker_state = {}
+
+
+def _attach(mesh, grid):
+    """
+    Keep the mesh and ray grid in the worker.
+    :param mesh: The facet mesh of the target.
+    :param grid: The coordinates of the rays on the launch plane (m).
+    :return:
+    """
+    _worker_state['mesh'] = mesh
+    _worker_state['grid'] = grid
+
+
+def _trace_task(task, settings):
+    """
+    Trace one tile of rays for one set of angles.
+    :param task: The angles and the rays of the tile.
+    :param settings: The frequency, bounding sphere, ray spacing, bounces and block size.
+    :return: The unnormalized scattering matrix of the tile (4 x frequency).
+    """
+    angle, rays = task
+    frequency, center, radius, ray_spacing, max_bounces, block_size = settings
+    grid = _worker_state['grid']
+    return _trace(_worker_state['mesh'], (grid[0][rays], grid[1][rays]), frequency, angle, center, radius,
+                  ray_spacing, max_bounces, block_size)
@@ -10,9 +10,21 @@ This file is part of Introduction to Radar Using Python and MATLAB
 and can not be copied and/or distributed without the express permission of Artech House.
 """
 from scipy.constants import c, pi
-from numpy import sqrt, linspace, zeros_like, exp, sin, cos, ones
+from numpy import sqrt, linspace, zeros_like, exp, sin, cos, ones, zeros, arange, asarray, column_stack, vstack, \
+    intp, ceil, log2, clip, empty, full, dot, subtract, multiply, add, floor, copyto, right_shift, bitwise_and, \
+    result_type
 from scipy.interpolate import interp1d
 from scipy.fftpack import ifft, fftshift
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from numpy.lib.format import open_memmap
+from pathlib import PurePath
+from collections import OrderedDict
+from Libs.utils.shared_arrays import digest, shared_array, share_named, named_array
+
+
+# Largest phase error across a range bin for the fast backprojection (rad)
+PHASE_ERROR = 1e-8
 
 
 def reconstruct(signal, sensor_x, sensor_y, sensor_z, range_center, x_image, y_image, z_image, frequency, fft_length):
@@ -169,3 +181,937 @@ def reconstruct3(signal, az, el, x_image, y_image, z_image, frequency, fft_lengt
             bp_image += f(range_image) * exp(term * range_image)
 
     return bp_image
+
+
+def range_compress(signal, fft_length):
+    """
+    Range compress all pulses with a single inverse FFT along the frequency axis.
+    :param signal: The signal in K-space (frequency x pulses, or channels x frequency x pulses).
+    :param fft_length: The number of points in the FFT.
+    :return: The range profiles (range x pulses, or channels x range x pulses).
+    """
+    axis = max(signal.ndim - 2, 0)
+    return fftshift(ifft(signal, fft_length, axis=axis), axes=axis)
+
+
+def reconstruct_fast(signal, sensor_x, sensor_y, sensor_z, range_center, x_image, y_image, z_image, frequency,
+                     fft_length, pulse_block=16, tile_size=4096, number_of_workers=1, worker_tile_size=65536,
+                     dtype=complex, executor=None):
+    """
+    Reconstruct the two-dimensional image using the filtered backprojection method.
+    Same result as reconstruct, with all pulses range compressed at once and backprojected in blocks.
+    :param signal: The signal in K-space.
+    :param sensor_x: The sensor x-coordinate (m).
+    :param sensor_y: The sensor y-coordinate (m).
+    :param sensor_z: The sensor z-coordinate (m).
+    :param range_center: The range to the center of the image (m).
+    :param x_image: The x-coordinates of the image (m).
+    :param y_image: The y-coordinates of the image (m).
+    :param z_image: The z-coordinates of the image (m).
+    :param frequency: The frequency array (Hz).
+    :param fft_length: The number of points in the FFT.
+    :param pulse_block: The number of pulses backprojected together.
+    :param tile_size: The number of pixels backprojected together.
+    :param number_of_workers: The number of worker processes.
+    :param worker_tile_size: The number of pixels given to a worker at a time.
+    :param dtype: The image data type, complex64 halves the memory (see backproject for the error).
+    :param executor: A running pool of workers to use, such as a ProcessPoolExecutor kept for many images, None for
+    a pool of number_of_workers made for the call.
+    :return: The reconstructed image.
+    """
+    with Backprojector(x_image, y_image, z_image, frequency, fft_length, 'Spherical', pulse_block, tile_size,
+                       number_of_workers, worker_tile_size, dtype, executor=executor) as backprojector:
+
+        # All the pulses as a single block
+        backprojector.add_pulses(signal, column_stack([sensor_x, sensor_y, sensor_z]), range_center)
+
+        return backprojector.snapshot()
+
+
+def reconstruct2_fast(signal, sensor_az, sensor_el, x_image, y_image, z_image, frequency, fft_length,
+                      pulse_block=16, tile_size=4096, number_of_workers=1, worker_tile_size=65536, dtype=complex,
+                      executor=None):
+    """
+    Reconstruct the two-dimensional image using the filtered backprojection method.
+    Same result as reconstruct2, with all pulses range compressed at once and backprojected in blocks.
+    :param signal: The signal in K-space.
+    :param sensor_az: The sensor azimuth positions (rad).
+    :param sensor_el: The sensor elevation positions (rad).
+    :param x_image: The image x-coordinates (m).
+    :param y_image: The image y-coordinates (m).
+    :param z_image: The image z-coordinates (m).
+    :param frequency: The frequency array (Hz).
+    :param fft_length: The number of points in the FFT.
+    :param pulse_block: The number of pulses backprojected together.
+    :param tile_size: The number of pixels backprojected together.
+    :param number_of_workers: The number of worker processes.
+    :param worker_tile_size: The number of pixels given to a worker at a time.
+    :param dtype: The image data type, complex64 halves the memory (see backproject for the error).
+    :param executor: A running pool of workers to use, such as a ProcessPoolExecutor kept for many images, None for
+    a pool of number_of_workers made for the call.
+    :return: The reconstructed image.
+    """
+    with Backprojector(x_image, y_image, z_image, frequency, fft_length, 'Plane Wave', pulse_block, tile_size,
+                       number_of_workers, worker_tile_size, dtype, executor=executor) as backprojector:
+
+        # All the pulses as a single block
+        backprojector.add_pulses(signal, column_stack([sensor_az, sensor_el]))
+
+        return backprojector.snapshot()
+
+
+def reconstruct3_fast(signal, az, el, x_image, y_image, z_image, frequency, fft_length, pulse_block=16,
+                      tile_size=4096, number_of_workers=1, worker_tile_size=65536, dtype=complex, executor=None):
+    """
+    Reconstruct the three-dimensional image using the filtered backprojection method.
+    Same result as reconstruct3, with all pulses range compressed at once and backprojected in blocks.
+    :param signal: The signal in K-space.
+    :param az: The sensor azimuth positions (rad).
+    :param el: The sensor elevation positions (rad).
+    :param x_image: The image x-coordinates (m).
+    :param y_image: The image y-coordinates (m).
+    :param z_image: The image z-coordinates (m).
+    :param frequency: The frequency array (Hz).
+    :param fft_length: The number of points in the FFT.
+    :param pulse_block: The number of pulses backprojected together.
+    :param tile_size: The number of pixels backprojected together.
+    :param number_of_workers: The number of worker processes.
+    :param worker_tile_size: The number of pixels given to a worker at a time.
+    :param dtype: The image data type, complex64 halves the memory (see backproject for the error).
+    :param executor: A running pool of workers to use, such as a ProcessPoolExecutor kept for many images, None for
+    a pool of number_of_workers made for the call.
+    :return: The reconstructed image.
+    """
+    # Treat the elevation / azimuth grid as a list of pulses
+    nr, nc = az.shape
+
+    return reconstruct2_fast(signal.reshape(signal.shape[0], nr * nc), az.ravel(), el.ravel(), x_image, y_image,
+                             z_image, frequency, fft_length, pulse_block, tile_size, number_of_workers,
+                             worker_tile_size, dtype, executor)
+
+
+def reconstruct_polarimetric(signals, sensor_x, sensor_y, sensor_z, range_center, x_image, y_image, z_image,
+                             frequency, fft_length, pulse_block=16, tile_size=4096, number_of_workers=1,
+                             worker_tile_size=65536, dtype=complex, executor=None):
+    """
+    Reconstruct the images of several polarization channels together using the filtered backprojection method.
+    The ranges, interpolation weights and phase are found once and applied to every channel, which leaves the
+    gather and sum of the range profile for each channel. Four channels take about twice the time of one.
+    :param signals: The signal in K-space for each channel (channels x frequency x pulses).
+    :param sensor_x: The sensor x-coordinate (m).
+    :param sensor_y: The sensor y-coordinate (m).
+    :param sensor_z: The sensor z-coordinate (m).
+    :param range_center: The range to the center of the image (m).
+    :param x_image: The x-coordinates of the image (m).
+    :param y_image: The y-coordinates of the image (m).
+    :param z_image: The z-coordinates of the image (m).
+    :param frequency: The frequency array (Hz).
+    :param fft_length: The number of points in the FFT.
+    :param pulse_block: The number of pulses backprojected together.
+    :param tile_size: The number of pixels backprojected together.
+    :param number_of_workers: The number of worker processes.
+    :param worker_tile_size: The number of pixels given to a worker at a time.
+    :param dtype: The image data type, complex64 halves the memory (see backproject for the error).
+    :param executor: A running pool of workers to use, such as a ProcessPoolExecutor kept for many images, None for
+    a pool of number_of_workers made for the call.
+    :return: The reconstructed image for each channel.
+    """
+    signals = asarray(signals)
+
+    with Backprojector(x_image, y_image, z_image, frequency, fft_length, 'Spherical', pulse_block, tile_size,
+                       number_of_workers, worker_tile_size, dtype, len(signals), executor) as backprojector:
+
+        # All the pulses as a single block
+        backprojector.add_pulses(signals, column_stack([sensor_x, sensor_y, sensor_z]), range_center)
+
+        return backprojector.snapshot().reshape((len(signals),) + x_image.shape)
+
+
+def reconstruct2_polarimetric(signals, sensor_az, sensor_el, x_image, y_image, z_image, frequency, fft_length,
+                              pulse_block=16, tile_size=4096, number_of_workers=1, worker_tile_size=65536,
+                              dtype=complex, executor=None):
+    """
+    Reconstruct the images of several polarization channels together using the filtered backprojection method.
+    The ranges, interpolation weights and phase are found once and applied to every channel, which leaves the
+    gather and sum of the range profile for each channel. Four channels take about twice the time of one.
+    :param signals: The signal in K-space for each channel (channels x frequency x pulses).
+    :param sensor_az: The sensor azimuth positions (rad).
+    :param sensor_el: The sensor elevation positions (rad).
+    :param x_image: The image x-coordinates (m).
+    :param y_image: The image y-coordinates (m).
+    :param z_image: The image z-coordinates (m).
+    :param frequency: The frequency array (Hz).
+    :param fft_length: The number of points in the FFT.
+    :param pulse_block: The number of pulses backprojected together.
+    :param tile_size: The number of pixels backprojected together.
+    :param number_of_workers: The number of worker processes.
+    :param worker_tile_size: The number of pixels given to a worker at a time.
+    :param dtype: The image data type, complex64 halves the memory (see backproject for the error).
+    :param executor: A running pool of workers to use, such as a ProcessPoolExecutor kept for many images, None for
+    a pool of number_of_workers made for the call.
+    :return: The reconstructed image for each channel.
+    """
+    signals = asarray(signals)
+
+    with Backprojector(x_image, y_image, z_image, frequency, fft_length, 'Plane Wave', pulse_block, tile_size,
+                       number_of_workers, worker_tile_size, dtype, len(signals), executor) as backprojector:
+
+        # All the pulses as a single block
+        backprojector.add_pulses(signals, column_stack([sensor_az, sensor_el]))
+
+        return backprojector.snapshot().reshape((len(signals),) + x_image.shape)
+
+
+def reconstruct3_chunked(signal, az, el, x, y, z, frequency, fft_length, memory_budget=1073741824, output=None,
+                         pulse_block=16, tile_size=4096, number_of_workers=1, worker_tile_size=65536, dtype=complex,
+                         executor=None):
+    """
+    Reconstruct the three-dimensional image one slab of the volume at a time within a memory budget.
+    The volume is the grid meshgrid(x, y, z, indexing='ij'), formed in slabs along x so that only the geometry of
+    one slab is held in memory. The output may be a memory mapped file for volumes larger than memory.
+    The budget holds the range profiles, the pulses, the tile work arrays of each worker, the slab geometry and image
+    and the partial image of the workers. The pulses are range compressed in blocks within the same budget, so the
+    signal is never converted all at once. The output and the signal passed in are not counted.
+    With worker processes, the range profiles, pulses and slab geometry are placed in shared memory once.
+    :param signal: The signal in K-space.
+    :param az: The sensor azimuth positions (rad).
+    :param el: The sensor elevation positions (rad).
+    :param x: The image x-coordinates (m).
+    :param y: The image y-coordinates (m).
+    :param z: The image z-coordinates (m).
+    :param frequency: The frequency array (Hz).
+    :param fft_length: The number of points in the FFT.
+    :param memory_budget: The approximate memory for the range profiles, the slabs and the work arrays (bytes).
+    :param output: Array (x, y, z) for the image, the name of a .npy file to memory map, or None for a new array.
+    :param pulse_block: The number of pulses backprojected together.
+    :param tile_size: The number of pixels backprojected together.
+    :param number_of_workers: The number of workers, also taken as the size of a running pool.
+    :param worker_tile_size: The number of pixels given to a worker at a time.
+    :param dtype: The image data type, complex64 halves the memory (see backproject for the error).
+    :param executor: A running pool of workers to use, None for a pool of number_of_workers made for the call and
+    kept for all the slabs.
+    :return: The reconstructed image.
+    """
+    x = asarray(x, dtype=float)
+    y = asarray(y, dtype=float)
+    z = asarray(z, dtype=float)
+    nx, ny, nz = len(x), len(y), len(z)
+
+    # Initialize the image
+    if output is None:
+        output = zeros([nx, ny, nz], dtype=dtype)
+    elif isinstance(output, (str, PurePath)):
+        output = open_memmap(output, mode='w+', dtype=dtype, shape=(nx, ny, nz))
+
+    signal = asarray(signal).reshape(len(frequency), -1)
+    number_of_pulses = signal.shape[1]
+
+    pulse_matrix = _plane_wave_pulses(asarray(az).ravel(), asarray(el).ravel())
+    window = range_window(frequency, fft_length)
+
+    # One pool of workers for all the slabs
+    pool = executor
+    if pool is None and number_of_workers > 1:
+        pool = ProcessPoolExecutor(number_of_workers)
+
+    item_bytes = result_type(dtype).itemsize
+
+    # Memory held for the whole volume: the range profiles, the pulses and their scaled copy, and for each worker the
+    # tile work arrays, the phased range profiles of a pulse block with their temporaries and the phase tables
+    phase_bits = _phase_bits(4.0 * pi * frequency[0] / c * (window[1] - window[0]))
+    tile_bytes = 128 * pulse_block * min(tile_size, nx * ny * nz) + \
+        6 * pulse_block * (fft_length + 1) * item_bytes + 4 * 2 ** phase_bits * 16
+    fixed_bytes = fft_length * number_of_pulses * item_bytes + 2 * pulse_matrix.nbytes + \
+        tile_bytes * max(number_of_workers, 1)
+
+    # Memory for each voxel of a slab: the pixel geometry, the slab image, and the partial image of the workers
+    voxel_bytes = 3 * 8 + item_bytes + (item_bytes if pool is not None else 0)
+
+    # Number of x planes in a slab, and of pulses range compressed together with the converted and unshifted signal
+    available = memory_budget - fixed_bytes
+    slab = int(clip(available // (voxel_bytes * ny * nz), 1, nx))
+    compress_block = int(clip(available // ((len(frequency) + 2 * fft_length) * item_bytes), 1, number_of_pulses))
+
+    # Range profiles and slab geometry, in shared memory for worker processes
+    memories = []
+    shared = None
+    if isinstance(pool, ProcessPoolExecutor):
+        profile_memory, profile_descriptor = named_array((fft_length, number_of_pulses), result_type(dtype))
+        pixel_memory, pixel_descriptor = named_array((3 * slab * ny * nz,), float)
+        pulse_memory, pulse_descriptor = share_named(pulse_matrix)
+        memories = [profile_memory, pixel_memory, pulse_memory]
+        shared = {'range_profiles': profile_descriptor, 'pulse_matrix': pulse_descriptor}
+
+        range_profiles = shared_array(profile_memory.buf, *profile_descriptor[1:])
+        pixel_buffer = shared_array(pixel_memory.buf, *pixel_descriptor[1:])
+    else:
+        range_profiles = empty((fft_length, number_of_pulses), dtype=dtype)
+        pixel_buffer = empty(3 * slab * ny * nz)
+
+    image_buffer = empty(slab * ny * nz, dtype=output.dtype)
+
+    try:
+        # Range compress the pulses a block at a time
+        for start in range(0, number_of_pulses, compress_block):
+            block = slice(start, min(start + compress_block, number_of_pulses))
+            range_profiles[:, block] = range_compress(asarray(signal[:, block], dtype=dtype), fft_length)
+
+        for start in range(0, nx, slab):
+            xs = x[start:start + slab]
+            number_of_pixels = len(xs) * ny * nz
+
+            # Pixel geometry for the slab
+            pixel_matrix = pixel_buffer[:3 * number_of_pixels].reshape(3, len(xs), ny, nz)
+            pixel_matrix[0] = xs[:, None, None]
+            pixel_matrix[1] = y[None, :, None]
+            pixel_matrix[2] = z[None, None, :]
+            pixel_matrix = pixel_matrix.reshape(3, -1)
+
+            if shared is not None:
+                shared['pixel_matrix'] = (pixel_descriptor[0], pixel_matrix.shape, pixel_descriptor[2])
+
+            # Backproject all the pulses onto the slab
+            bp_slab = image_buffer[:number_of_pixels]
+            bp_slab[:] = 0.0
+            backproject_parallel(bp_slab, range_profiles, pulse_matrix, pixel_matrix, window, frequency[0], None,
+                                 pulse_block, tile_size, number_of_workers, worker_tile_size,
+                                 executor='Process' if pool is None else pool, shared=shared)
+
+            output[start:start + len(xs)] = bp_slab.reshape(len(xs), ny, nz)
+    finally:
+        # Drop the views of the shared memory before releasing it
+        range_profiles = pixel_buffer = pixel_matrix = None
+        for memory in memories:
+            memory.close()
+            memory.unlink()
+        if pool is not executor:
+            pool.shutdown()
+
+    return output
+
+
+class Backprojector:
+    """
+    Backprojection image former that consumes pulses as they arrive.
+    The image is updated in place by each block of pulses, so memory is bounded by the image size and not by the
+    number of pulses.
+    """
+    def __init__(self, x_image, y_image, z_image, frequency, fft_length, geometry='Spherical', pulse_block=16,
+                 tile_size=4096, number_of_workers=1, worker_tile_size=65536, dtype=complex, channels=1,
+                 executor=None):
+        """
+        Set up the image and the pixel geometry.
+        :param x_image: The x-coordinates of the image (m).
+        :param y_image: The y-coordinates of the image (m).
+        :param z_image: The z-coordinates of the image (m).
+        :param frequency: The frequency array (Hz).
+        :param fft_length: The number of points in the FFT.
+        :param geometry: The sensor geometry (Spherical/Plane Wave).
+        :param pulse_block: The number of pulses backprojected together.
+        :param tile_size: The number of pixels backprojected together.
+        :param number_of_workers: The number of worker processes.
+        :param worker_tile_size: The number of pixels given to a worker at a time.
+        :param dtype: The image data type, complex64 halves the memory (see backproject for the error).
+        :param channels: The number of channels (polarizations) formed together.
+        :param executor: A running pool of workers to use for each block, None for a pool of number_of_workers kept
+        until the backprojector is closed.
+        """
+        self.shape = x_image.shape
+        self.channels = channels
+        self.frequency = frequency
+        self.fft_length = fft_length
+        self.geometry = geometry
+        self.pulse_block = pulse_block
+        self.tile_size = tile_size
+        self.number_of_workers = number_of_workers
+        self.worker_tile_size = worker_tile_size
+        self.executor = executor
+        self.own_executor = False
+
+        # Pixel geometry in named shared memory for worker processes, shared on the first block
+        self.pixel_memory = None
+        self.shared = None
+
+        self.window = range_window(frequency, fft_length)
+        self.number_of_pulses = 0
+
+        # The pixel geometry does not change from block to block
+        if geometry == 'Spherical':
+            self.pixel_matrix, self.image_center = _spherical_pixels(x_image, y_image, z_image)
+        else:
+            self.pixel_matrix = vstack([x_image.ravel(), y_image.ravel(), z_image.ravel()])
+
+        # Initialize the image, with a leading channel axis for more than one channel
+        self.image = zeros((x_image.size,) if channels == 1 else (channels, x_image.size), dtype=dtype)
+
+    def add_pulses(self, signal_block, positions, range_center=None):
+        """
+        Range compress a block of pulses and backproject them onto the image.
+        :param signal_block: The signal in K-space for the block (frequency x pulses, with a leading channel axis).
+        :param positions: The sensor x, y, z positions (m) for Spherical, or az, el (rad) for Plane Wave (pulses x 3/2).
+        :param range_center: The range to the center of the image for each pulse (m), Spherical only, None for the
+        distance from each position to the image center.
+        :return:
+        """
+        number_of_pulses = asarray(positions).size // (3 if self.geometry == 'Spherical' else 2)
+        signal_block = asarray(signal_block, dtype=self.image.dtype).reshape(self.image.shape[:-1] +
+                                                                             (len(self.frequency), number_of_pulses))
+
+        self.add_profiles(range_compress(signal_block, self.fft_length), positions, range_center)
+
+    def add_profiles(self, range_profiles, positions, range_center=None):
+        """
+        Backproject a block of range compressed pulses onto the image, such as profiles from a RangeProfileCache.
+        :param range_profiles: The range profiles for the block (fft_length x pulses, with a leading channel axis).
+        :param positions: The sensor x, y, z positions (m) for Spherical, or az, el (rad) for Plane Wave (pulses x 3/2).
+        :param range_center: The range to the center of the image for each pulse (m), Spherical only, None for the
+        distance from each position to the image center.
+        :return:
+        """
+        positions = asarray(positions, dtype=float).reshape(-1, 3 if self.geometry == 'Spherical' else 2)
+        number_of_pulses = positions.shape[0]
+
+        if self.geometry == 'Spherical':
+            pulse_matrix = _spherical_pulses(positions[:, 0], positions[:, 1], positions[:, 2], self.image_center)
+            if range_center is None:
+                # Range from each position to the image center, the last column of the pulse matrix is its square
+                range_center = sqrt(pulse_matrix[:, 4])
+            else:
+                # To work with stripmap
+                range_center = asarray(range_center, dtype=float) * ones(number_of_pulses)
+        else:
+            range_center = None
+            pulse_matrix = _plane_wave_pulses(positions[:, 0], positions[:, 1])
+
+        range_profiles = asarray(range_profiles, dtype=self.image.dtype).reshape(self.image.shape[:-1] +
+                                                                                 (self.fft_length, number_of_pulses))
+
+        if self.executor is None and self.number_of_workers > 1:
+            # One pool of workers for all the blocks
+            self.executor = ProcessPoolExecutor(self.number_of_workers)
+            self.own_executor = True
+
+        if isinstance(self.executor, ProcessPoolExecutor) and self.shared is None:
+            # Share the pixel geometry once for the image
+            self.pixel_memory, descriptor = share_named(self.pixel_matrix)
+            self.shared = {'pixel_matrix': descriptor}
+
+        backproject_parallel(self.image, range_profiles, pulse_matrix, self.pixel_matrix, self.window,
+                             self.frequency[0], range_center, self.pulse_block, self.tile_size,
+                             self.number_of_workers, self.worker_tile_size,
+                             executor='Process' if self.executor is None else self.executor, shared=self.shared)
+
+        self.number_of_pulses += number_of_pulses
+
+    def snapshot(self):
+        """
+        The image formed from the pulses added so far.
+        :return: A copy of the current image.
+        """
+        return self.image.reshape(self.image.shape[:-1] + self.shape).copy()
+
+    def reset(self):
+        """
+        Clear the image to start a new accumulation.
+        :return:
+        """
+        self.image[:] = 0.0
+        self.number_of_pulses = 0
+
+    def close(self):
+        """
+        Release the shared pixel geometry and shut down the pool of workers made by the backprojector.
+        :return:
+        """
+        if self.pixel_memory is not None:
+            self.pixel_memory.close()
+            self.pixel_memory.unlink()
+            self.pixel_memory = None
+            self.shared = None
+
+        if self.own_executor:
+            self.executor.shutdown()
+            self.executor = None
+            self.own_executor = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class RangeProfileCache:
+    """
+    Least recently used cache of range profiles under a memory limit.
+    Profiles are kept for all the pulses of a signal, so images of other regions, grids or pulse subsets of the same
+    collection skip range compression.
+    """
+    def __init__(self, memory_limit=536870912):
+        """
+        Set up an empty cache.
+        :param memory_limit: The largest memory held by the cached profiles (bytes).
+        """
+        self.memory_limit = memory_limit
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+
+    def profiles(self, signal, fft_length, frequency_window=None, pulses=None, key=None):
+        """
+        The range profiles of a signal, range compressing only when they are not in the cache.
+        :param signal: The signal in K-space (frequency x pulses).
+        :param fft_length: The number of points in the FFT, larger for upsampled profiles.
+        :param frequency_window: The window applied along frequency before compression, None for no window.
+        :param pulses: The pulses to return, None for all the pulses.
+        :param key: A key naming the signal, such as the file and polarization, None to use a digest of the signal.
+        :return: The range profiles (fft_length x pulses), read only when all the pulses are returned.
+        """
+        signal = asarray(signal)
+        if key is None:
+            key = digest(signal)
+        window_key = None if frequency_window is None else digest(asarray(frequency_window, dtype=float))
+        entry_key = (key, signal.shape, signal.dtype.str, fft_length, window_key)
+
+        range_profiles = self.entries.get(entry_key)
+        if range_profiles is None:
+            self.misses += 1
+            if frequency_window is not None:
+                signal = signal * asarray(frequency_window)[:, None]
+            range_profiles = range_compress(signal, fft_length)
+            range_profiles.flags.writeable = False
+            self._store(entry_key, range_profiles)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(entry_key)
+
+        return range_profiles if pulses is None else range_profiles[:, pulses]
+
+    def clear(self):
+        """
+        Remove all the profiles from the cache.
+        :return:
+        """
+        self.entries.clear()
+        self.memory = 0
+
+    def _store(self, entry_key, range_profiles):
+        """
+        Add profiles to the cache, evicting the least recently used until they fit.
+        :param entry_key: The key of the profiles.
+        :param range_profiles: The range profiles.
+        :return:
+        """
+        if range_profiles.nbytes > self.memory_limit:
+            return
+
+        while self.memory + range_profiles.nbytes > self.memory_limit:
+            _, evicted = self.entries.popitem(last=False)
+            self.memory -= evicted.nbytes
+
+        self.entries[entry_key] = range_profiles
+        self.memory += range_profiles.nbytes
+
+
+def range_window(frequency, fft_length):
+    """
+    Calculate the range window covered by the range profiles.
+    :param frequency: The frequency array (Hz).
+    :param fft_length: The number of points in the FFT.
+    :return: The range window (m).
+    """
+    # Get the frequency step size
+    frequency_step = frequency[1] - frequency[0]
+
+    # Calculate the maximum scene size and resolution
+    range_extent = c / (2.0 * frequency_step)
+
+    return linspace(-0.5 * range_extent, 0.5 * range_extent, fft_length)
+
+
+def spherical_geometry(sensor_x, sensor_y, sensor_z, x_image, y_image, z_image):
+    """
+    Set up the matrices whose product is the squared range from each sensor position to each pixel.
+    Coordinates are taken relative to the image center to limit round off.
+    :param sensor_x: The sensor x-coordinate (m).
+    :param sensor_y: The sensor y-coordinate (m).
+    :param sensor_z: The sensor z-coordinate (m).
+    :param x_image: The x-coordinates of the image (m).
+    :param y_image: The y-coordinates of the image (m).
+    :param z_image: The z-coordinates of the image (m).
+    :return: The pulse matrix (pulses x 5) and the pixel matrix (5 x pixels).
+    """
+    pixel_matrix, image_center = _spherical_pixels(x_image, y_image, z_image)
+
+    return _spherical_pulses(sensor_x, sensor_y, sensor_z, image_center), pixel_matrix
+
+
+def plane_wave_geometry(sensor_az, sensor_el, x_image, y_image, z_image):
+    """
+    Set up the matrices whose product is the plane wave range from each sensor angle to each pixel.
+    :param sensor_az: The sensor azimuth positions (rad).
+    :param sensor_el: The sensor elevation positions (rad).
+    :param x_image: The image x-coordinates (m).
+    :param y_image: The image y-coordinates (m).
+    :param z_image: The image z-coordinates (m).
+    :return: The pulse matrix (pulses x 3) and the pixel matrix (3 x pixels).
+    """
+    return _plane_wave_pulses(sensor_az, sensor_el), vstack([x_image.ravel(), y_image.ravel(), z_image.ravel()])
+
+
+def backproject(bp_image, range_profiles, pulse_matrix, pixel_matrix, window, start_frequency, range_center=None,
+                pulse_block=16, tile_size=4096):
+    """
+    Backproject range profiles onto the image, accumulating in place.
+    The range phase is folded into the profile samples and the remaining phase across a range bin is the product of
+    three small tables, so no exponentials are evaluated per pixel. The phase error is below PHASE_ERROR.
+    Each tile is worked through whole array passes into reused buffers sized to stay in cache.
+    The work is done in the precision of the image. Ranges are always found in double precision, and for a complex64
+    image the profiles, tables and sums are single precision. Each term is then within about 4 eps (eps = 6e-8) of
+    the double precision term, and blocked summation adds (log2(pulse_block) + pulses / pulse_block) eps relative to
+    the sum of the term magnitudes. For a focused target the error relative to the image peak is therefore below
+    (4 + log2(pulse_block) + pulses / pulse_block) * 6e-8, or about 4e-6 for 1000 pulses in blocks of 16.
+    Several channels, such as polarizations, may be backprojected together. The ranges, interpolation indices,
+    weights and phase are found once and applied to each channel. These are about two thirds of the time for a
+    single channel, and each further channel adds the gather, interpolation and sum of its range profile, which
+    are limited by memory traffic. The channels are gathered one at a time, as a single gather from the channel
+    stacked tables moves the same data and is slower in practice.
+    :param bp_image: The flattened image to accumulate into (pixels, or channels x pixels).
+    :param range_profiles: The range profiles (range x pulses, or channels x range x pulses).
+    :param pulse_matrix: The pulse geometry matrix.
+    :param pixel_matrix: The pixel geometry matrix.
+    :param window: The range window (m).
+    :param start_frequency: The start frequency (Hz).
+    :param range_center: The range center for each pulse (m), None for plane wave geometry.
+    :param pulse_block: The number of pulses backprojected together.
+    :param tile_size: The number of pixels backprojected together.
+    :return:
+    """
+    number_of_bins, number_of_pulses = range_profiles.shape[-2:]
+    number_of_pixels = pixel_matrix.shape[1]
+
+    # Treat a single image as one channel
+    range_profiles = range_profiles.reshape(-1, number_of_bins, number_of_pulses)
+    images = bp_image.reshape(-1, number_of_pixels)
+    number_of_channels = len(images)
+
+    # Range bin size and the range phase at each bin
+    range_step = window[1] - window[0]
+    term = 1j * 4.0 * pi * start_frequency / c
+    window_phase = exp(term * window).astype(bp_image.dtype)
+
+    # Phase across a single range bin, coarse to fine
+    bits, (coarse_phase, middle_phase, fine_phase) = _phase_tables(term * range_step, bp_image.dtype)
+    mask = 2 ** bits - 1
+
+    # Geometry scaled to give the position in range bins, less an offset for each pulse
+    if range_center is None:
+        pulse_matrix = pulse_matrix / range_step
+        bin_offset = full(number_of_pulses, window[0] / range_step)
+    else:
+        pulse_matrix = pulse_matrix / range_step ** 2
+        bin_offset = (asarray(range_center) + window[0]) / range_step
+
+    # Work arrays for a tile, used through views of their leading elements
+    size = min(pulse_block, number_of_pulses) * min(tile_size, number_of_pixels)
+    work = [empty(size), empty(size), empty(size, intp), empty(size, intp), empty(size, intp),
+            zeros(size, bp_image.dtype), empty(size, bp_image.dtype), empty(size, bp_image.dtype),
+            empty(size, bp_image.dtype)]
+    views = {}
+
+    for start in range(0, number_of_pulses, pulse_block):
+        block = slice(start, min(start + pulse_block, number_of_pulses))
+        nb = block.stop - block.start
+
+        # Phased range profile and slope to the next bin, with a zero entry for ranges outside the window
+        profile = zeros([number_of_channels, nb, number_of_bins + 1], dtype=bp_image.dtype)
+        profile[:, :, :-1] = range_profiles[:, :, block].transpose(0, 2, 1) * window_phase
+        slope = zeros_like(profile)
+        slope[:, :, :-2] = range_profiles[:, 1:, block].transpose(0, 2, 1) * window_phase[:-1]
+        slope -= profile
+        profile = profile.ravel()
+        slope = slope.ravel()
+
+        # Start of each pulse and channel in the flattened tables
+        row_start = arange(nb)[:, None] * (number_of_bins + 1)
+        channel_offset = nb * (number_of_bins + 1)
+        row_offset = bin_offset[block, None] - row_start
+
+        for pixel in range(0, number_of_pixels, tile_size):
+            tile = slice(pixel, min(pixel + tile_size, number_of_pixels))
+
+            shape = (nb, tile.stop - tile.start)
+            if shape not in views:
+                views[shape] = [a[:shape[0] * shape[1]].reshape(shape) for a in work]
+            position, whole, index, fraction, table_index, weight, phase, part, value = views[shape]
+
+            # Position of each pixel in the flattened tables, from the range
+            dot(pulse_matrix[block], pixel_matrix[:, tile], out=position)
+            if range_center is not None:
+                sqrt(position, out=position)
+            subtract(position, row_offset, out=position)
+
+            # Ranges outside the window use the zero entry
+            if (position.min(axis=1) < row_start[:, 0]).any() or \
+                    (position.max(axis=1) > row_start[:, 0] + number_of_bins - 1).any():
+                copyto(position, row_start + number_of_bins,
+                       where=(position < row_start) | (position > row_start + number_of_bins - 1))
+
+            # Bin and weight, kept complex to avoid mixed type products
+            floor(position, out=whole)
+            subtract(position, whole, out=weight.real)
+            index[...] = whole
+
+            # Phase across the bin as the product of the tables, from the fraction to 3 * bits binary places
+            subtract(position, whole, out=whole)
+            multiply(whole, 2.0 ** (3 * bits), out=whole)
+            fraction[...] = whole
+            right_shift(fraction, 2 * bits, out=table_index)
+            coarse_phase.take(table_index, out=phase, mode='clip')
+            right_shift(fraction, bits, out=table_index)
+            bitwise_and(table_index, mask, out=table_index)
+            middle_phase.take(table_index, out=part, mode='clip')
+            multiply(phase, part, out=phase)
+            bitwise_and(fraction, mask, out=table_index)
+            fine_phase.take(table_index, out=part, mode='clip')
+            multiply(phase, part, out=phase)
+
+            for channel in range(number_of_channels):
+
+                # Linear interpolation of the range profile
+                profile.take(index, out=value, mode='clip')
+                slope.take(index, out=part, mode='clip')
+                multiply(part, weight, out=part)
+                add(value, part, out=value)
+                multiply(value, phase, out=value)
+
+                images[channel, tile] += value.sum(axis=0)
+
+                index += channel_offset
+
+
+def backproject_parallel(bp_image, range_profiles, pulse_matrix, pixel_matrix, window, start_frequency,
+                         range_center=None, pulse_block=16, tile_size=4096, number_of_workers=1,
+                         worker_tile_size=65536, split='Pixels', executor='Process', shared=None):
+    """
+    Backproject range profiles onto the image with a pool of workers, accumulating in place.
+    Splitting by pixels gives each worker separate tiles of the image, so the result does not depend on the number
+    of workers. Splitting by pulses gives each worker a subset of the pulses and a partial image, and the partial
+    images are summed in worker order at the end.
+    A running pool may be passed as the executor and used for many calls, which saves starting the workers each time.
+    Worker processes read the arrays from named shared memory, copied for the call unless they are already shared.
+    :param bp_image: The flattened image to accumulate into.
+    :param range_profiles: The range profiles (range x pulses).
+    :param pulse_matrix: The pulse geometry matrix.
+    :param pixel_matrix: The pixel geometry matrix.
+    :param window: The range window (m).
+    :param start_frequency: The start frequency (Hz).
+    :param range_center: The range center for each pulse (m), None for plane wave geometry.
+    :param pulse_block: The number of pulses backprojected together.
+    :param tile_size: The number of pixels backprojected together.
+    :param number_of_workers: The number of workers in a pool made for the call, and of pulse subsets.
+    :param worker_tile_size: The number of pixels given to a worker at a time (Pixels split).
+    :param split: How the work is divided between workers (Pixels/Pulses).
+    :param executor: The type of pool made for the call (Process/Thread), or a running ProcessPoolExecutor or
+    ThreadPoolExecutor.
+    :param shared: The name, shape and data type of arrays already in named shared memory (from share_named), by
+    argument name, such as the pixel matrix of an image formed in several calls.
+    :return:
+    """
+    if number_of_workers <= 1 and isinstance(executor, str):
+        backproject(bp_image, range_profiles, pulse_matrix, pixel_matrix, window, start_frequency, range_center,
+                    pulse_block, tile_size)
+        return
+
+    number_of_pixels = pixel_matrix.shape[1]
+    number_of_pulses = range_profiles.shape[-1]
+
+    # Work items as (pixels, pulses, image slot)
+    if split == 'Pixels':
+        slots = 1
+        tasks = [(slice(pixel, min(pixel + worker_tile_size, number_of_pixels)), slice(0, number_of_pulses), 0)
+                 for pixel in range(0, number_of_pixels, worker_tile_size)]
+    else:
+        slots = max(number_of_workers, 1)
+        subset = -(-number_of_pulses // slots)
+        tasks = [(slice(0, number_of_pixels), slice(pulse, min(pulse + subset, number_of_pulses)), slot)
+                 for slot, pulse in enumerate(range(0, number_of_pulses, subset))]
+
+    arrays = {'range_profiles': range_profiles, 'pulse_matrix': pulse_matrix, 'pixel_matrix': pixel_matrix}
+    if range_center is not None:
+        arrays['range_center'] = range_center
+
+    settings = (window, start_frequency, pulse_block, tile_size)
+
+    if executor == 'Thread' or isinstance(executor, ThreadPoolExecutor):
+        arrays['image'] = zeros((slots,) + bp_image.shape, dtype=bp_image.dtype)
+
+        if executor == 'Thread':
+            with ThreadPoolExecutor(number_of_workers) as pool:
+                list(pool.map(_backproject_task, tasks, [settings] * len(tasks), [arrays] * len(tasks)))
+        else:
+            list(executor.map(_backproject_task, tasks, [settings] * len(tasks), [arrays] * len(tasks)))
+
+        _reduce(bp_image, arrays['image'])
+    else:
+        # Place the arrays that are not yet shared in named shared memory for the worker processes
+        descriptors = dict(shared or {})
+        memories = {}
+        for key, value in arrays.items():
+            if key not in descriptors:
+                memories[key], descriptors[key] = share_named(value)
+
+        # Partial images of the workers, made in shared memory
+        memories['image'], descriptors['image'] = named_array((slots,) + bp_image.shape, bp_image.dtype)
+        shared_array(memories['image'].buf, *descriptors['image'][1:])[...] = 0.0
+
+        try:
+            if executor == 'Process':
+                with ProcessPoolExecutor(number_of_workers) as pool:
+                    list(pool.map(_shared_task, tasks, [settings] * len(tasks), [descriptors] * len(tasks)))
+            else:
+                list(executor.map(_shared_task, tasks, [settings] * len(tasks), [descriptors] * len(tasks)))
+
+            image = shared_array(memories['image'].buf, *descriptors['image'][1:])
+            _reduce(bp_image, image)
+            del image
+        finally:
+            for memory in memories.values():
+                memory.close()
+                memory.unlink()
+
+
+def _spherical_pixels(x_image, y_image, z_image):
+    """
+    Set up the pixel part of the spherical geometry, relative to the image center.
+    :param x_image: The x-coordinates of the image (m).
+    :param y_image: The y-coordinates of the image (m).
+    :param z_image: The z-coordinates of the image (m).
+    :return: The pixel matrix (5 x pixels) and the image center (m).
+    """
+    # Image center
+    xc = 0.5 * (x_image.min() + x_image.max())
+    yc = 0.5 * (y_image.min() + y_image.max())
+    zc = 0.5 * (z_image.min() + z_image.max())
+
+    # Positions relative to the image center
+    xi = x_image.ravel() - xc
+    yi = y_image.ravel() - yc
+    zi = z_image.ravel() - zc
+
+    return vstack([xi, yi, zi, xi ** 2 + yi ** 2 + zi ** 2, ones(len(xi))]), (xc, yc, zc)
+
+
+def _spherical_pulses(sensor_x, sensor_y, sensor_z, image_center):
+    """
+    Set up the pulse part of the spherical geometry, relative to the image center.
+    :param sensor_x: The sensor x-coordinate (m).
+    :param sensor_y: The sensor y-coordinate (m).
+    :param sensor_z: The sensor z-coordinate (m).
+    :param image_center: The image center (m).
+    :return: The pulse matrix (pulses x 5).
+    """
+    xs = asarray(sensor_x, dtype=float) - image_center[0]
+    ys = asarray(sensor_y, dtype=float) - image_center[1]
+    zs = asarray(sensor_z, dtype=float) - image_center[2]
+
+    # |s - r|^2 = |s|^2 - 2 s.r + |r|^2
+    return column_stack([-2.0 * xs, -2.0 * ys, -2.0 * zs, ones(len(xs)), xs ** 2 + ys ** 2 + zs ** 2])
+
+
+def _plane_wave_pulses(sensor_az, sensor_el):
+    """
+    Set up the pulse part of the plane wave geometry.
+    :param sensor_az: The sensor azimuth positions (rad).
+    :param sensor_el: The sensor elevation positions (rad).
+    :return: The pulse matrix (pulses x 3).
+    """
+    sensor_az = asarray(sensor_az, dtype=float)
+    sensor_el = asarray(sensor_el, dtype=float)
+
+    # Line of sight direction cosines
+    return column_stack([cos(sensor_el) * cos(sensor_az), cos(sensor_el) * sin(sensor_az), sin(sensor_el)])
+
+
+def _reduce(bp_image, image):
+    """
+    Sum the partial images of the workers into the image in a fixed order.
+    :param bp_image: The flattened image to accumulate into.
+    :param image: The partial images (slots x image).
+    :return:
+    """
+    for slot in range(image.shape[0]):
+        bp_image += image[slot]
+
+
+# Named shared memory attached in a worker process, by name
+_worker_memory = {}
+
+
+def _shared_task(task, settings, descriptors):
+    """
+    Backproject a task in a worker process on the arrays in named shared memory.
+    The shared memory of earlier calls is released, and the memory still in use, such as the pixel geometry of an
+    image formed in several calls, is attached only once.
+    :param task: The pixels, pulses and image slot.
+    :param settings: The range window, start frequency, pulse block and tile size.
+    :param descriptors: The name, shape and data type of each array.
+    :return:
+    """
+    names = [name for name, _, _ in descriptors.values()]
+    for name in list(_worker_memory):
+        if name not in names:
+            _worker_memory.pop(name).close()
+
+    for name in names:
+        if name not in _worker_memory:
+            _worker_memory[name] = SharedMemory(name)
+
+    _backproject_task(task, settings, {key: shared_array(_worker_memory[name].buf, shape, type_code)
+                                       for key, (name, shape, type_code) in descriptors.items()})
+
+
+def _backproject_task(task, settings, arrays):
+    """
+    Backproject a subset of the pulses onto a subset of the pixels.
+    :param task: The pixels, pulses and image slot.
+    :param settings: The range window, start frequency, pulse block and tile size.
+    :param arrays: The arrays to work on.
+    :return:
+    """
+    pixels, pulses, slot = task
+    window, start_frequency, pulse_block, tile_size = settings
+
+    range_center = arrays.get('range_center')
+    if range_center is not None:
+        range_center = range_center[pulses]
+
+    backproject(arrays['image'][slot][..., pixels], arrays['range_profiles'][..., pulses],
+                arrays['pulse_matrix'][pulses], arrays['pixel_matrix'][:, pixels], window, start_frequency,
+                range_center, pulse_block, tile_size)
+
+
+def _phase_tables(bin_phase, dtype):
+    """
+    Tabulate the phase across one range bin as three tables, coarse to fine, whose product is the phase at a fraction
+    of the bin given to 3 * bits binary places. The finest table is taken at the center of its step, so the phase
+    error is below PHASE_ERROR.
+    :param bin_phase: The phase term across one range bin (j rad).
+    :param dtype: The data type of the tables.
+    :return: The number of bits resolved by each table, and the tables.
+    """
+    bits = _phase_bits(bin_phase)
+    entries = arange(2 ** bits)
+
+    return bits, [exp(bin_phase * (entries + offset) / 2.0 ** (bits * level)).astype(dtype)
+                  for level, offset in ((1, 0.0), (2, 0.0), (3, 0.5))]
+
+
+def _phase_bits(bin_phase):
+    """
+    The number of bits resolved by each phase table, with 2 ** bits entries each.
+    :param bin_phase: The phase term across one range bin (j rad).
+    :return: The number of bits.
+    """
+    return int(clip(ceil(log2(abs(bin_phase) / (2.0 * PHASE_ERROR) + 1.0) / 3.0), 4, 14))
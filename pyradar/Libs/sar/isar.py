@@ -0,0 +1,103 @@
+"""
+Project: RadarBook
+File: isar.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from scipy.constants import c, pi
+from numpy import linspace, meshgrid, zeros_like, full_like, sqrt, ceil, radians, arange, asarray, conj
+from Libs.rcs.rcs_sweep import rcs_sweep
+from Libs.sar import polar_format
+
+
+# Index of each polarization in the scattering matrix
+POLARIZATIONS = {'VV': 0, 'HV': 1, 'VH': 2, 'HH': 3}
+
+
+def k_space(mesh, sensor_az, sensor_el, frequency, store_path=None, number_of_workers=1, shadowing=False):
+    """
+    Calculate the monostatic K-space signal of a facet model with physical optics.
+    The sweep runs on a pool of worker processes, and with a store the samples are kept on disk so that later images
+    of the same model only calculate the aspects and frequencies not yet stored.
+    :param mesh: The facet mesh of the target.
+    :param sensor_az: The sensor azimuth positions (rad).
+    :param sensor_el: The sensor elevation positions (rad).
+    :param frequency: The frequency array (Hz).
+    :param store_path: The directory of the result store, None to keep the results in memory only.
+    :param number_of_workers: The number of worker processes.
+    :param shadowing: True to remove the facets hidden by other facets.
+    :return: The signal in K-space for each polarization [VV, HV, VH, HH] (4 x frequency x pulses).
+    """
+    # Radar direction as spherical angles
+    theta = 0.5 * pi - asarray(sensor_el, dtype=float)
+    phi = asarray(sensor_az, dtype=float)
+
+    scattering_matrix = rcs_sweep(mesh, frequency, theta, phi, theta, phi, store_path,
+                                  number_of_workers=number_of_workers, shadowing=shadowing)
+
+    # Conjugate to the phase convention of the K-space signals, exp(-j 4 pi f r / c) for a scatterer at range r
+    return conj(scattering_matrix.transpose(0, 2, 1))
+
+
+def isar_image(mesh, center_azimuth, azimuth_span, center_frequency, bandwidth, elevation=0.0, polarization='VV',
+               number_of_pulses=None, number_of_frequencies=None, x_image=None, y_image=None, store_path=None,
+               number_of_workers=1, shadowing=False, oversampling=2.0, kernel_width=6):
+    """
+    Form the ISAR image of a facet model over an aspect window and band.
+    The K-space signal is calculated with physical optics and the image is formed in the Fourier domain with the
+    polar format gridding. By default, the frequencies and pulses are spaced so that the target fits inside the
+    unambiguous image, and the image covers the target at half the resolution cell.
+    :param mesh: The facet mesh of the target.
+    :param center_azimuth: The center of the aspect window (deg).
+    :param azimuth_span: The width of the aspect window (deg).
+    :param center_frequency: The center frequency (Hz).
+    :param bandwidth: The bandwidth (Hz).
+    :param elevation: The elevation of the sensor (deg).
+    :param polarization: The polarization of the image (VV/HV/VH/HH).
+    :param number_of_pulses: The number of pulses in the aspect window, from the target size if None.
+    :param number_of_frequencies: The number of frequencies in the band, from the target size if None.
+    :param x_image: The image x-coordinates (m), from the target size if None.
+    :param y_image: The image y-coordinates (m), from the target size if None.
+    :param store_path: The directory of the K-space store, None to keep the K-space data in memory only.
+    :param number_of_workers: The number of worker processes.
+    :param shadowing: True to remove the facets hidden by other facets.
+    :param oversampling: The oversampling of the gridding grid.
+    :param kernel_width: The width of the gridding kernel (grid points).
+    :return: The image, the image x-coordinates and y-coordinates (m).
+    """
+    # Bounding sphere of the target
+    lower = mesh.vertices.min(axis=0)
+    upper = mesh.vertices.max(axis=0)
+    center = 0.5 * (lower + upper)
+    extent = sqrt(((upper - lower) ** 2).sum())
+
+    # Sample the band and aspect window so the target is inside the unambiguous extent
+    wavelength = c / (center_frequency + 0.5 * bandwidth)
+    if number_of_frequencies is None:
+        number_of_frequencies = int(ceil(2.0 * extent * bandwidth / c)) + 1
+    if number_of_pulses is None:
+        number_of_pulses = int(ceil(2.0 * extent * radians(azimuth_span) / wavelength)) + 1
+
+    frequency = linspace(center_frequency - 0.5 * bandwidth, center_frequency + 0.5 * bandwidth,
+                         number_of_frequencies)
+    sensor_az = radians(center_azimuth + linspace(-0.5 * azimuth_span, 0.5 * azimuth_span, number_of_pulses))
+    sensor_el = full_like(sensor_az, radians(elevation))
+
+    # Image grid over the target at half the resolution
+    if x_image is None or y_image is None:
+        spacing = 0.5 * min(c / (2.0 * bandwidth), c / (2.0 * center_frequency * radians(azimuth_span)))
+        n = int(ceil(extent / spacing))
+        x_image, y_image = meshgrid(center[0] + spacing * (arange(n) - n // 2),
+                                    center[1] + spacing * (arange(n) - n // 2))
+
+    signal = k_space(mesh, sensor_az, sensor_el, frequency, store_path, number_of_workers, shadowing)
+
+    image = polar_format.reconstruct(signal[POLARIZATIONS[polarization]], sensor_az, sensor_el, x_image, y_image,
+                                     zeros_like(x_image), frequency, None, oversampling, kernel_width)
+
+    return image, x_image, y_image
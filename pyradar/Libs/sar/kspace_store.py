@@ -0,0 +1,236 @@
+"""
+Project: RadarBook
+File: kspace_store.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import array, squeeze, atleast_1d, asarray, concatenate, memmap, load, savez, radians, flatnonzero, repeat, \
+    tile, dtype, array_equal, int64
+from scipy.io import loadmat
+from pathlib import Path
+
+
+# Polarization fields found in the K-space data files
+POLARIZATIONS = ('vv', 'hh', 'hv', 'vh', 'vhhv')
+
+
+def load_mat(filename):
+    """
+    Read the data structure from a K-space .mat file.
+    :param filename: The name of the .mat file.
+    :return: Dictionary of the structure fields with the same names as used in MATLAB.
+    """
+    b = loadmat(filename)
+
+    # Fields of the data structure
+    values = b['data'][0, 0]
+
+    return {key: squeeze(values[key]) for key in values.dtype.names}
+
+
+def convert(filenames, store_path):
+    """
+    Convert K-space .mat files into a memory mapped store, one block of pulses for each file.
+    Each polarization is a binary file of pulses (rows) by frequency (columns), and an index holds the azimuth,
+    elevation and block of each pulse, with the modification time and size of each source file.
+    :param filenames: The names of the .mat files, all with the same frequencies.
+    :param store_path: The directory for the store.
+    :return: The store.
+    """
+    store_path = Path(store_path)
+    store_path.mkdir(parents=True, exist_ok=True)
+
+    # The index is written last, so a conversion that stops part way is converted again
+    (store_path / 'index.npz').unlink(missing_ok=True)
+
+    azimuth = []
+    elevation = []
+    block_names = []
+    block_start = []
+    block_shape = []
+    polarizations = None
+    frequency = None
+    data_type = None
+    files = {}
+    number_of_pulses = 0
+
+    for filename in filenames:
+        data = load_mat(filename)
+
+        # Polarizations and frequencies come from the first file
+        if polarizations is None:
+            polarizations = [p for p in POLARIZATIONS if p in data]
+            frequency = atleast_1d(data['FGHz']) * 1e9
+            data_type = asarray(data[polarizations[0]]).dtype
+            files = {p: open(store_path / (p + '.dat'), 'wb') for p in polarizations}
+        elif not array_equal(atleast_1d(data['FGHz']) * 1e9, frequency):
+            raise ValueError('{0} has different frequencies from the other files of the store.'.format(filename))
+
+        azim = atleast_1d(data['azim']).astype(float)
+        elev = atleast_1d(data['elev']).astype(float)
+        na = len(azim)
+        ne = len(elev)
+
+        # Pulses are ordered elevation by azimuth, as in the (frequency, elevation, azimuth) data
+        azimuth.append(tile(azim, ne))
+        elevation.append(repeat(elev, na))
+        block_names.append(Path(filename).stem)
+        block_start.append(number_of_pulses)
+        block_shape.append((ne, na))
+        number_of_pulses += ne * na
+
+        for p in polarizations:
+            signal = asarray(data[p], dtype=data_type).reshape(len(frequency), ne * na)
+            signal.T.tofile(files[p])
+
+    for f in files.values():
+        f.close()
+
+    savez(store_path / 'index.npz', frequency=frequency, azimuth=concatenate(azimuth),
+          elevation=concatenate(elevation), block_names=asarray(block_names), block_start=asarray(block_start),
+          block_shape=asarray(block_shape), polarizations=asarray(polarizations), data_type=str(data_type),
+          sources=asarray([str(Path(f).resolve()) for f in filenames]), source_stamps=_stamps(filenames))
+
+    return KSpaceStore(store_path)
+
+
+class KSpaceStore:
+    """
+    Memory mapped K-space data with an index over azimuth, elevation, polarization and frequency.
+    Only the pulses that are selected are read from disk, and the operating system keeps them cached for repeated
+    image formation.
+    """
+    def __init__(self, store_path):
+        """
+        Open a store written by convert.
+        :param store_path: The directory of the store.
+        """
+        self.store_path = Path(store_path)
+
+        index = load(self.store_path / 'index.npz')
+        self.frequency = index['frequency']
+        self.azimuth = index['azimuth']
+        self.elevation = index['elevation']
+        self.block_names = list(index['block_names'])
+        self.block_start = index['block_start']
+        self.block_shape = index['block_shape']
+        self.polarizations = list(index['polarizations'])
+        self.data_type = dtype(str(index['data_type']))
+        self.sources = list(index['sources'])
+        self.source_stamps = index['source_stamps']
+
+        self.number_of_pulses = len(self.azimuth)
+
+        # Map the polarizations on first use
+        self.signals = {}
+
+    def signal(self, polarization):
+        """
+        The memory mapped signal for a polarization.
+        :param polarization: The polarization (VV/HH/HV/VH/VHHV).
+        :return: The signal (pulses x frequency).
+        """
+        p = polarization.lower()
+        if p not in self.signals:
+            self.signals[p] = memmap(self.store_path / (p + '.dat'), dtype=self.data_type, mode='r',
+                                     shape=(self.number_of_pulses, len(self.frequency)))
+        return self.signals[p]
+
+    def select(self, polarization, az_start=-360.0, az_end=360.0, el_start=-90.0, el_end=90.0, f_start=0.0,
+               f_end=float('inf')):
+        """
+        Read the pulses inside an azimuth, elevation and frequency range.
+        :param polarization: The polarization (VV/HH/HV/VH/VHHV).
+        :param az_start: The start azimuth (deg).
+        :param az_end: The end azimuth (deg).
+        :param el_start: The start elevation (deg).
+        :param el_end: The end elevation (deg).
+        :param f_start: The start frequency (Hz).
+        :param f_end: The end frequency (Hz).
+        :return: The signal (frequency x pulses), the sensor azimuth and elevation (rad), the frequency (Hz).
+        """
+        # Pulses and frequencies in the ranges
+        pulses = self.pulses(az_start, az_end, el_start, el_end)
+        frequencies = flatnonzero((f_start <= self.frequency) & (self.frequency <= f_end))
+
+        signal = self.signal(polarization)[pulses][:, frequencies].T
+
+        return signal, radians(self.azimuth[pulses]), radians(self.elevation[pulses]), self.frequency[frequencies]
+
+    def pulses(self, az_start=-360.0, az_end=360.0, el_start=-90.0, el_end=90.0, name=None):
+        """
+        The index of the pulses inside an azimuth and elevation range.
+        :param az_start: The start azimuth (deg).
+        :param az_end: The end azimuth (deg).
+        :param el_start: The start elevation (deg).
+        :param el_end: The end elevation (deg).
+        :param name: The name of the .mat file without the extension to take the pulses from, None for all files.
+        :return: The pulse index.
+        """
+        block = self.block_pulses(name) if name is not None else slice(0, self.number_of_pulses)
+        return block.start + flatnonzero((az_start <= self.azimuth[block]) & (self.azimuth[block] <= az_end) &
+                                         (el_start <= self.elevation[block]) & (self.elevation[block] <= el_end))
+
+    def block_pulses(self, name):
+        """
+        The pulses converted from one .mat file.
+        :param name: The name of the .mat file without the extension.
+        :return: The slice of the pulses.
+        """
+        b = self.block_names.index(name)
+        ne, na = self.block_shape[b]
+        return slice(int(self.block_start[b]), int(self.block_start[b] + ne * na))
+
+    def is_stale(self, filenames):
+        """
+        Whether the store was converted from other files, or the files have changed since.
+        :param filenames: The names of the .mat files.
+        :return: True if the store must be converted again.
+        """
+        return [str(Path(f).resolve()) for f in filenames] != self.sources or \
+            not array_equal(_stamps(filenames), self.source_stamps)
+
+    def block(self, name, polarization):
+        """
+        Read the pulses converted from one .mat file.
+        :param name: The name of the .mat file without the extension.
+        :param polarization: The polarization (VV/HH/HV/VH/VHHV).
+        :return: The signal (frequency x elevation x azimuth) as a writable copy, the azimuth and elevation (deg), the
+        frequency (Hz).
+        """
+        ne, na = self.block_shape[self.block_names.index(name)]
+        pulses = self.block_pulses(name)
+
+        # Copy out of the read only map, so the caller may window the signal in place
+        signal = array(self.signal(polarization)[pulses].T).reshape(len(self.frequency), ne, na)
+
+        return signal, self.azimuth[pulses][:na], self.elevation[pulses][::na], self.frequency
+
+
+def open_store(filenames, store_path):
+    """
+    Open the store, converting the .mat files the first time and again when the files have changed.
+    :param filenames: The names of the .mat files.
+    :param store_path: The directory for the store.
+    :return: The store.
+    """
+    if (Path(store_path) / 'index.npz').exists():
+        store = KSpaceStore(store_path)
+        if not store.is_stale(filenames):
+            return store
+    return convert(filenames, store_path)
+
+
+def _stamps(filenames):
+    """
+    The modification time and size of files, which change when a file is replaced or rewritten.
+    :param filenames: The names of the files.
+    :return: The modification time (ns) and size (bytes) of each file (files x 2).
+    """
+    stats = [Path(f).stat() for f in filenames]
+    return asarray([(s.st_mtime_ns, s.st_size) for s in stats], dtype=int64).reshape(-1, 2)
@@ -0,0 +1,211 @@
+"""
+Project: RadarBook
+File: polar_format.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from scipy.constants import c, pi
+from scipy.fftpack import ifftn, next_fast_len
+from numpy import sqrt, exp, sin, cos, zeros, ones, asarray, unique, rint, floor, intp, arange, bincount, mod, \
+    prod
+from numpy.polynomial.legendre import leggauss
+
+
+def reconstruct(signal, sensor_az, sensor_el, x_image, y_image, z_image, frequency, fft_length=None,
+                oversampling=2.0, kernel_width=6):
+    """
+    Reconstruct the image from plane wave K-space samples in the Fourier domain.
+    The samples are gridded onto an oversampled Cartesian grid with an exponential of semicircle kernel and
+    transformed with one inverse FFT (a type 1 non-uniform FFT). The image coordinates must lie on a uniform grid,
+    and scatterers outside the image extent alias into the image as with any Fourier method.
+    The sum over the samples is divided by the FFT length, as the inverse FFT of the range profiles scales the
+    backprojection image, so the two images of the same signal agree.
+    :param signal: The signal in K-space.
+    :param sensor_az: The sensor azimuth positions (rad).
+    :param sensor_el: The sensor elevation positions (rad).
+    :param x_image: The image x-coordinates (m).
+    :param y_image: The image y-coordinates (m).
+    :param z_image: The image z-coordinates (m).
+    :param frequency: The frequency array (Hz).
+    :param fft_length: The number of points in the FFT of the backprojection image to match, the number of
+    frequencies if None.
+    :param oversampling: The oversampling of the gridding grid.
+    :param kernel_width: The width of the gridding kernel (grid points), the error is about 10^(1 - width).
+    :return: The reconstructed image.
+    """
+    sensor_az = asarray(sensor_az, dtype=float)
+    sensor_el = asarray(sensor_el, dtype=float)
+
+    # Wavenumber of each sample
+    k = 4.0 * pi * asarray(frequency, dtype=float)[:, None] / c
+
+    # Wavenumber components of the K-space samples
+    k_space = [(k * (cos(sensor_el) * cos(sensor_az))[None, :]).ravel(),
+               (k * (cos(sensor_el) * sin(sensor_az))[None, :]).ravel(),
+               (k * sin(sensor_el)[None, :]).ravel()]
+
+    if fft_length is None:
+        fft_length = k.shape[0]
+
+    # Scale of the inverse FFT of the range profiles
+    samples = asarray(signal, dtype=complex).ravel() / fft_length
+
+    # Uniform axes of the image grid
+    image = [asarray(x_image, dtype=float), asarray(y_image, dtype=float), asarray(z_image, dtype=float)]
+    axes = [unique(coordinate) for coordinate in image]
+
+    # Grid the samples along each dimension with more than one pixel
+    shape = []
+    grid_shape = []
+    weights = []
+    offsets = []
+    corrections = []
+    for axis, kd in zip(axes, k_space):
+
+        n = len(axis)
+        center = n // 2
+
+        # Move the phase reference to the center pixel
+        samples = samples * exp(1j * kd * axis[center])
+
+        if n == 1:
+            continue
+
+        step = (axis[-1] - axis[0]) / (n - 1)
+
+        # Oversampled grid and kernel for this dimension
+        m = max(next_fast_len(int(oversampling * n)), kernel_width + 1)
+        weight, offset, correction = _spread_weights(mod(kd * step, 2.0 * pi), m, n, kernel_width)
+
+        shape.append(n)
+        grid_shape.append(m)
+        weights.append(weight)
+        offsets.append(offset)
+        corrections.append(correction)
+
+    # A single pixel is the sum of the samples
+    if not shape:
+        return samples.sum() * ones(image[0].shape)
+
+    # Spread the samples onto the oversampled grid
+    grid = _spread(samples, weights, offsets, grid_shape)
+
+    # Transform to the image domain, keep the central pixels and correct for the kernel
+    image_grid = ifftn(grid) * prod(grid_shape)
+
+    for dimension, (n, m, correction) in enumerate(zip(shape, grid_shape, corrections)):
+        index = mod(arange(n) - n // 2, m)
+        correction = correction.reshape([-1] + [1] * (len(shape) - dimension - 1))
+        image_grid = image_grid.take(index, axis=dimension) / correction
+
+    # Look up the image pixels
+    pixel_index = []
+    for axis, coordinate in zip(axes, image):
+        if len(axis) > 1:
+            pixel_index.append(rint((coordinate - axis[0]) / ((axis[-1] - axis[0]) / (len(axis) - 1))).astype(intp))
+
+    return image_grid[tuple(pixel_index)]
+
+
+def reconstruct3(signal, sensor_az, sensor_el, x_image, y_image, z_image, frequency, fft_length=None,
+                 oversampling=2.0, kernel_width=6):
+    """
+    Reconstruct the three-dimensional image from an azimuth / elevation grid of K-space samples.
+    :param signal: The signal in K-space (frequency, elevation, azimuth).
+    :param sensor_az: The sensor azimuth positions (rad).
+    :param sensor_el: The sensor elevation positions (rad).
+    :param x_image: The image x-coordinates (m).
+    :param y_image: The image y-coordinates (m).
+    :param z_image: The image z-coordinates (m).
+    :param frequency: The frequency array (Hz).
+    :param fft_length: The number of points in the FFT of the backprojection image to match, the number of
+    frequencies if None.
+    :param oversampling: The oversampling of the gridding grid.
+    :param kernel_width: The width of the gridding kernel (grid points).
+    :return: The reconstructed image.
+    """
+    # Flatten the azimuth / elevation grid into a list of pulses
+    sensor_az = asarray(sensor_az, dtype=float)
+    sensor_el = asarray(sensor_el, dtype=float)
+    az = (ones([len(sensor_el), 1]) * sensor_az[None, :]).ravel()
+    el = (sensor_el[:, None] * ones([1, len(sensor_az)])).ravel()
+
+    return reconstruct(asarray(signal).reshape(len(frequency), -1), az, el, x_image, y_image, z_image, frequency,
+                       fft_length, oversampling, kernel_width)
+
+
+def _spread_weights(omega, m, n, kernel_width):
+    """
+    Calculate the gridding weights for one dimension.
+    :param omega: The sample phase advance per pixel in [0, 2 pi) (rad).
+    :param m: The number of points in the oversampled grid.
+    :param n: The number of pixels.
+    :param kernel_width: The width of the kernel (grid points).
+    :return: The kernel weights (width, samples), the first grid index of each sample, the kernel correction.
+    """
+    # Kernel half width and shape parameter
+    h = 2.0 * pi / m
+    alpha = 0.5 * kernel_width * h
+    beta = 2.30 * kernel_width
+
+    # Grid points covered by each sample
+    position = omega / h
+    first = floor(position - 0.5 * kernel_width).astype(intp) + 1
+    distance = (first[None, :] + arange(kernel_width)[:, None] - position[None, :]) * (h / alpha)
+    weight = _kernel(distance, beta)
+
+    # Fourier transform of the kernel at the pixels by Gauss-Legendre quadrature
+    node, node_weight = leggauss(2 * kernel_width + 20)
+    frequency = (arange(n) - n // 2) * alpha
+    correction = (node_weight[None, :] * _kernel(node, beta)[None, :] *
+                  cos(frequency[:, None] * node[None, :])).sum(axis=1) * (alpha / h)
+
+    return weight, mod(first, m), correction
+
+
+def _kernel(z, beta):
+    """
+    The exponential of semicircle kernel.
+    :param z: The normalized distance.
+    :param beta: The shape parameter.
+    :return: The kernel value.
+    """
+    inside = 1.0 - z ** 2
+    return exp(beta * (sqrt(abs(inside)) - 1.0)) * (inside > 0.0)
+
+
+def _spread(samples, weights, offsets, grid_shape):
+    """
+    Spread the samples onto the grid with the tensor product kernel.
+    :param samples: The K-space samples.
+    :param weights: The kernel weights for each dimension.
+    :param offsets: The first grid index of each sample for each dimension.
+    :param grid_shape: The shape of the grid.
+    :return: The gridded samples.
+    """
+    size = int(prod(grid_shape))
+    grid_real = zeros(size)
+    grid_imag = zeros(size)
+
+    # Loop over the kernel taps, each tap is one weighted histogram of the samples
+    taps = [()]
+    for weight in weights:
+        taps = [tap + (i,) for tap in taps for i in range(weight.shape[0])]
+
+    strides = [int(prod(grid_shape[d + 1:])) for d in range(len(grid_shape))]
+
+    for tap in taps:
+        index = 0
+        value = samples
+        for d, i in enumerate(tap):
+            index = index + mod(offsets[d] + i, grid_shape[d]) * strides[d]
+            value = value * weights[d][i]
+        grid_real += bincount(index, value.real, size)
+        grid_imag += bincount(index, value.imag, size)
+
+    return (grid_real + 1j * grid_imag).reshape(grid_shape)
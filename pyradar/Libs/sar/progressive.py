@@ -0,0 +1,144 @@
+"""
+Project: RadarBook
+File: progressive.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import asarray, ones
+from time import perf_counter
+from Libs.sar import backprojection
+
+
+def reconstruct_progressive(signal, sensor_x, sensor_y, sensor_z, range_center, x_image, y_image, z_image,
+                            frequency, fft_length, latency=0.2, coarsest=16, pulse_block=16, tile_size=4096,
+                            number_of_workers=1, worker_tile_size=65536, dtype=complex):
+    """
+    Reconstruct the image progressively, from a quick look to the full resolution image.
+    Each pass decimates the image grid by a power of two and forms the image from the central subaperture and
+    subband of the data, so the resolution matches the grid. The first image returned is the finest that fits in
+    the latency, and the decimation halves on each pass. The last pass is reconstruct_fast on the full grid.
+    :param signal: The signal in K-space.
+    :param sensor_x: The sensor x-coordinate (m).
+    :param sensor_y: The sensor y-coordinate (m).
+    :param sensor_z: The sensor z-coordinate (m).
+    :param range_center: The range to the center of the image (m).
+    :param x_image: The x-coordinates of the image (m).
+    :param y_image: The y-coordinates of the image (m).
+    :param z_image: The z-coordinates of the image (m).
+    :param frequency: The frequency array (Hz).
+    :param fft_length: The number of points in the FFT.
+    :param latency: The time allowed for the first image (s).
+    :param coarsest: The largest decimation of the image grid.
+    :param pulse_block: The number of pulses backprojected together.
+    :param tile_size: The number of pixels backprojected together.
+    :param number_of_workers: The number of worker processes.
+    :param worker_tile_size: The number of pixels given to a worker at a time.
+    :param dtype: The image data type.
+    :return: Generator of (decimation, image), the image is on the grid x_image[::decimation, ::decimation].
+    """
+    sensor_x = asarray(sensor_x, dtype=float)
+    sensor_y = asarray(sensor_y, dtype=float)
+    sensor_z = asarray(sensor_z, dtype=float)
+    range_center = asarray(range_center, dtype=float) * ones(len(sensor_x))
+
+    def form(pulses, frequencies, grid, length):
+        return backprojection.reconstruct_fast(signal[frequencies, pulses], sensor_x[pulses], sensor_y[pulses],
+                                               sensor_z[pulses], range_center[pulses], x_image[grid],
+                                               y_image[grid], z_image[grid], frequency[frequencies], length,
+                                               pulse_block, tile_size, number_of_workers, worker_tile_size, dtype)
+
+    return _progressive(form, asarray(signal).shape, x_image.ndim, fft_length, latency, coarsest)
+
+
+def reconstruct2_progressive(signal, sensor_az, sensor_el, x_image, y_image, z_image, frequency, fft_length,
+                             latency=0.2, coarsest=16, pulse_block=16, tile_size=4096, number_of_workers=1,
+                             worker_tile_size=65536, dtype=complex):
+    """
+    Reconstruct the image progressively from plane wave data, from a quick look to the full resolution image.
+    The passes are the same as reconstruct_progressive, and the last pass is reconstruct2_fast on the full grid.
+    :param signal: The signal in K-space.
+    :param sensor_az: The sensor azimuth positions (rad).
+    :param sensor_el: The sensor elevation positions (rad).
+    :param x_image: The image x-coordinates (m).
+    :param y_image: The image y-coordinates (m).
+    :param z_image: The image z-coordinates (m).
+    :param frequency: The frequency array (Hz).
+    :param fft_length: The number of points in the FFT.
+    :param latency: The time allowed for the first image (s).
+    :param coarsest: The largest decimation of the image grid.
+    :param pulse_block: The number of pulses backprojected together.
+    :param tile_size: The number of pixels backprojected together.
+    :param number_of_workers: The number of worker processes.
+    :param worker_tile_size: The number of pixels given to a worker at a time.
+    :param dtype: The image data type.
+    :return: Generator of (decimation, image), the image is on the grid x_image[::decimation, ::decimation].
+    """
+    sensor_az = asarray(sensor_az, dtype=float)
+    sensor_el = asarray(sensor_el, dtype=float)
+
+    def form(pulses, frequencies, grid, length):
+        return backprojection.reconstruct2_fast(signal[frequencies, pulses], sensor_az[pulses], sensor_el[pulses],
+                                                x_image[grid], y_image[grid], z_image[grid], frequency[frequencies],
+                                                length, pulse_block, tile_size, number_of_workers, worker_tile_size,
+                                                dtype)
+
+    return _progressive(form, asarray(signal).shape, x_image.ndim, fft_length, latency, coarsest)
+
+
+def _progressive(form, signal_shape, dimensions, fft_length, latency, coarsest):
+    """
+    Run the passes from coarse to fine.
+    :param form: Function forming the image from the pulses, frequencies, grid and FFT length.
+    :param signal_shape: The shape of the signal (frequency x pulses).
+    :param dimensions: The number of dimensions of the image grid.
+    :param fft_length: The number of points in the FFT.
+    :param latency: The time allowed for the first image (s).
+    :param coarsest: The largest decimation of the image grid.
+    :return: Generator of (decimation, image).
+    """
+    number_of_frequencies, number_of_pulses = signal_shape
+
+    def run(decimation):
+        # Central subband and subaperture for the decimation, and the decimated grid
+        frequencies = _center(number_of_frequencies, decimation)
+        pulses = _center(number_of_pulses, decimation)
+        grid = (slice(None, None, decimation),) * dimensions
+        length = max(fft_length // decimation, frequencies.stop - frequencies.start)
+        return form(pulses, frequencies, grid, length)
+
+    start = perf_counter()
+
+    # Time the coarsest pass to predict the others, the work goes as the decimation to the power dimensions + 1
+    decimation = max(1, 2 ** (int(coarsest).bit_length() - 1))
+    image = run(decimation)
+    pass_time = perf_counter() - start
+
+    while decimation > 1 and perf_counter() - start + pass_time * 2 ** (dimensions + 1) <= latency:
+        decimation //= 2
+        pass_start = perf_counter()
+        image = run(decimation)
+        pass_time = perf_counter() - pass_start
+
+    yield decimation, image
+
+    # Refine to the full resolution
+    while decimation > 1:
+        decimation //= 2
+        yield decimation, run(decimation)
+
+
+def _center(n, decimation):
+    """
+    The slice of the central 1 / decimation of n samples.
+    :param n: The number of samples.
+    :param decimation: The decimation.
+    :return: The slice.
+    """
+    m = min(n, max(n // decimation, 2))
+    start = (n - m) // 2
+    return slice(start, start + m)
@@ -0,0 +1,146 @@
+"""
+Project: RadarBook
+File: simulation.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from scipy.constants import c, pi
+from numpy import sqrt, exp, sin, cos, arctan2, zeros, ones, asarray, broadcast_to, diff
+
+
+def stripmap(x_target, y_target, z_target, rcs, sensor_x, sensor_y, sensor_z, range_center, frequency,
+             antenna_pattern=None, target_block=256):
+    """
+    Calculate the K-space signal of point targets seen from a sensor trajectory (spherical wavefronts).
+    Targets are processed in blocks to bound memory. For equally spaced frequencies the phase is advanced from one
+    frequency to the next by multiplication, so only two exponentials are evaluated for each target and pulse.
+    Unequally spaced frequencies are allowed, with the phase evaluated at each frequency instead.
+    :param x_target: The target x-coordinates (m).
+    :param y_target: The target y-coordinates (m).
+    :param z_target: The target z-coordinates (m).
+    :param rcs: The target amplitudes (radar cross section, square root of m^2).
+    :param sensor_x: The sensor x-coordinate for each pulse (m).
+    :param sensor_y: The sensor y-coordinate for each pulse (m).
+    :param sensor_z: The sensor z-coordinate for each pulse (m).
+    :param range_center: The range to the image center for each pulse (m).
+    :param frequency: The frequency array (Hz), preferably equally spaced.
+    :param antenna_pattern: Function of the azimuth angle from the sensor to the target (rad) giving the one way
+    antenna pattern, or None for no pattern.
+    :param target_block: The number of targets processed together.
+    :return: The signal in K-space (frequency x pulses).
+    """
+    x_target, y_target, z_target, rcs = _targets(x_target, y_target, z_target, rcs)
+    frequency = asarray(frequency, dtype=float).ravel()
+
+    sensor_x = asarray(sensor_x, dtype=float)
+    sensor_y = asarray(sensor_y, dtype=float)
+    sensor_z = asarray(sensor_z, dtype=float)
+    range_center = asarray(range_center, dtype=float) * ones(len(sensor_x))
+
+    signal = zeros([len(frequency), len(sensor_x)], dtype=complex)
+
+    for start in range(0, len(x_target), target_block):
+        block = slice(start, start + target_block)
+
+        # Vector from each sensor position to each target in the block
+        dx = x_target[block, None] - sensor_x[None, :]
+        dy = y_target[block, None] - sensor_y[None, :]
+        dz = z_target[block, None] - sensor_z[None, :]
+
+        # Range relative to the image center (m)
+        target_range = sqrt(dx ** 2 + dy ** 2 + dz ** 2) - range_center[None, :]
+
+        # Two way antenna pattern toward each target
+        amplitude = rcs[block, None] * ones(target_range.shape)
+        if antenna_pattern is not None:
+            amplitude *= asarray(antenna_pattern(arctan2(dy, dx))) ** 2
+
+        _accumulate(signal, amplitude, target_range, frequency)
+
+    return signal
+
+
+def far_field(x_target, y_target, z_target, rcs, sensor_az, sensor_el, frequency, target_block=256):
+    """
+    Calculate the K-space signal of point targets seen from a set of far field angles (plane wavefronts).
+    For equally spaced frequencies the phase is advanced from one frequency to the next by multiplication, and
+    unequally spaced frequencies have the phase evaluated at each frequency instead.
+    :param x_target: The target x-coordinates (m).
+    :param y_target: The target y-coordinates (m).
+    :param z_target: The target z-coordinates (m).
+    :param rcs: The target amplitudes (radar cross section, square root of m^2).
+    :param sensor_az: The sensor azimuth angles, any shape such as elevation x azimuth (rad).
+    :param sensor_el: The sensor elevation angles, the same shape as the azimuth angles (rad).
+    :param frequency: The frequency array (Hz), preferably equally spaced.
+    :param target_block: The number of targets processed together.
+    :return: The signal in K-space (frequency x angle shape).
+    """
+    x_target, y_target, z_target, rcs = _targets(x_target, y_target, z_target, rcs)
+    frequency = asarray(frequency, dtype=float).ravel()
+
+    sensor_az = asarray(sensor_az, dtype=float)
+    sensor_el = broadcast_to(asarray(sensor_el, dtype=float), sensor_az.shape)
+    shape = sensor_az.shape
+
+    # Line of sight direction cosines
+    u = (cos(sensor_el) * cos(sensor_az)).ravel()
+    v = (cos(sensor_el) * sin(sensor_az)).ravel()
+    w = sin(sensor_el).ravel()
+
+    signal = zeros([len(frequency), len(u)], dtype=complex)
+
+    for start in range(0, len(x_target), target_block):
+        block = slice(start, start + target_block)
+
+        # Range of each target along the line of sight (m)
+        target_range = x_target[block, None] * u + y_target[block, None] * v + z_target[block, None] * w
+
+        _accumulate(signal, rcs[block, None] * ones(target_range.shape), target_range, frequency)
+
+    return signal.reshape((len(frequency),) + shape)
+
+
+def _targets(x_target, y_target, z_target, rcs):
+    """
+    Convert the target lists to arrays.
+    :param x_target: The target x-coordinates (m).
+    :param y_target: The target y-coordinates (m).
+    :param z_target: The target z-coordinates (m).
+    :param rcs: The target amplitudes.
+    :return: The target arrays.
+    """
+    x_target = asarray(x_target, dtype=float).ravel()
+    return x_target, asarray(y_target, dtype=float).ravel(), asarray(z_target, dtype=float).ravel(), \
+        asarray(rcs).ravel() * ones(len(x_target))
+
+
+def _accumulate(signal, amplitude, target_range, frequency):
+    """
+    Add the returns of a block of targets to the signal.
+    :param signal: The signal to add to (frequency x pulses).
+    :param amplitude: The amplitude of each target and pulse.
+    :param target_range: The range of each target and pulse (m).
+    :param frequency: The frequency array (Hz).
+    :return:
+    """
+    # Unequally spaced frequencies have no common phase advance, so each phase is evaluated
+    spacing = diff(frequency)
+    if len(spacing) > 1 and abs(spacing - spacing[0]).max() > 1e-9 * abs(spacing[0]):
+        for i, f in enumerate(frequency):
+            signal[i] += (amplitude * exp(-1j * 4.0 * pi * f / c * target_range)).sum(axis=0)
+        return
+
+    # Phase at the start frequency and the advance from one frequency to the next
+    term = amplitude * exp(-1j * 4.0 * pi * frequency[0] / c * target_range)
+    if len(frequency) > 1:
+        step = exp(-1j * 4.0 * pi * (frequency[1] - frequency[0]) / c * target_range)
+
+    for i in range(len(frequency)):
+        signal[i] += term.sum(axis=0)
+        if i < len(frequency) - 1:
+            term *= step
@@ -0,0 +1,179 @@
+"""
+Project: RadarBook
+File: sparse_backprojection.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from scipy.constants import c, pi
+from scipy.ndimage import binary_dilation
+from numpy import asarray, arange, zeros, ones, cos, sin, clip, amax, log10, flatnonzero, column_stack, \
+    ceil
+from Libs.sar import backprojection
+
+
+def reconstruct(signal, az, el, x, y, z, frequency, fft_length, dynamic_range=40.0, brick_size=8, margin=6.0,
+                pulse_block=16, tile_size=4096, number_of_workers=1, dtype=complex):
+    """
+    Reconstruct the three-dimensional image coarse to fine, forming only the bricks of the volume with energy.
+    A coarse image at the brick centers is formed from the center of the K-space data, with a resolution matching
+    the brick spacing. Bricks within the dynamic range (plus a margin) of the coarse peak, and their neighbors, are
+    then formed at full resolution with all the data.
+    :param signal: The signal in K-space (frequency, elevation, azimuth).
+    :param az: The sensor azimuth positions (elevation x azimuth grid) (rad).
+    :param el: The sensor elevation positions (elevation x azimuth grid) (rad).
+    :param x: The image x-coordinates (m).
+    :param y: The image y-coordinates (m).
+    :param z: The image z-coordinates (m).
+    :param frequency: The frequency array (Hz).
+    :param fft_length: The number of points in the FFT.
+    :param dynamic_range: The dynamic range of the image to keep (dB).
+    :param brick_size: The number of voxels on a side of a brick.
+    :param margin: Extra dynamic range for the coarse image (dB).
+    :param pulse_block: The number of pulses backprojected together.
+    :param tile_size: The number of pixels backprojected together.
+    :param number_of_workers: The number of worker processes.
+    :param dtype: The image data type.
+    :return: The brick indices (bricks x 3) and the brick images (bricks x brick_size x brick_size x brick_size).
+    """
+    x = asarray(x, dtype=float)
+    y = asarray(y, dtype=float)
+    z = asarray(z, dtype=float)
+    az = asarray(az, dtype=float)
+    el = asarray(el, dtype=float)
+    frequency = asarray(frequency, dtype=float)
+    axes = (x, y, z)
+
+    nf, ne, na = signal.shape
+
+    # Number of bricks along each axis
+    bricks = [int(ceil(len(axis) / brick_size)) for axis in axes]
+
+    # Resolution of the full data along each axis
+    k = 4.0 * pi * frequency[:, None, None] / c
+    k_space = (k * cos(el) * cos(az), k * cos(el) * sin(az), k * sin(el) * ones(nf)[:, None, None])
+    ratio = []
+    for axis, kd in zip(axes, k_space):
+        if len(axis) > 1 and kd.max() > kd.min():
+            resolution = 2.0 * pi / (kd.max() - kd.min())
+            ratio.append(resolution / (brick_size * (axis[-1] - axis[0]) / (len(axis) - 1)))
+
+    # Fraction of the data giving a resolution of about one brick
+    fraction = clip(max(ratio) if ratio else 1.0, 0.0, 1.0)
+
+    # Coarse image from the center of the K-space data
+    f_sub = _center(nf, fraction)
+    e_sub = _center(ne, fraction)
+    a_sub = _center(na, fraction)
+
+    centers = [asarray([axis[i * brick_size:(i + 1) * brick_size].mean() for i in range(n)])
+               for axis, n in zip(axes, bricks)]
+    coarse_index = _grid_index(bricks)
+    coarse = _backproject(signal[f_sub, e_sub, a_sub], az[e_sub, a_sub], el[e_sub, a_sub], frequency[f_sub],
+                          fft_length, [center[index] for center, index in zip(centers, coarse_index)], pulse_block,
+                          tile_size, number_of_workers, dtype)
+
+    # Keep the bricks within the dynamic range and their neighbors
+    level = abs(coarse) / amax(abs(coarse))
+    keep = (level >= 10.0 ** (-(dynamic_range + margin) / 20.0)).reshape(bricks)
+    keep = binary_dilation(keep, ones([3, 3, 3], dtype=bool))
+    brick_index = column_stack([index[flatnonzero(keep)] for index in coarse_index])
+
+    # Voxels of the kept bricks, clipped to the volume
+    offset = arange(brick_size)
+    voxel = [clip(brick_index[:, d, None] * brick_size + offset[None, :], 0, len(axes[d]) - 1) for d in range(3)]
+    inside = [(brick_index[:, d, None] * brick_size + offset[None, :]) < len(axes[d]) for d in range(3)]
+
+    number_of_bricks = len(brick_index)
+    shape = [number_of_bricks, brick_size, brick_size, brick_size]
+    coordinates = [(axes[0][voxel[0]][:, :, None, None] * ones(shape)).ravel(),
+                   (axes[1][voxel[1]][:, None, :, None] * ones(shape)).ravel(),
+                   (axes[2][voxel[2]][:, None, None, :] * ones(shape)).ravel()]
+
+    # Full resolution image of the kept bricks
+    fine = _backproject(signal, az, el, frequency, fft_length, coordinates, pulse_block, tile_size,
+                        number_of_workers, dtype).reshape(shape)
+
+    # Zero the voxels past the edge of the volume
+    fine *= inside[0][:, :, None, None] & inside[1][:, None, :, None] & inside[2][:, None, None, :]
+
+    return brick_index, fine
+
+
+def points(brick_index, brick_values, x, y, z, dynamic_range=40.0):
+    """
+    List the voxels of a sparse image that are within the dynamic range.
+    :param brick_index: The brick indices (bricks x 3).
+    :param brick_values: The brick images (bricks x brick_size x brick_size x brick_size).
+    :param x: The image x-coordinates (m).
+    :param y: The image y-coordinates (m).
+    :param z: The image z-coordinates (m).
+    :param dynamic_range: The dynamic range (dB).
+    :return: The x, y and z-coordinates (m) and the normalized magnitude of the voxels.
+    """
+    brick_size = brick_values.shape[1]
+
+    # Normalized magnitude in dB
+    level = abs(brick_values) / amax(abs(brick_values))
+    with_energy = 20.0 * log10(level + 1e-300) > -dynamic_range
+
+    b, i, j, k = with_energy.nonzero()
+    ix = brick_index[b, 0] * brick_size + i
+    iy = brick_index[b, 1] * brick_size + j
+    iz = brick_index[b, 2] * brick_size + k
+
+    return asarray(x)[ix], asarray(y)[iy], asarray(z)[iz], level[b, i, j, k]
+
+
+def _center(n, fraction):
+    """
+    The slice of the center fraction of n samples.
+    :param n: The number of samples.
+    :param fraction: The fraction to keep.
+    :return: The slice.
+    """
+    m = max(int(round(n * fraction)), min(n, 2))
+    start = (n - m) // 2
+    return slice(start, start + m)
+
+
+def _grid_index(shape):
+    """
+    The index along each axis of every point of a three-dimensional grid, x slowest.
+    :param shape: The grid shape.
+    :return: The indices along each axis.
+    """
+    nx, ny, nz = shape
+    i = arange(nx * ny * nz)
+    return [i // (ny * nz), (i // nz) % ny, i % nz]
+
+
+def _backproject(signal, az, el, frequency, fft_length, coordinates, pulse_block, tile_size, number_of_workers,
+                 dtype):
+    """
+    Backproject an elevation / azimuth grid of pulses onto a list of points.
+    :param signal: The signal in K-space (frequency, elevation, azimuth).
+    :param az: The sensor azimuth positions (rad).
+    :param el: The sensor elevation positions (rad).
+    :param frequency: The frequency array (Hz).
+    :param fft_length: The number of points in the FFT.
+    :param coordinates: The x, y and z-coordinates of the points (m).
+    :param pulse_block: The number of pulses backprojected together.
+    :param tile_size: The number of pixels backprojected together.
+    :param number_of_workers: The number of worker processes.
+    :param dtype: The image data type.
+    :return: The image at the points.
+    """
+    pulse_matrix, pixel_matrix = backprojection.plane_wave_geometry(az.ravel(), el.ravel(), *coordinates)
+    range_profiles = backprojection.range_compress(asarray(signal, dtype=dtype).reshape(len(frequency), -1),
+                                                   fft_length)
+
+    bp_image = zeros(pixel_matrix.shape[1], dtype=dtype)
+    backprojection.backproject_parallel(bp_image, range_profiles, pulse_matrix, pixel_matrix,
+                                        backprojection.range_window(frequency, fft_length), frequency[0], None,
+                                        pulse_block, tile_size, number_of_workers)
+    return bp_image
@@ -0,0 +1,75 @@
+"""
+Project: RadarBook
+File: shared_arrays.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import asarray, ascontiguousarray, frombuffer, prod, uint8, dtype
+from multiprocessing.sharedctypes import RawArray
+from multiprocessing.shared_memory import SharedMemory
+from hashlib import blake2b
+
+
+def digest(*arrays):
+    """
+    Digest of the contents of a set of arrays.
+    :param arrays: The arrays.
+    :return: The digest.
+    """
+    value = blake2b(digest_size=16)
+    for array in arrays:
+        value.update(ascontiguousarray(array).view(uint8))
+    return value.hexdigest()
+
+
+def share(array):
+    """
+    Copy an array into shared memory.
+    :param array: The array to share.
+    :return: The shared buffer, shape and data type.
+    """
+    array = asarray(array)
+    buffer = RawArray('b', max(array.nbytes, 1))
+    shared_array(buffer, array.shape, array.dtype.str)[...] = array
+    return buffer, array.shape, array.dtype.str
+
+
+def shared_array(buffer, shape, type_code):
+    """
+    View a shared buffer as an array.
+    :param buffer: The shared buffer.
+    :param shape: The shape of the array.
+    :param type_code: The data type of the array.
+    :return: The array.
+    """
+    return frombuffer(buffer, dtype=type_code, count=int(prod(shape))).reshape(shape)
+
+
+def named_array(shape, type_code):
+    """
+    Allocate an array in named shared memory, which a worker process already running attaches to by name.
+    The array is viewed with shared_array(memory.buf, shape, type_code), and the views are released before the memory.
+    :param shape: The shape of the array.
+    :param type_code: The data type of the array.
+    :return: The shared memory, to be unlinked by the caller, and the name, shape and data type of the array.
+    """
+    type_code = dtype(type_code).str
+    memory = SharedMemory(create=True, size=max(int(prod(shape)) * dtype(type_code).itemsize, 1))
+    return memory, (memory.name, tuple(shape), type_code)
+
+
+def share_named(array):
+    """
+    Copy an array into named shared memory, which a worker process already running attaches to by name.
+    :param array: The array to share.
+    :return: The shared memory, to be unlinked by the caller, and the name, shape and data type of the array.
+    """
+    array = asarray(array)
+    memory, descriptor = named_array(array.shape, array.dtype)
+    shared_array(memory.buf, array.shape, array.dtype)[...] = array
+    return memory, descriptor
@@ -0,0 +1,64 @@
+"""
+Project: RadarBook
+File: test_adaptive_frequency.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import array, linspace, radians, vstack
+from pathlib import Path
+import pytest
+from Libs.rcs.adaptive_frequency import RationalModel, adaptive_sweep
+from Libs.rcs.facet_io import read_facet
+from Libs.rcs.facet_mesh import FacetMesh
+from Libs.rcs.scattering_matrix import physical_optics
+
+
+def _poles(z):
+    """
+    Two responses sharing two poles off the real axis.
+    :param z: The points to evaluate at.
+    :return: The responses (2 x points).
+    """
+    return vstack([1.0 / (z - 1.3 + 0.1j) + 2.0 / (z + 0.4 - 0.2j), 0.5 / (z - 1.3 + 0.1j)])
+
+
+def test_rational_model_recovers_poles():
+    """
+    A rational model fit to a few samples of a rational response matches it between the samples.
+    """
+    z = linspace(0.0, 1.0, 200)
+    model = RationalModel(z[::20], _poles(z[::20]), 1e-10)
+
+    assert len(model.support) <= 4
+    assert abs(model(z) - _poles(z)).max() < 1e-10 * abs(_poles(z)).max()
+
+
+@pytest.mark.parametrize('model', ['sphere', 'frustum'])
+def test_adaptive_sweep_matches_exhaustive(model):
+    """
+    The adaptive sweep of the physical optics matches the sweep over every frequency within the tolerance, with
+    physical optics evaluated at a small part of the frequencies.
+    """
+    _, vertices, faces = read_facet(Path(__file__).parents[1] / 'Libs' / 'rcs' / (model + '.facet'))
+    mesh = FacetMesh(array(vertices, dtype=float), array(faces))
+    frequency = linspace(1e9, 3e9, 401)
+    theta, phi = radians(30.0), radians(20.0)
+
+    evaluated = []
+
+    def evaluate(f):
+        evaluated.extend(f)
+        return physical_optics(mesh, f, theta, phi, theta, phi)
+
+    tolerance = 1e-3
+    scattering_matrix, error, _ = adaptive_sweep(evaluate, frequency, tolerance)
+    reference = physical_optics(mesh, frequency, theta, phi, theta, phi)
+
+    assert error <= tolerance
+    assert abs(scattering_matrix - reference).max() <= tolerance * abs(reference).max()
+    assert len(evaluated) < len(frequency) // 4
@@ -0,0 +1,140 @@
+"""
+Project: RadarBook
+File: test_backprojection.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import linspace, radians, meshgrid, cos, sin, zeros_like, ones_like, complex64, sqrt, column_stack
+from numpy.random import default_rng
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pytest
+from Libs.sar.backprojection import reconstruct, reconstruct2, reconstruct_fast, reconstruct2_fast, \
+    reconstruct3_chunked, Backprojector
+
+
+def _scene():
+    """
+    A random signal in K-space over a small aperture, with the image grid.
+    :return: The signal, sensor azimuth (rad), frequency (Hz) and the x and y image coordinates (m).
+    """
+    rng = default_rng(0)
+    signal = rng.standard_normal((64, 64)) + 1j * rng.standard_normal((64, 64))
+    frequency = linspace(9e9, 10e9, 64)
+    sensor_az = radians(linspace(-3.0, 3.0, 64))
+    x_image, y_image = meshgrid(linspace(-5.0, 5.0, 48), linspace(-5.0, 5.0, 48))
+    return signal, sensor_az, frequency, x_image, y_image
+
+
+@pytest.mark.parametrize('number_of_workers, dtype, tolerance', [(1, complex, 1e-7), (2, complex, 1e-7),
+                                                                 (1, complex64, 1e-5)])
+def test_reconstruct_fast(number_of_workers, dtype, tolerance):
+    """
+    The fast spherical backprojection matches reconstruct relative to the image peak.
+    """
+    signal, sensor_az, frequency, x_image, y_image = _scene()
+    range_center = 1e4 * ones_like(sensor_az)
+    sensor_x = range_center * cos(sensor_az)
+    sensor_y = range_center * sin(sensor_az)
+    sensor_z = zeros_like(sensor_az)
+
+    image = reconstruct(signal, sensor_x, sensor_y, sensor_z, range_center.copy(), x_image, y_image,
+                        zeros_like(x_image), frequency, 512)
+    fast_image = reconstruct_fast(signal, sensor_x, sensor_y, sensor_z, range_center, x_image, y_image,
+                                  zeros_like(x_image), frequency, 512, number_of_workers=number_of_workers,
+                                  worker_tile_size=500, dtype=dtype)
+
+    assert abs(fast_image - image).max() < tolerance * abs(image).max()
+
+
+def test_reconstruct2_fast():
+    """
+    The fast plane wave backprojection matches reconstruct2 relative to the image peak.
+    """
+    signal, sensor_az, frequency, x_image, y_image = _scene()
+    sensor_el = zeros_like(sensor_az)
+
+    image = reconstruct2(signal, sensor_az, sensor_el, x_image, y_image, zeros_like(x_image), frequency, 512)
+    fast_image = reconstruct2_fast(signal, sensor_az, sensor_el, x_image, y_image, zeros_like(x_image), frequency,
+                                   512)
+
+    assert abs(fast_image - image).max() < 1e-7 * abs(image).max()
+
+
+def test_backprojector_blocks():
+    """
+    Spherical pulses added block by block, with the default range to the image center, match reconstruct in one shot.
+    """
+    signal, sensor_az, frequency, x_image, y_image = _scene()
+    sensor_x = 1e4 * cos(sensor_az)
+    sensor_y = 1e4 * sin(sensor_az)
+    sensor_z = zeros_like(sensor_az)
+
+    # An image away from the origin, so the range center differs from the sensor radius
+    x_image = x_image + 3.0
+    range_center = sqrt((sensor_x - 3.0) ** 2 + sensor_y ** 2)
+
+    image = reconstruct(signal, sensor_x, sensor_y, sensor_z, range_center, x_image, y_image, zeros_like(x_image),
+                        frequency, 512)
+
+    backprojector = Backprojector(x_image, y_image, zeros_like(x_image), frequency, 512)
+    positions = column_stack([sensor_x, sensor_y, sensor_z])
+    for start in range(0, 64, 24):
+        backprojector.add_pulses(signal[:, start:start + 24], positions[start:start + 24])
+
+    assert backprojector.number_of_pulses == 64
+    assert abs(backprojector.snapshot() - image).max() < 1e-7 * abs(image).max()
+
+
+@pytest.mark.parametrize('executor', [ProcessPoolExecutor, ThreadPoolExecutor])
+def test_running_pool(executor):
+    """
+    A running pool is reused for the blocks of a backprojector and for images of different grids.
+    """
+    signal, sensor_az, frequency, x_image, y_image = _scene()
+    sensor_el = zeros_like(sensor_az)
+    positions = column_stack([sensor_az, sensor_el])
+
+    with executor(2) as pool:
+        for shift in (0.0, 2.0):
+            image = reconstruct2_fast(signal, sensor_az, sensor_el, x_image + shift, y_image, zeros_like(x_image),
+                                      frequency, 512)
+
+            with Backprojector(x_image + shift, y_image, zeros_like(x_image), frequency, 512, 'Plane Wave',
+                               worker_tile_size=500, executor=pool) as backprojector:
+                for start in range(0, 64, 24):
+                    backprojector.add_pulses(signal[:, start:start + 24], positions[start:start + 24])
+
+                assert abs(backprojector.snapshot() - image).max() < 1e-7 * abs(image).max()
+
+
+@pytest.mark.parametrize('number_of_workers', [1, 2])
+def test_reconstruct3_chunked(tmp_path, number_of_workers):
+    """
+    The volume formed in slabs into a memory mapped file matches the volume formed at once, and the memory allocated
+    stays within the budget.
+    """
+    signal, sensor_az, frequency, _, _ = _scene()
+    sensor_el = radians(linspace(-2.0, 2.0, 64))
+    x, y, z = linspace(-5.0, 5.0, 24), linspace(-5.0, 5.0, 40), linspace(-1.0, 1.0, 30)
+    x_image, y_image, z_image = meshgrid(x, y, z, indexing='ij')
+
+    image = reconstruct2_fast(signal, sensor_az, sensor_el, x_image, y_image, z_image, frequency, 512)
+
+    # A budget of a few slabs over the range profiles and the work arrays of each worker
+    memory_budget = 2 ** 20 * (2 if number_of_workers == 1 else 3)
+
+    # Peak of the memory allocated in this process, the worker processes and shared memory are not traced
+    tracemalloc.start()
+    volume = reconstruct3_chunked(signal, sensor_az, sensor_el, x, y, z, frequency, 512, memory_budget,
+                                  tmp_path / 'volume.npy', tile_size=256, number_of_workers=number_of_workers)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert abs(volume - image).max() < 1e-7 * abs(image).max()
+    assert peak_memory < memory_budget
@@ -0,0 +1,82 @@
+"""
+Project: RadarBook
+File: test_bvh.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import array, cross, einsum, where, inf, isinf, argmin, arange, broadcast_to
+from numpy.random import default_rng
+from pathlib import Path
+import pytest
+from Libs.rcs.facet_io import read_facet
+from Libs.rcs.facet_mesh import FacetMesh
+
+
+def _brute_force(mesh, origins, directions, t_min):
+    """
+    Closest hit of each ray by testing every facet, as the reference for the hierarchy.
+    :param mesh: The facet mesh.
+    :param origins: The ray origins (rays x 3) (m).
+    :param directions: The ray directions (rays x 3).
+    :param t_min: The smallest distance along the ray for a hit.
+    :return: The facet hit by each ray (-1 for no hit) and the distance along the ray.
+    """
+    vertex = mesh.vertices[mesh.faces[:, 0]][None]
+    edge1 = mesh.edges[:, 0][None]
+    edge2 = -mesh.edges[:, 2][None]
+    s = origins[:, None] - vertex
+    d = broadcast_to(directions[:, None], s.shape)
+    edge1 = broadcast_to(edge1, s.shape)
+    edge2 = broadcast_to(edge2, s.shape)
+
+    p = cross(d, edge2)
+    q = cross(s, edge1)
+    determinant = einsum('rfi,rfi->rf', edge1, p)
+    parallel = abs(determinant) <= 1e-12
+    inverse = 1.0 / where(parallel, 1.0, determinant)
+
+    u = einsum('rfi,rfi->rf', s, p) * inverse
+    v = einsum('rfi,rfi->rf', d, q) * inverse
+    t = einsum('rfi,rfi->rf', edge2, q) * inverse
+    t = where(~parallel & (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (t > t_min), t, inf)
+
+    facet = argmin(t, axis=1)
+    distance = t[arange(len(t)), facet]
+    return where(isinf(distance), -1, facet), distance
+
+
+@pytest.mark.parametrize('model', ['sphere', 'cone', 'frustum', 'double_ogive'])
+def test_intersect_matches_brute_force(model):
+    """
+    The closest hits through the hierarchy match testing every facet, for rays from outside aimed at the model and
+    rays from inside it, and a ray hits something exactly when it is occluded.
+    """
+    _, vertices, faces = read_facet(Path(__file__).parents[1] / 'Libs' / 'rcs' / (model + '.facet'))
+    mesh = FacetMesh(array(vertices, dtype=float), array(faces))
+    hierarchy = mesh.bounding_volume_hierarchy()
+
+    rng = default_rng(1)
+    lower = mesh.vertices.min(axis=0)
+    upper = mesh.vertices.max(axis=0)
+    size = (upper - lower).max()
+
+    # Rays from a sphere around the model toward points in its box, and from points inside the box
+    outside = 0.5 * (lower + upper) + 2.0 * size * rng.standard_normal((400, 3))
+    target = lower + (upper - lower) * rng.random((400, 3))
+    inside = lower + (upper - lower) * rng.random((400, 3))
+    origins = array([*outside, *inside])
+    directions = array([*(target - outside), *rng.standard_normal((400, 3))])
+    directions /= ((directions ** 2).sum(axis=1) ** 0.5)[:, None]
+
+    facet, distance = hierarchy.intersect(origins, directions, t_min=1e-9)
+    expected_facet, expected_distance = _brute_force(mesh, origins, directions, 1e-9)
+
+    hit = expected_facet >= 0
+    assert ((facet >= 0) == hit).all()
+    assert abs(distance[hit] - expected_distance[hit]).max() <= 1e-9 * size
+    assert (hierarchy.occluded(origins, directions, t_min=1e-9) == hit).all()
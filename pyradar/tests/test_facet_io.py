@@ -0,0 +1,32 @@
+"""
+Project: RadarBook
+File: test_facet_io.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import array_equal
+from pathlib import Path
+import pytest
+from Libs.rcs.facet_io import read_facet, convert, BINARY_EXTENSION
+
+
+@pytest.mark.parametrize('model', ['plate', 'cone', 'sphere', 'backhoe'])
+@pytest.mark.parametrize('memory_map', [True, False])
+def test_binary_matches_text(tmp_path, model, memory_map):
+    """
+    A text facet model converted to the binary format reads back with the same name, vertices and faces.
+    """
+    file_name = Path(__file__).parents[1] / 'Libs' / 'rcs' / (model + '.facet')
+    binary_file_name = convert(file_name, tmp_path / (model + BINARY_EXTENSION))
+
+    model_name, vertices, faces = read_facet(file_name)
+    binary_model_name, binary_vertices, binary_faces = read_facet(binary_file_name, memory_map)
+
+    assert binary_model_name == model_name
+    assert binary_vertices.dtype == vertices.dtype and array_equal(binary_vertices, vertices)
+    assert binary_faces.dtype == faces.dtype and array_equal(binary_faces, faces)
@@ -0,0 +1,21 @@
+"""
+Project: RadarBook
+File: test_fast_factorized_backprojection.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from Libs.sar.fast_factorized_backprojection import benchmark
+
+
+def test_matches_direct_backprojection():
+    """
+    With the default oversampling, fast factorized backprojection of a point target is within 2% of the peak of
+    direct backprojection.
+    """
+    for _, _, _, difference in benchmark((64, 128)):
+        assert difference < 0.02
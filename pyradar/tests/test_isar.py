@@ -0,0 +1,46 @@
+"""
+Project: RadarBook
+File: test_isar.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import array, argmax, unravel_index, hypot
+from Libs.rcs.facet_mesh import FacetMesh
+from Libs.sar.isar import isar_image
+
+
+def _square(x, y, size):
+    """
+    The vertices of a small square facing the x-axis.
+    :param x: The x-coordinate of the center (m).
+    :param y: The y-coordinate of the center (m).
+    :param size: The length of a side (m).
+    :return: The vertices (4 x 3) (m).
+    """
+    h = 0.5 * size
+    return [[x, y - h, -h], [x, y + h, -h], [x, y + h, h], [x, y - h, h]]
+
+
+def test_two_point_scatterers():
+    """
+    Two squares much smaller than the wavelength image as points at their range and cross-range positions.
+    """
+    positions = [(1.0, 0.5), (-0.5, -1.0)]
+    vertices = array(_square(*positions[0], 0.01) + _square(*positions[1], 0.01))
+    faces = array([[0, 1, 2], [2, 3, 0], [4, 5, 6], [6, 7, 4]])
+
+    image, x_image, y_image = isar_image(FacetMesh(vertices, faces), 0.0, 10.0, 10e9, 1e9)
+    spacing = x_image[0, 1] - x_image[0, 0]
+
+    magnitude = abs(image)
+    for x, y in positions:
+        # Peak within a meter of each scatterer, about half the distance between them
+        near = hypot(x_image - x, y_image - y) < 1.0
+        peak = unravel_index(argmax(magnitude * near), magnitude.shape)
+        assert hypot(x_image[peak] - x, y_image[peak] - y) < spacing
+        assert magnitude[peak] > 0.5 * magnitude.max()
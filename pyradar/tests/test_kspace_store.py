@@ -0,0 +1,120 @@
+"""
+Project: RadarBook
+File: test_kspace_store.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import linspace, array_equal, hanning
+from numpy.random import default_rng
+from scipy.io import savemat
+import os
+import pytest
+from Libs.sar import kspace_store
+
+
+def _write_mat(filename, elevation, azimuth, frequency, seed):
+    """
+    Write a K-space .mat file with random vv and hh signals.
+    :param filename: The name of the .mat file.
+    :param elevation: The elevation angles (deg).
+    :param azimuth: The azimuth angles (deg).
+    :param frequency: The frequencies (GHz).
+    :param seed: The seed of the random signals.
+    :return: The vv signal (frequency x elevation x azimuth).
+    """
+    rng = default_rng(seed)
+    shape = (len(frequency), len(elevation), len(azimuth))
+    vv = rng.standard_normal(shape) + 1j * rng.standard_normal(shape)
+    hh = rng.standard_normal(shape) + 1j * rng.standard_normal(shape)
+    savemat(filename, {'data': {'FGHz': frequency, 'azim': azimuth, 'elev': elevation, 'vv': vv, 'hh': hh}})
+    return vv
+
+
+def _dataset(path):
+    """
+    Write a data set of two files with different angles.
+    :param path: The directory of the data set.
+    :return: The file names and the vv signal of each file.
+    """
+    frequency = linspace(9.0, 10.0, 8)
+    filenames = [path / 'target_el030.mat', path / 'target_el040.mat']
+    signals = [_write_mat(filenames[0], [30.0, 31.0], linspace(0.0, 5.0, 6), frequency, 0),
+               _write_mat(filenames[1], [40.0], linspace(10.0, 12.0, 3), frequency, 1)]
+    return filenames, signals
+
+
+def test_one_store_for_the_data_set(tmp_path):
+    """
+    The files of a data set are converted to one store, and each file is read back through its index.
+    """
+    filenames, signals = _dataset(tmp_path)
+    store = kspace_store.open_store(filenames, tmp_path / 'kspace')
+
+    assert store.number_of_pulses == 2 * 6 + 3
+    for filename, vv in zip(filenames, signals):
+        signal, azimuth, elevation, frequency = store.block(filename.stem, 'vv')
+        assert array_equal(signal, vv)
+
+    # Pulses of one file in an azimuth range
+    block = store.block_pulses('target_el030')
+    index = store.pulses(1.0, 3.0, name='target_el030')
+    assert array_equal(index, [1, 2, 3, 7, 8, 9])
+    assert array_equal(store.signal('vv')[block][index - block.start].T,
+                       signals[0].reshape(8, 12)[:, index - block.start])
+    assert len(store.pulses(1.0, 3.0, name='target_el040')) == 0
+
+
+def test_block_can_be_windowed(tmp_path):
+    """
+    The signal of a block is a copy, so a window is applied in place without changing the store.
+    """
+    filenames, signals = _dataset(tmp_path)
+    store = kspace_store.open_store(filenames, tmp_path / 'kspace')
+
+    signal, _, _, _ = store.block('target_el030', 'vv')
+    coefficients = hanning(8)[:, None, None] * hanning(6)[None, None, :]
+    signal *= coefficients
+
+    assert array_equal(signal, signals[0] * coefficients)
+    assert array_equal(store.block('target_el030', 'vv')[0], signals[0])
+
+
+def test_stale_store_is_converted_again(tmp_path):
+    """
+    The store is opened without conversion until a source file changes.
+    """
+    filenames, _ = _dataset(tmp_path)
+    kspace_store.open_store(filenames, tmp_path / 'kspace')
+    index_time = os.stat(tmp_path / 'kspace' / 'index.npz').st_mtime_ns
+
+    store = kspace_store.open_store(filenames, tmp_path / 'kspace')
+    assert not store.is_stale(filenames)
+    assert os.stat(tmp_path / 'kspace' / 'index.npz').st_mtime_ns == index_time
+
+    # Rewrite one file with new signals and a later modification time
+    vv = _write_mat(filenames[1], [40.0], linspace(10.0, 12.0, 3), linspace(9.0, 10.0, 8), 2)
+    stat = os.stat(filenames[1])
+    os.utime(filenames[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert store.is_stale(filenames)
+
+    store = kspace_store.open_store(filenames, tmp_path / 'kspace')
+    assert array_equal(store.block('target_el040', 'vv')[0], vv)
+
+    # A different set of files is also stale
+    assert store.is_stale(filenames[:1])
+
+
+def test_frequencies_must_match(tmp_path):
+    """
+    Files with different frequencies can not share a store.
+    """
+    filenames, _ = _dataset(tmp_path)
+    _write_mat(filenames[1], [40.0], linspace(10.0, 12.0, 3), linspace(8.0, 9.0, 8), 1)
+
+    with pytest.raises(ValueError):
+        kspace_store.convert(filenames, tmp_path / 'kspace')
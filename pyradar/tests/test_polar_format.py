@@ -0,0 +1,47 @@
+"""
+Project: RadarBook
+File: test_polar_format.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import linspace, radians, meshgrid, cos, sin, exp, zeros_like, argmin, hypot, unravel_index
+from scipy.constants import c, pi
+import pytest
+from Libs.sar import polar_format
+from Libs.sar.backprojection import reconstruct2, reconstruct2_fast
+
+
+@pytest.mark.parametrize('backprojection', [reconstruct2, reconstruct2_fast])
+def test_point_targets_match_backprojection(backprojection):
+    """
+    The polar format image of two point targets has the scale of the backprojection image with the same FFT length.
+    """
+    frequency = linspace(9e9, 10e9, 64)
+    sensor_az = radians(linspace(-3.0, 3.0, 64))
+    sensor_el = zeros_like(sensor_az)
+    x_image, y_image = meshgrid(linspace(-5.0, 5.0, 101), linspace(-5.0, 5.0, 101))
+
+    # Point targets at pixels, with their amplitudes
+    targets = [(1.0, 0.5, 1.0), (-2.0, -1.5, 0.5)]
+    k = 4.0 * pi * frequency[:, None] / c
+    signal = 0.0
+    for x, y, amplitude in targets:
+        signal = signal + amplitude * exp(-1j * k * (x * cos(sensor_az) + y * sin(sensor_az))[None, :])
+
+    # Long FFT so the linear interpolation of the backprojection is close to exact
+    fft_length = 4096
+    image = polar_format.reconstruct(signal, sensor_az, sensor_el, x_image, y_image, zeros_like(x_image), frequency,
+                                     fft_length)
+    bp_image = backprojection(signal, sensor_az, sensor_el, x_image, y_image, zeros_like(x_image), frequency,
+                              fft_length)
+
+    for x, y, amplitude in targets:
+        pixel = unravel_index(argmin(hypot(x_image - x, y_image - y)), x_image.shape)
+        assert abs(abs(image[pixel]) / abs(bp_image[pixel]) - 1.0) < 1e-3
+
+    assert abs(image - bp_image).max() < 0.05 * abs(bp_image).max()
@@ -0,0 +1,71 @@
+"""
+Project: RadarBook
+File: test_rcs_sweep.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import array, linspace, radians, zeros_like, array_equal
+from pathlib import Path
+from Libs.rcs import rcs_sweep as sweep
+from Libs.rcs.facet_io import read_facet
+from Libs.rcs.facet_mesh import FacetMesh
+
+
+def _sphere():
+    """
+    The facet mesh of the sphere model.
+    :return: The mesh.
+    """
+    _, vertices, faces = read_facet(Path(__file__).parents[1] / 'Libs' / 'rcs' / 'sphere.facet')
+    return FacetMesh(array(vertices, dtype=float), array(faces))
+
+
+def test_sweep_resumes_from_store(tmp_path, monkeypatch):
+    """
+    A sweep stopped part way through, with a record cut short, resumes from the store and calculates only the
+    missing cells, giving the same scattering matrix as a sweep without a store.
+    """
+    mesh = _sphere()
+    frequency = linspace(1e9, 2e9, 6)
+    theta = radians(linspace(10.0, 170.0, 10))
+    phi = zeros_like(theta)
+
+    expected = sweep.rcs_sweep(mesh, frequency, theta, phi, theta, phi, angle_block=4, frequency_block=4)
+
+    # Sweep the first half of the angles into the store, then cut the last record short as an interrupted write
+    sweep.rcs_sweep(mesh, frequency, theta[:5], phi[:5], theta[:5], phi[:5], tmp_path, angle_block=4,
+                    frequency_block=4)
+    store = sweep.SweepStore(tmp_path, mesh)
+    assert len(store) == 5 * len(frequency)
+    with open(store.record_file, 'r+b') as file:
+        file.truncate(store.record_file.stat().st_size - 8)
+
+    # Count the angle and frequency samples calculated on resuming
+    calculated = []
+    physical_optics_sweep = sweep.physical_optics_sweep
+
+    def counted(mesh_, frequency_, *args):
+        calculated.append(len(frequency_) * len(args[0]))
+        return physical_optics_sweep(mesh_, frequency_, *args)
+
+    monkeypatch.setattr(sweep, 'physical_optics_sweep', counted)
+
+    resumed = sweep.rcs_sweep(mesh, frequency, theta, phi, theta, phi, tmp_path, angle_block=4,
+                              frequency_block=4)
+
+    assert array_equal(resumed, expected)
+    assert len(sweep.SweepStore(tmp_path, mesh)) == len(theta) * len(frequency)
+
+    # The cells holding the cut record and the angles not yet swept, angles 4 to 9 at every frequency
+    assert sum(calculated) == 6 * len(frequency)
+
+    # Nothing is calculated once the store is complete
+    calculated.clear()
+    assert array_equal(sweep.rcs_sweep(mesh, frequency, theta, phi, theta, phi, tmp_path, angle_block=4,
+                                       frequency_block=4), expected)
+    assert not calculated
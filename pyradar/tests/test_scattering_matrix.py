@@ -0,0 +1,169 @@
+"""
+Project: RadarBook
+File: test_scattering_matrix.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import array, zeros, sin, cos, exp, cross, sqrt, dot, arctan2, arccos, sign, linspace, radians
+from numpy.linalg import norm
+from scipy.constants import c, pi
+from pathlib import Path
+import pytest
+from Libs.rcs.facet_io import read_facet
+from Libs.rcs.facet_mesh import FacetMesh
+from Libs.rcs.scattering_matrix import ScatteringMatrix, physical_optics, physical_optics_sweep, surface_integral
+
+
+def _scalar_physical_optics(vertices, faces, frequency, theta_inc, phi_inc, theta_obs, phi_obs):
+    """
+    The facet by facet and frequency by frequency physical optics loop of the original scattering matrix, as the
+    reference for the vectorized path.
+    """
+    scattering_matrix = zeros((4, len(frequency)), dtype=complex)
+
+    wavelength = c / frequency
+    k = 2.0 * pi / wavelength
+
+    cpi, spi, cti, sti = cos(phi_inc), sin(phi_inc), cos(theta_inc), sin(theta_inc)
+    ui, vi, wi = sti * cpi, sti * spi, cti
+    incident_direction = [ui, vi, wi]
+
+    cpo, spo, cto, sto = cos(phi_obs), sin(phi_obs), cos(theta_obs), sin(theta_obs)
+    uo, vo, wo = sto * cpo, sto * spo, cto
+    uuo, vvo, wwo = cto * cpo, cto * spo, -sto
+
+    Ei_V = [cti * cpi, cti * spi, -sti]
+    Ei_H = [-spi, cpi, 0.0]
+
+    for v1, v2, v3 in faces:
+        A = vertices[v2] - vertices[v1]
+        B = vertices[v3] - vertices[v2]
+        C = vertices[v1] - vertices[v3]
+
+        normal = cross(A, B) + 0.
+        dist = [norm(A), norm(B), norm(C)]
+        ss = 0.5 * sum(dist)
+        area = sqrt(ss * (ss - dist[0]) * (ss - dist[1]) * (ss - dist[2]))
+        normal = normal / norm(normal)
+
+        if dot(normal, incident_direction) < 0.0:
+            continue
+
+        # Rotation to local facet coordinates
+        beta = arccos(normal[2])
+        alpha = arctan2(normal[1] + 0., normal[0] + 0.)
+        ca, sa, cb, sb = cos(alpha), sin(alpha), cos(beta), sin(beta)
+        rotation1 = array([[ca, sa, 0.0], [-sa, ca, 0.0], [0.0, 0.0, 1.0]])
+        rotation2 = array([[cb, 0.0, -sb], [0.0, 1.0, 0.0], [sb, 0.0, cb]])
+
+        ui_t, vi_t, wi_t = rotation2.dot(rotation1.dot(incident_direction))
+        sti_t = sqrt(ui_t * ui_t + vi_t * vi_t) * sign(wi_t)
+        cti_t = sqrt(1.0 - sti_t * sti_t)
+        phi_t = arctan2(vi_t + 0., ui_t + 0.)
+        cpi_t, spi_t = cos(phi_t), sin(phi_t)
+
+        # Phase at the three vertices
+        alpha1 = k * (vertices[v1][0] * (uo + ui) + vertices[v1][1] * (vo + vi) + vertices[v1][2] * (wo + wi))
+        alpha2 = k * ((vertices[v2][0] - vertices[v1][0]) * (uo + ui) + (vertices[v2][1] - vertices[v1][1]) *
+                      (vo + vi) + (vertices[v2][2] - vertices[v1][2]) * (wo + wi)) + alpha1
+        alpha3 = k * ((vertices[v3][0] - vertices[v1][0]) * (uo + ui) + (vertices[v3][1] - vertices[v1][1]) *
+                      (vo + vi) + (vertices[v3][2] - vertices[v1][2]) * (wo + wi)) + alpha1
+
+        # Incident field in local spherical
+        Ei_V2 = rotation2.dot(rotation1.dot(Ei_V))
+        Ei_H2 = rotation2.dot(rotation1.dot(Ei_H))
+        Et_v = Ei_V2[0] * cti_t * cpi_t + Ei_V2[1] * cti_t * spi_t - Ei_V2[2] * sti_t
+        Ep_v = -Ei_V2[0] * spi_t + Ei_V2[1] * cpi_t
+        Et_h = Ei_H2[0] * cti_t * cpi_t + Ei_H2[1] * cti_t * spi_t - Ei_H2[2] * sti_t
+        Ep_h = -Ei_H2[0] * spi_t + Ei_H2[1] * cpi_t
+
+        # Perfectly conducting surface currents
+        gamma_perpendicular = -1.0
+        gamma_parallel = -1.0 if cti_t != 0.0 else 0.0
+
+        Jx_v = -Et_v * cpi_t * gamma_parallel + Ep_v * spi_t * cti_t * gamma_perpendicular
+        Jy_v = -Et_v * spi_t * gamma_parallel - Ep_v * cpi_t * cti_t * gamma_perpendicular
+        Jx_h = -Et_h * cpi_t * gamma_parallel + Ep_h * spi_t * cti_t * gamma_perpendicular
+        Jy_h = -Et_h * spi_t * gamma_parallel - Ep_h * cpi_t * cti_t * gamma_perpendicular
+
+        for n in range(len(frequency)):
+            Ic = surface_integral(alpha1[n], alpha2[n], alpha3[n], exp(1j * alpha1[n]), exp(1j * alpha2[n]),
+                                  exp(1j * alpha3[n]), area)
+
+            Es_v = rotation1.T.dot(rotation2.T.dot([Jx_v * Ic, Jy_v * Ic, 0.0]))
+            Es_h = rotation1.T.dot(rotation2.T.dot([Jx_h * Ic, Jy_h * Ic, 0.0]))
+
+            scattering_matrix[0, n] += uuo * Es_v[0] + vvo * Es_v[1] + wwo * Es_v[2]
+            scattering_matrix[1, n] += uuo * Es_h[0] + vvo * Es_h[1] + wwo * Es_h[2]
+            scattering_matrix[2, n] += -spo * Es_v[0] + cpo * Es_v[1]
+            scattering_matrix[3, n] += -spo * Es_h[0] + cpo * Es_h[1]
+
+    return scattering_matrix * sqrt(4.0 * pi) / wavelength
+
+
+@pytest.mark.parametrize('model', ['plate', 'sphere', 'cone', 'frustum'])
+@pytest.mark.parametrize('angles', [(30.0, 20.0, 30.0, 20.0), (0.0, 0.0, 0.0, 0.0), (60.0, 45.0, 100.0, 200.0)])
+def test_physical_optics_matches_scalar(model, angles):
+    """
+    The vectorized physical optics matches the scalar loop relative to the largest scattering matrix element,
+    monostatic and bistatic.
+    """
+    _, vertices, faces = read_facet(Path(__file__).parents[1] / 'Libs' / 'rcs' / (model + '.facet'))
+    vertices = array(vertices, dtype=float)
+    faces = array(faces)
+    frequency = linspace(1e9, 3e9, 5)
+    theta_inc, phi_inc, theta_obs, phi_obs = radians(angles)
+
+    reference = _scalar_physical_optics(vertices, faces, frequency, theta_inc, phi_inc, theta_obs, phi_obs)
+    scattering_matrix = physical_optics(FacetMesh(vertices, faces), frequency, theta_inc, phi_inc, theta_obs,
+                                        phi_obs, block_size=64)
+
+    assert abs(scattering_matrix - reference).max() <= 1e-10 * abs(reference).max()
+
+
+
+def test_physical_optics_reuses_illumination():
+    """
+    Calls at the same angles over other frequencies reuse the illuminated facets kept on the mesh, and match the
+    sweep over the angles.
+    """
+    _, vertices, faces = read_facet(Path(__file__).parents[1] / 'Libs' / 'rcs' / 'frustum.facet')
+    mesh = FacetMesh(array(vertices, dtype=float), array(faces))
+    frequency = linspace(1e9, 3e9, 6)
+    theta = radians([30.0, 60.0])
+    phi = radians([20.0, 45.0])
+
+    reference = physical_optics_sweep(mesh, frequency, theta, phi, theta, phi)
+
+    for n in range(2):
+        for f in (frequency[:3], frequency[3:]):
+            physical_optics(mesh, f, theta[n], phi[n], theta[n], phi[n])
+        scattering_matrix = physical_optics(mesh, frequency, theta[n], phi[n], theta[n], phi[n])
+
+        assert len(mesh.illumination) == n + 1
+        assert abs(scattering_matrix - reference[:, n]).max() <= 1e-12 * abs(reference).max()
+
+def test_facet_mesh_follows_geometry_edits():
+    """
+    The cached facet mesh is calculated again when the vertices are edited in place, and kept when nothing changes.
+    """
+    target = ScatteringMatrix(theta_inc=radians(20.0), theta_obs=radians(20.0), frequency=linspace(1e9, 3e9, 3))
+    target.vertices = array(target.vertices, dtype=float)
+    mesh = target.facet_mesh()
+    assert target.facet_mesh() is mesh
+
+    # Stretch the plate in place
+    target.vertices[:, 0] *= 2.0
+    stretched_mesh = target.facet_mesh()
+    assert stretched_mesh is not mesh
+    assert abs(stretched_mesh.areas.sum() - 200.0) < 1e-9
+
+    reference = _scalar_physical_optics(target.vertices, target.faces, target.frequency, target.theta_inc,
+                                        target.phi_inc, target.theta_obs, target.phi_obs)
+    scattering_matrix = target.get_scattering_matrix()
+    assert abs(scattering_matrix - reference).max() <= 1e-10 * abs(reference).max()
@@ -0,0 +1,37 @@
+"""
+Project: RadarBook
+File: test_shooting_bouncing_rays.py
+Created by: Lee A. Harrison
+On: 10/18/2026
+Created with: PyCharm
+
+Copyright (C) 2019 Artech House (artech@artechhouse.com)
+This file is part of Introduction to Radar Using Python and MATLAB
+and can not be copied and/or distributed without the express permission of Artech House.
+"""
+from numpy import array, radians, log10
+from pathlib import Path
+from Libs.rcs.facet_io import read_facet
+from Libs.rcs.facet_mesh import FacetMesh
+from Libs.rcs.scattering_matrix import physical_optics_sweep
+from Libs.rcs.shooting_bouncing_rays import shooting_bouncing_rays
+
+
+def test_flat_plate_matches_physical_optics():
+    """
+    A flat plate has no multiple reflections, so the rays give the physical optics scattering over the main lobe.
+    """
+    _, vertices, faces = read_facet(Path(__file__).parents[1] / 'Libs' / 'rcs' / 'plate.facet')
+    mesh = FacetMesh(array(vertices, dtype=float), array(faces))
+    frequency = array([300e6, 600e6])
+
+    # Broadside and two degrees off in each principal plane
+    theta = radians(array([0.0, 2.0, 2.0]))
+    phi = radians(array([0.0, 0.0, 90.0]))
+
+    scattering_matrix, _ = shooting_bouncing_rays(mesh, frequency, theta, phi, theta, phi)
+    reference = physical_optics_sweep(mesh, frequency, theta, phi, theta, phi)
+
+    # Co-polarized elements in dB
+    for n in (0, 3):
+        assert abs(20.0 * log10(abs(scattering_matrix[n]) / abs(reference[n]))).max() < 0.3